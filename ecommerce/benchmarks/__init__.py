@@ -0,0 +1 @@
+"""Benchmarks measuring the throughput of performance-sensitive code paths."""
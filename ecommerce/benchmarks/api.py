@@ -0,0 +1,128 @@
+"""End-to-end benchmarks for the order and basket API endpoints."""
+from collections import OrderedDict
+import json
+
+from django.conf import settings
+from django.core.urlresolvers import reverse
+from django.test import Client
+from django.test.utils import override_settings
+import jwt
+from oscar.core.loading import get_class, get_model
+from oscar.test import factories
+
+from ecommerce.benchmarks.base import Benchmark
+from ecommerce.benchmarks.stub_lms import ENROLLMENT_PATH, StubLmsServer
+from ecommerce.extensions.api.constants import APIConstants as AC
+from ecommerce.extensions.fulfillment.mixins import FulfillmentMixin
+from ecommerce.extensions.fulfillment.status import LINE, ORDER
+from ecommerce.extensions.order.reference_data import shipping_event_types
+from ecommerce.extensions.payment.helpers import get_processor_class
+
+
+ProductClass = get_model('catalogue', 'ProductClass')
+Selector = get_class('partner.strategy', 'Selector')
+
+FREE_SKU = 'BENCHMARK-FREE-SEAT'
+PAID_SKU = 'BENCHMARK-PAID-SEAT'
+
+
+class CheckoutApiBenchmark(Benchmark):
+    """Measure the throughput of checkout, order retrieval and fulfillment, through the full request stack.
+
+    Requests are made with the Django test client, so that middleware, authentication and
+    serialization are included. Enrollments are made against a stub LMS, whose latency and
+    error rate are set by the lms_latency (in seconds) and lms_error_rate options. Each run
+    is made by a different user, so that runs aren't throttled.
+    """
+    name = 'checkout_api'
+    description = 'Create orders and baskets, retrieve orders and fulfill orders through the API, with a stub LMS.'
+    unit = 'requests'
+
+    def setUp(self):
+        self.lms = StubLmsServer(
+            latency=self.options.get('lms_latency', 0.0),
+            error_rate=self.options.get('lms_error_rate', 0.0),
+            seed=0,
+        ).start()
+        self.settings_override = override_settings(
+            ENROLLMENT_API_URL=self.lms.url + ENROLLMENT_PATH,
+            EDX_API_KEY='benchmark',
+            ALLOWED_HOSTS=list(settings.ALLOWED_HOSTS) + ['testserver'],
+        )
+        self.settings_override.enable()
+
+        self.client = Client()
+        self.processor_name = get_processor_class(settings.PAYMENT_PROCESSORS[0]).NAME
+        shipping_event_types.get_or_create(FulfillmentMixin.SHIPPING_EVENT_NAME)
+
+        ProductClass.objects.get_or_create(name='Seat', defaults={'track_stock': False, 'requires_shipping': False})
+        attributes = {'course_key': 'edX/Benchmark/Course', 'certificate_type': 'honor'}
+        self.free_seat = factories.create_product(
+            product_class='Seat', partner_sku=FREE_SKU, price=0, attributes=attributes
+        )
+        factories.create_product(product_class='Seat', partner_sku=PAID_SKU, price=100, attributes=attributes)
+
+    def tearDown(self):
+        self.settings_override.disable()
+        self.lms.stop()
+
+    def create_users(self, **kwargs):
+        """Return an iterator over enough users, with their Authorization headers, for every run of a single case."""
+        users = []
+        for __ in xrange(self.iterations + 1):
+            user = factories.UserFactory(**kwargs)
+            token = jwt.encode({'username': user.username, 'email': user.email}, settings.JWT_AUTH['JWT_SECRET_KEY'])
+            users.append((user, 'JWT ' + token))
+        return iter(users)
+
+    def create_orders(self, status=ORDER.OPEN, **kwargs):
+        """Return an iterator over enough orders for a free seat, with their owners' Authorization headers,
+        for every run of a single case."""
+        orders = []
+        for user, auth in self.create_users(**kwargs):
+            basket = factories.BasketFactory(owner=user)
+            basket.strategy = Selector().strategy(user=user)
+            basket.add_product(self.free_seat)
+            order = factories.create_order(basket=basket, user=user, status=status)
+            if status == ORDER.FULFILLMENT_ERROR:
+                order.lines.update(status=LINE.FULFILLMENT_SERVER_ERROR)
+            orders.append((order, auth))
+        return iter(orders)
+
+    def post(self, path, data, users):
+        __, auth = next(users)
+        return self.client.post(path, json.dumps(data), content_type='application/json', HTTP_AUTHORIZATION=auth)
+
+    def retrieve_order(self, orders):
+        order, auth = next(orders)
+        return self.client.get(reverse('api:v2:orders:retrieve', args=[order.number]), HTTP_AUTHORIZATION=auth)
+
+    def fulfill_order(self, orders):
+        order, auth = next(orders)
+        return self.client.put(reverse('api:v2:orders:fulfill', args=[order.number]), HTTP_AUTHORIZATION=auth)
+
+    def create_order(self, users):
+        return self.post(reverse('api:v1:orders:create_list'), {'sku': FREE_SKU}, users)
+
+    def create_basket(self, sku, users):
+        data = {
+            AC.KEYS.PRODUCTS: [{AC.KEYS.SKU: sku}],
+            AC.KEYS.CHECKOUT: True,
+            AC.KEYS.PAYMENT_PROCESSOR_NAME: self.processor_name,
+        }
+        return self.post(reverse('api:v2:baskets:create'), data, users)
+
+    def get_cases(self):
+        v1_users = self.create_users()
+        free_basket_users = self.create_users()
+        paid_basket_users = self.create_users()
+        orders = self.create_orders()
+        failed_orders = self.create_orders(status=ORDER.FULFILLMENT_ERROR, is_superuser=True)
+
+        return OrderedDict([
+            ('v1 create order (free)', lambda: self.create_order(v1_users)),
+            ('v2 create basket (free)', lambda: self.create_basket(FREE_SKU, free_basket_users)),
+            ('v2 create basket (paid)', lambda: self.create_basket(PAID_SKU, paid_basket_users)),
+            ('v2 retrieve order', lambda: self.retrieve_order(orders)),
+            ('v2 fulfill order', lambda: self.fulfill_order(failed_orders)),
+        ])
@@ -0,0 +1,122 @@
+"""Utilities for defining and measuring benchmarks."""
+from collections import OrderedDict
+import time
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class Measurement(object):
+    """Timings and query counts collected while repeatedly running a single benchmark case.
+
+    Arguments:
+        label (unicode): Name of the measured case.
+        latencies (list of float): Wall time, in seconds, taken by each run of the case.
+        queries (int): Number of database queries made by a single run of the case.
+        units_per_run (int): Number of units of work (e.g., orders) processed by a single run.
+    """
+
+    def __init__(self, label, latencies, queries, units_per_run=1):
+        self.label = label
+        self.latencies = sorted(latencies)
+        self.queries = queries
+        self.units_per_run = units_per_run
+
+    @property
+    def runs_per_second(self):
+        total = sum(self.latencies)
+        return len(self.latencies) / total if total else float('inf')
+
+    @property
+    def units_per_second(self):
+        return self.runs_per_second * self.units_per_run
+
+    def percentile(self, percent):
+        """Return the latency, in seconds, below which the given percentage of runs fell."""
+        index = int(round(percent / 100.0 * (len(self.latencies) - 1)))
+        return self.latencies[index]
+
+    def as_dict(self):
+        return OrderedDict([
+            ('label', self.label),
+            ('runs', len(self.latencies)),
+            ('units_per_second', self.units_per_second),
+            ('p50_ms', self.percentile(50) * 1000),
+            ('p95_ms', self.percentile(95) * 1000),
+            ('p99_ms', self.percentile(99) * 1000),
+            ('queries_per_run', self.queries),
+        ])
+
+
+def measure(label, func, iterations, units_per_run=1):
+    """Run a function repeatedly, measuring its latency and the number of queries it makes.
+
+    Queries are counted during an initial warm-up run, so that the overhead of
+    capturing them is excluded from the timed runs.
+
+    Returns:
+        Measurement
+    """
+    with CaptureQueriesContext(connection) as context:
+        func()
+    # Counted now, since the connection's record of queries is cleared whenever a request starts.
+    queries = len(context.captured_queries)
+
+    latencies = []
+    for __ in xrange(iterations):
+        start = time.time()
+        func()
+        latencies.append(time.time() - start)
+
+    return Measurement(label, latencies, queries, units_per_run=units_per_run)
+
+
+class Benchmark(object):
+    """Base class for benchmarks.
+
+    A benchmark prepares any data it needs in `setUp`, then exposes one or more cases
+    to be measured. Benchmarks are run within a transaction which is rolled back
+    afterwards, so any data they create is discarded.
+
+    The number of timed runs is available to `setUp` as `self.iterations`, for cases
+    which consume data. Each case is also run once more, uncounted, to warm up. Resources
+    which outlive the transaction, such as servers, are released in `tearDown`.
+
+    Arguments:
+        options: Benchmark-specific options, such as the latency of stubbed services.
+            Options which a benchmark doesn't use are ignored.
+    """
+    name = None
+    description = None
+    # Number of units of work processed by a single run of each case
+    units_per_run = 1
+    # Unit of work reported by this benchmark
+    unit = 'runs'
+    # Maximum number of timed runs of each case, for benchmarks whose runs are slow
+    max_iterations = None
+    iterations = None
+
+    def __init__(self, **options):
+        self.options = options
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def get_cases(self):
+        """Return an ordered mapping of case labels to the zero-argument callables to be measured."""
+        raise NotImplementedError
+
+    def run(self, iterations):
+        """Run every case of this benchmark, returning a list of Measurements."""
+        self.iterations = min(iterations, self.max_iterations or iterations)
+        self.setUp()
+        try:
+            return [
+                measure(label, func, self.iterations, units_per_run=self.units_per_run)
+                for label, func in self.get_cases().items()
+            ]
+        finally:
+            self.tearDown()
@@ -0,0 +1,26 @@
+"""Benchmark of the time taken for a worker to boot."""
+from collections import OrderedDict
+
+from django.conf import settings
+
+from ecommerce import importtime
+from ecommerce.benchmarks.base import Benchmark
+
+
+class BootTimeBenchmark(Benchmark):
+    """Measure the time taken to boot a fresh interpreter under the current settings.
+
+    Each run starts a new process, so the time taken to start the interpreter is included,
+    as it is when a worker is spawned. Since each run takes about a second, the number of runs
+    is limited.
+    """
+    name = 'boot_time'
+    description = 'Boot a fresh interpreter, loading the settings, apps, middleware and (optionally) URLconf.'
+    unit = 'boots'
+    max_iterations = 10
+
+    def get_cases(self):
+        return OrderedDict([
+            ('worker boot', lambda: importtime.profile_boot(settings.SETTINGS_MODULE)),
+            ('worker boot with URLconf', lambda: importtime.profile_boot(settings.SETTINGS_MODULE, urls=True)),
+        ])
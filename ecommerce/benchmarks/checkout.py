@@ -0,0 +1,68 @@
+"""Benchmarks for checkout."""
+from collections import OrderedDict
+
+from oscar.core.loading import get_class, get_model
+from oscar.test import factories
+
+from ecommerce.benchmarks.base import Benchmark
+from ecommerce.extensions.order.utils import FreeOrderCreator
+
+
+Free = get_class('shipping.methods', 'Free')
+OrderCreator = get_class('order.utils', 'OrderCreator')
+OrderNumberGenerator = get_class('order.utils', 'OrderNumberGenerator')
+OrderTotalCalculator = get_class('checkout.calculators', 'OrderTotalCalculator')
+ProductClass = get_model('catalogue', 'ProductClass')
+Selector = get_class('partner.strategy', 'Selector')
+
+
+class FreeOrderPlacementBenchmark(Benchmark):
+    """Compare the throughput of the general and free order creators when placing orders for free seats.
+
+    Each run places an order for a separate, previously-prepared basket containing a single
+    free seat. Baskets are priced before measurement begins, so that only order placement is timed.
+    """
+    name = 'free_order_placement'
+    description = 'Place an order for a basket containing a single free seat.'
+    unit = 'orders'
+
+    def setUp(self):
+        ProductClass.objects.create(name='Benchmark Seat', track_stock=False, requires_shipping=False)
+        self.product = factories.create_product(product_class='Benchmark Seat', price=0)
+        self.user = factories.UserFactory()
+
+    def create_baskets(self):
+        """Return an iterator over enough free baskets for every run of a single case."""
+        baskets = []
+        for __ in xrange(self.iterations + 1):
+            basket = factories.BasketFactory(owner=self.user)
+            basket.strategy = Selector().strategy(user=self.user)
+            basket.add_product(self.product)
+            basket.freeze()
+
+            shipping_method = Free()
+            shipping_charge = shipping_method.calculate(basket)
+            total = OrderTotalCalculator().calculate(basket, shipping_charge)
+            baskets.append((basket, total, shipping_method, shipping_charge))
+
+        return iter(baskets)
+
+    def place_order(self, creator, baskets):
+        basket, total, shipping_method, shipping_charge = next(baskets)
+        creator.place_order(
+            basket,
+            total,
+            shipping_method,
+            shipping_charge,
+            user=self.user,
+            order_number=OrderNumberGenerator.order_number(basket)
+        )
+        basket.submit()
+
+    def get_cases(self):
+        general_baskets = self.create_baskets()
+        free_baskets = self.create_baskets()
+        return OrderedDict([
+            ('OrderCreator', lambda: self.place_order(OrderCreator(), general_baskets)),
+            ('FreeOrderCreator', lambda: self.place_order(FreeOrderCreator(), free_baskets)),
+        ])
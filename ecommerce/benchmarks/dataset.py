@@ -0,0 +1,359 @@
+"""Generation of synthetic, production-shaped data for scale testing."""
+from collections import OrderedDict
+import datetime
+from decimal import Decimal as D
+import logging
+import random
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.text import slugify
+from oscar.core.loading import get_model
+
+from ecommerce.extensions.fulfillment.status import LINE, ORDER
+from ecommerce.extensions.order.reference_data import source_types
+from ecommerce.extensions.order.utils import OrderNumberGenerator
+from ecommerce.extensions.payment.helpers import get_processor_class
+
+
+logger = logging.getLogger(__name__)
+
+Basket = get_model('basket', 'Basket')
+BasketLine = get_model('basket', 'Line')
+Line = get_model('order', 'Line')
+LinePrice = get_model('order', 'LinePrice')
+Order = get_model('order', 'Order')
+Partner = get_model('partner', 'Partner')
+Product = get_model('catalogue', 'Product')
+ProductAttributeValue = get_model('catalogue', 'ProductAttributeValue')
+ProductClass = get_model('catalogue', 'ProductClass')
+Source = get_model('payment', 'Source')
+StockRecord = get_model('partner', 'StockRecord')
+User = get_user_model()
+
+# Certificate types of the seats offered by each course, with their relative popularity
+# and the prices from which each course's price is drawn. Only some courses offer
+# professional seats.
+SEAT_TYPES = (
+    ('honor', 60, (D('0.00'),)),
+    ('verified', 35, (D('49.00'), D('99.00'), D('149.00'), D('249.00'))),
+    ('professional', 5, (D('500.00'), D('1000.00'))),
+)
+PROFESSIONAL_COURSE_FRACTION = 0.2
+# Relative frequency of orders with one, two and three lines
+LINE_COUNT_WEIGHTS = (90, 8, 2)
+# Relative frequency of each order status, with the status of the lines of such orders
+ORDER_STATUS_WEIGHTS = (
+    (ORDER.COMPLETE, LINE.COMPLETE, 95),
+    (ORDER.FULFILLMENT_ERROR, LINE.FULFILLMENT_SERVER_ERROR, 3),
+    (ORDER.OPEN, LINE.OPEN, 2),
+)
+SHIPPING_METHOD = 'No shipping required'
+SHIPPING_CODE = 'no-shipping-required'
+
+
+def _weighted_choice(rng, choices, weights):
+    point = rng.uniform(0, sum(weights))
+    for choice, weight in zip(choices, weights):
+        point -= weight
+        if point <= 0:
+            return choice
+    return choices[-1]
+
+
+def _next_id(model):
+    return (model.objects.aggregate(Max('id'))['id__max'] or 0) + 1
+
+
+class SyntheticDataset(object):
+    """Generates users, a catalogue of course seats, and orders and baskets for them, with bulk inserts.
+
+    Given the same seed, arguments and end date, the same data is generated. Rows are created
+    with explicit IDs, following the highest existing ID of each table, so that related rows
+    can be inserted in bulk without reading back the IDs assigned by the database. No other
+    process should write to the database during generation.
+
+    Orders are placed at evenly spaced times, with some jitter, over the `days` preceding
+    `end`. Users are skewed, so that a few users place many orders.
+
+    Arguments:
+        seed (int): Seed from which all random choices are made.
+        users (int): Number of users to create.
+        orders (int): Number of orders to place, each with a submitted basket.
+        open_baskets (int): Number of additional baskets left open.
+        courses (int): Number of courses whose seats are sold.
+        days (int): Number of days over which orders are placed.
+        end (datetime): Time at which the last order is placed.
+        prefix (unicode): Prefix of usernames, SKUs and course keys, distinguishing the data
+            from that generated with other prefixes.
+        batch_size (int): Number of users, or orders, inserted by each batch of queries.
+    """
+
+    def __init__(self, seed=0, users=1000, orders=5000, open_baskets=1000, courses=50, days=365, end=None,
+                 prefix=u'synthetic', batch_size=1000):
+        self.rng = random.Random(seed)
+        self.seed = seed
+        self.user_count = users
+        self.order_count = orders
+        self.open_basket_count = open_baskets
+        self.course_count = courses
+        self.days = days
+        self.end = end or timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        self.prefix = prefix
+        self.batch_size = batch_size
+        self.currency = settings.OSCAR_DEFAULT_CURRENCY
+        self.counts = OrderedDict()
+
+        # Populated by create_catalogue, as lists of (product, stockrecord) tuples for each course
+        self.seats = []
+        self.partner = None
+        self.first_user_id = None
+
+    def generate(self):
+        """Create all of the dataset's rows.
+
+        Returns:
+            OrderedDict: Number of rows created for each model, by model name (e.g., order.Line).
+        """
+        self.create_catalogue()
+        self.create_users()
+        self.create_orders()
+        self.create_open_baskets()
+        return self.counts
+
+    def _bulk_create(self, model, objs):
+        model.objects.bulk_create(objs, batch_size=self.batch_size)
+        opts = model._meta  # pylint: disable=protected-access
+        name = u'{}.{}'.format(opts.app_label, opts.object_name)
+        self.counts[name] = self.counts.get(name, 0) + len(objs)
+
+    @transaction.atomic
+    def create_catalogue(self):
+        """Create a parent product for each course, with a child product and stock record for each of its seats."""
+        self.partner, __ = Partner.objects.get_or_create(name=u'{} Partner'.format(self.prefix))
+        seat_class, __ = ProductClass.objects.get_or_create(
+            name='Seat', defaults={'track_stock': False, 'requires_shipping': False}
+        )
+        attributes = {
+            code: seat_class.attributes.get_or_create(code=code, defaults={'name': code, 'type': 'text'})[0]
+            for code in ('course_key', 'certificate_type')
+        }
+
+        product_id = _next_id(Product)
+        stockrecord_id = _next_id(StockRecord)
+        products, stockrecords, values = [], [], []
+
+        for index in xrange(self.course_count):
+            course_key = u'{prefix}X/Course{index}/{seed}'.format(prefix=self.prefix, index=index, seed=self.seed)
+            title = u'{prefix} Course {index}'.format(prefix=self.prefix, index=index)
+            course = Product(
+                id=product_id, structure=Product.PARENT, title=title, slug=slugify(title), product_class=seat_class
+            )
+            products.append(course)
+            product_id += 1
+
+            course_seats = []
+            for certificate_type, __, prices in SEAT_TYPES:
+                if certificate_type == 'professional' and self.rng.random() >= PROFESSIONAL_COURSE_FRACTION:
+                    continue
+
+                seat_title = u'Seat in {title} with {type} certificate'.format(title=title, type=certificate_type)
+                seat = Product(
+                    id=product_id, structure=Product.CHILD, parent=course, title=seat_title, slug=slugify(seat_title)
+                )
+                stockrecord = StockRecord(
+                    id=stockrecord_id,
+                    product=seat,
+                    partner=self.partner,
+                    partner_sku=u'{prefix}-{seed}-{index}-{type}'.format(
+                        prefix=self.prefix, seed=self.seed, index=index, type=certificate_type
+                    ),
+                    price_currency=self.currency,
+                    price_excl_tax=self.rng.choice(prices),
+                )
+                products.append(seat)
+                stockrecords.append(stockrecord)
+                values.append(ProductAttributeValue(
+                    attribute=attributes['course_key'], product=seat, value_text=course_key
+                ))
+                values.append(ProductAttributeValue(
+                    attribute=attributes['certificate_type'], product=seat, value_text=certificate_type
+                ))
+                course_seats.append((certificate_type, seat, stockrecord))
+                product_id += 1
+                stockrecord_id += 1
+
+            self.seats.append(course_seats)
+
+        self._bulk_create(Product, products)
+        self._bulk_create(StockRecord, stockrecords)
+        self._bulk_create(ProductAttributeValue, values)
+
+    def create_users(self):
+        """Create users, in batches."""
+        self.first_user_id = _next_id(User)
+        date_joined = self.end - datetime.timedelta(days=self.days)
+
+        for start in xrange(0, self.user_count, self.batch_size):
+            users = []
+            for index in xrange(start, min(start + self.batch_size, self.user_count)):
+                username = u'{prefix}-{seed}-{index}'.format(prefix=self.prefix, seed=self.seed, index=index)
+                users.append(User(
+                    id=self.first_user_id + index,
+                    username=username,
+                    email=u'{}@example.com'.format(username),
+                    password=UNUSABLE_PASSWORD_PREFIX,
+                    date_joined=date_joined,
+                ))
+
+            with transaction.atomic():
+                self._bulk_create(User, users)
+            logger.info(u"Created [%d] of [%d] users.", start + len(users), self.user_count)
+
+    def choose_user_id(self):
+        """Return the ID of a user, skewed towards the first users created so that some place many orders."""
+        return self.first_user_id + int(self.user_count * self.rng.random() ** 2)
+
+    def choose_seats(self):
+        """Return the (certificate type, product, stock record) tuples of the seats in a basket."""
+        line_count = _weighted_choice(self.rng, (1, 2, 3), LINE_COUNT_WEIGHTS)
+        courses = self.rng.sample(self.seats, min(line_count, len(self.seats)))
+
+        seats = []
+        for course_seats in courses:
+            offered_types = {certificate_type for certificate_type, __, __ in course_seats}
+            offered = [seat for seat in SEAT_TYPES if seat[0] in offered_types]
+            certificate_type = _weighted_choice(
+                self.rng, [seat[0] for seat in offered], [seat[1] for seat in offered]
+            )
+            seats.append(next(seat for seat in course_seats if seat[0] == certificate_type))
+        return seats
+
+    def build_basket(self, basket_id, owner_id, seats, status, date_submitted=None):
+        basket = Basket(id=basket_id, owner_id=owner_id, status=status, date_submitted=date_submitted)
+        lines = [
+            BasketLine(
+                basket=basket,
+                line_reference=u'{}_{}'.format(product.id, stockrecord.id),
+                product=product,
+                stockrecord=stockrecord,
+                price_currency=self.currency,
+                price_excl_tax=stockrecord.price_excl_tax,
+                price_incl_tax=stockrecord.price_excl_tax,
+            )
+            for __, product, stockrecord in seats
+        ]
+        return basket, lines
+
+    def create_orders(self):
+        """Create orders, with their submitted baskets, lines, line prices and payment sources, in batches."""
+        processor_name = get_processor_class(settings.PAYMENT_PROCESSORS[0]).NAME
+        source_type = source_types.get_or_create(processor_name)
+        statuses = [status[:2] for status in ORDER_STATUS_WEIGHTS]
+        status_weights = [status[2] for status in ORDER_STATUS_WEIGHTS]
+
+        start_time = self.end - datetime.timedelta(days=self.days)
+        interval = datetime.timedelta(days=self.days).total_seconds() / max(self.order_count, 1)
+
+        basket_id = _next_id(Basket)
+        order_id = _next_id(Order)
+        line_id = _next_id(Line)
+
+        for start in xrange(0, self.order_count, self.batch_size):
+            baskets, basket_lines, orders, lines, prices, sources = [], [], [], [], [], []
+
+            for index in xrange(start, min(start + self.batch_size, self.order_count)):
+                date_placed = start_time + datetime.timedelta(seconds=interval * (index + self.rng.random()))
+                seats = self.choose_seats()
+                order_status, line_status = _weighted_choice(self.rng, statuses, status_weights)
+
+                basket, new_basket_lines = self.build_basket(
+                    basket_id, self.choose_user_id(), seats, Basket.SUBMITTED, date_submitted=date_placed
+                )
+                baskets.append(basket)
+                basket_lines.extend(new_basket_lines)
+                basket_id += 1
+
+                total = sum(stockrecord.price_excl_tax for __, __, stockrecord in seats)
+                order = Order(
+                    id=order_id,
+                    number=OrderNumberGenerator.order_number(basket),
+                    basket=basket,
+                    user_id=basket.owner_id,
+                    currency=self.currency,
+                    total_incl_tax=total,
+                    total_excl_tax=total,
+                    shipping_method=SHIPPING_METHOD,
+                    shipping_code=SHIPPING_CODE,
+                    status=order_status,
+                    date_placed=date_placed,
+                    payment_processor=processor_name if total else None,
+                )
+                orders.append(order)
+                order_id += 1
+
+                for __, product, stockrecord in seats:
+                    price = stockrecord.price_excl_tax
+                    line = Line(
+                        id=line_id,
+                        order=order,
+                        partner=self.partner,
+                        partner_name=self.partner.name,
+                        partner_sku=stockrecord.partner_sku,
+                        stockrecord=stockrecord,
+                        product=product,
+                        title=product.title,
+                        line_price_incl_tax=price,
+                        line_price_excl_tax=price,
+                        line_price_before_discounts_incl_tax=price,
+                        line_price_before_discounts_excl_tax=price,
+                        unit_price_incl_tax=price,
+                        unit_price_excl_tax=price,
+                        status=line_status,
+                    )
+                    lines.append(line)
+                    prices.append(LinePrice(
+                        order=order, line=line, quantity=1, price_incl_tax=price, price_excl_tax=price
+                    ))
+                    line_id += 1
+
+                if total:
+                    sources.append(Source(
+                        order=order,
+                        source_type=source_type,
+                        currency=self.currency,
+                        amount_allocated=total,
+                        amount_debited=total,
+                        reference=u'{prefix}-{number}'.format(prefix=self.prefix, number=order.number),
+                    ))
+
+            with transaction.atomic():
+                self._bulk_create(Basket, baskets)
+                self._bulk_create(BasketLine, basket_lines)
+                self._bulk_create(Order, orders)
+                self._bulk_create(Line, lines)
+                self._bulk_create(LinePrice, prices)
+                self._bulk_create(Source, sources)
+            logger.info(u"Created [%d] of [%d] orders.", start + len(orders), self.order_count)
+
+    def create_open_baskets(self):
+        """Create baskets which are still open, as left behind by users who didn't complete checkout."""
+        basket_id = _next_id(Basket)
+
+        for start in xrange(0, self.open_basket_count, self.batch_size):
+            baskets, basket_lines = [], []
+            for __ in xrange(start, min(start + self.batch_size, self.open_basket_count)):
+                basket, new_basket_lines = self.build_basket(
+                    basket_id, self.choose_user_id(), self.choose_seats(), Basket.OPEN
+                )
+                baskets.append(basket)
+                basket_lines.extend(new_basket_lines)
+                basket_id += 1
+
+            with transaction.atomic():
+                self._bulk_create(Basket, baskets)
+                self._bulk_create(BasketLine, basket_lines)
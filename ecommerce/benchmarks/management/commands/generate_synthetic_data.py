@@ -0,0 +1,123 @@
+"""Fill the configured database with synthetic users, orders and baskets, for scale testing."""
+import datetime
+from optparse import make_option
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from ecommerce.benchmarks.dataset import SyntheticDataset
+
+
+class Command(BaseCommand):
+    help = 'Generate a deterministic, production-shaped dataset of users, course seats, orders and baskets.'
+    option_list = BaseCommand.option_list + (
+        make_option(
+            '--seed',
+            action='store',
+            type='int',
+            dest='seed',
+            default=0,
+            help='Seed from which the data is generated. The same seed and options generate the same data.'
+        ),
+        make_option(
+            '--users',
+            action='store',
+            type='int',
+            dest='users',
+            default=100000,
+            help='Number of users to create.'
+        ),
+        make_option(
+            '--orders',
+            action='store',
+            type='int',
+            dest='orders',
+            default=1000000,
+            help='Number of orders to create, each with a submitted basket.'
+        ),
+        make_option(
+            '--open-baskets',
+            action='store',
+            type='int',
+            dest='open_baskets',
+            default=100000,
+            help='Number of open baskets to create, in addition to those of orders.'
+        ),
+        make_option(
+            '--courses',
+            action='store',
+            type='int',
+            dest='courses',
+            default=500,
+            help='Number of courses whose seats are sold.'
+        ),
+        make_option(
+            '--days',
+            action='store',
+            type='int',
+            dest='days',
+            default=365,
+            help='Number of days over which orders are placed.'
+        ),
+        make_option(
+            '--end-date',
+            action='store',
+            dest='end_date',
+            default=None,
+            help='Date (YYYY-MM-DD), in UTC, on which the last order is placed. Defaults to today.'
+        ),
+        make_option(
+            '--prefix',
+            action='store',
+            dest='prefix',
+            default='synthetic',
+            help='Prefix of generated usernames, SKUs and course keys. Use a different prefix for each run.'
+        ),
+        make_option(
+            '--batch-size',
+            action='store',
+            type='int',
+            dest='batch_size',
+            default=1000,
+            help='Number of users or orders inserted by each batch of queries.'
+        ),
+    )
+
+    def handle(self, *args, **options):
+        end = None
+        if options['end_date']:
+            try:
+                end = datetime.datetime.strptime(options['end_date'], '%Y-%m-%d').replace(tzinfo=timezone.utc)
+            except ValueError:
+                raise CommandError(u"Invalid end date [{}]. Use the format YYYY-MM-DD.".format(options['end_date']))
+
+        counts = [options[name] for name in ('users', 'orders', 'open_baskets', 'courses', 'days', 'batch_size')]
+        if any(count < 0 for count in counts) or options['batch_size'] < 1:
+            raise CommandError(u"Counts must not be negative, and the batch size must be positive.")
+        if options['courses'] < 1 and (options['orders'] or options['open_baskets']):
+            raise CommandError(u"At least one course is required to create orders or baskets.")
+        if options['users'] < 1 and (options['orders'] or options['open_baskets']):
+            raise CommandError(u"At least one user is required to create orders or baskets.")
+
+        dataset = SyntheticDataset(
+            seed=options['seed'],
+            users=options['users'],
+            orders=options['orders'],
+            open_baskets=options['open_baskets'],
+            courses=options['courses'],
+            days=options['days'],
+            end=end,
+            prefix=options['prefix'],
+            batch_size=options['batch_size'],
+        )
+
+        start = time.time()
+        created = dataset.generate()
+        elapsed = time.time() - start
+
+        for name, count in created.items():
+            self.stdout.write(u"{name}: {count} rows".format(name=name, count=count))
+        self.stdout.write(u"Generated dataset with seed {seed} in {elapsed:.1f} seconds.".format(
+            seed=options['seed'], elapsed=elapsed
+        ))
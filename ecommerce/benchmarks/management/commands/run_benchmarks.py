@@ -0,0 +1,136 @@
+"""Run benchmarks against the configured database, discarding any data they create."""
+from collections import OrderedDict
+import json
+from optparse import make_option
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from ecommerce.benchmarks.api import CheckoutApiBenchmark
+from ecommerce.benchmarks.boot import BootTimeBenchmark
+from ecommerce.benchmarks.checkout import FreeOrderPlacementBenchmark
+from ecommerce.benchmarks.serialization import OrderSerializationBenchmark
+
+
+BENCHMARKS = (
+    OrderSerializationBenchmark,
+    FreeOrderPlacementBenchmark,
+    CheckoutApiBenchmark,
+    BootTimeBenchmark,
+)
+
+
+class Command(BaseCommand):
+    args = '[benchmark_name ...]'
+    help = 'Measure the throughput of performance-sensitive code paths. Runs all benchmarks if none are named.'
+    option_list = BaseCommand.option_list + (
+        make_option(
+            '--iterations',
+            action='store',
+            type='int',
+            dest='iterations',
+            default=100,
+            help='Number of timed runs of each benchmark case.'
+        ),
+        make_option(
+            '--lms-latency',
+            action='store',
+            type='float',
+            dest='lms_latency',
+            default=0.0,
+            help='Number of seconds by which the stub LMS delays each response.'
+        ),
+        make_option(
+            '--lms-error-rate',
+            action='store',
+            type='float',
+            dest='lms_error_rate',
+            default=0.0,
+            help='Fraction, between 0 and 1, of requests to which the stub LMS responds with an error.'
+        ),
+        make_option(
+            '--save-baseline',
+            action='store',
+            dest='save_baseline',
+            default=None,
+            help='Path of a JSON file to which measurements are saved, for later comparison.'
+        ),
+        make_option(
+            '--compare',
+            action='store',
+            dest='compare',
+            default=None,
+            help='Path of a JSON file, saved with --save-baseline, against which measurements are compared.'
+        ),
+    )
+
+    def handle(self, *args, **options):
+        available = {benchmark.name: benchmark for benchmark in BENCHMARKS}
+        names = args or [benchmark.name for benchmark in BENCHMARKS]
+
+        unknown = [name for name in names if name not in available]
+        if unknown:
+            raise CommandError(
+                'Unknown benchmark(s): {unknown}. Available: {available}.'.format(
+                    unknown=', '.join(unknown),
+                    available=', '.join(sorted(available))
+                )
+            )
+
+        baseline = {}
+        if options['compare']:
+            with open(options['compare']) as f:
+                baseline = json.load(f)
+
+        results = OrderedDict()
+        for name in names:
+            benchmark = available[name](lms_latency=options['lms_latency'], lms_error_rate=options['lms_error_rate'])
+            self.stdout.write(u'{name}: {description}'.format(name=name, description=benchmark.description))
+
+            with transaction.atomic():
+                measurements = benchmark.run(options['iterations'])
+                transaction.set_rollback(True)
+
+            results[name] = [measurement.as_dict() for measurement in measurements]
+            baseline_results = {result['label']: result for result in baseline.get(name, [])}
+
+            for measurement in measurements:
+                self.stdout.write(
+                    u'  {label:<32} {rate:>12.1f} {unit}/s  p50 {p50:.2f} ms  p95 {p95:.2f} ms  '
+                    u'p99 {p99:.2f} ms  {queries} queries/run'.format(
+                        label=measurement.label,
+                        rate=measurement.units_per_second,
+                        unit=benchmark.unit,
+                        p50=measurement.percentile(50) * 1000,
+                        p95=measurement.percentile(95) * 1000,
+                        p99=measurement.percentile(99) * 1000,
+                        queries=measurement.queries,
+                    )
+                )
+
+                previous = baseline_results.get(measurement.label)
+                if previous:
+                    self.stdout.write(self.format_comparison(measurement.as_dict(), previous))
+
+        if options['save_baseline']:
+            with open(options['save_baseline'], 'w') as f:
+                json.dump(results, f, indent=2)
+
+    def format_comparison(self, current, previous):
+        """Describe the change in a case's throughput, latency and queries since the baseline was saved."""
+        def change(key):
+            if not previous[key]:
+                return 0.0
+            return (current[key] - previous[key]) / previous[key] * 100
+
+        return (
+            u'  {blank:<32} {rate:>+11.1f}% rate  p50 {p50:+.1f}%  p95 {p95:+.1f}%  p99 {p99:+.1f}%  '
+            u'{queries:+d} queries/run vs. baseline'
+        ).format(
+            blank='',
+            rate=change('units_per_second'),
+            p50=change('p50_ms'),
+            p95=change('p95_ms'),
+            p99=change('p99_ms'),
+            queries=current['queries_per_run'] - previous['queries_per_run'],
+        )
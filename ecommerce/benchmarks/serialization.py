@@ -0,0 +1,43 @@
+"""Benchmarks for API serializers."""
+from collections import OrderedDict
+from decimal import Decimal as D
+
+from oscar.core.loading import get_model
+from oscar.test import factories
+
+from ecommerce.benchmarks.base import Benchmark
+from ecommerce.extensions.api.serializers import CompiledOrderSerializer, OrderSerializer
+
+
+Order = get_model('order', 'Order')
+
+
+class OrderSerializationBenchmark(Benchmark):
+    """Compare the throughput of the DRF and compiled order serializers.
+
+    Orders are fully prefetched before measurement begins, so that only serialization is timed.
+    """
+    name = 'order_serialization'
+    description = 'Serialize a page of orders with nested lines, sources and billing addresses.'
+    units_per_run = 20
+    unit = 'orders'
+
+    def setUp(self):
+        user = factories.UserFactory()
+        source_type = factories.SourceTypeFactory()
+        for __ in xrange(self.units_per_run):
+            order = factories.create_order(user=user, billing_address=factories.BillingAddressFactory())
+            source = factories.SourceFactory(order=order, source_type=source_type, amount_allocated=D('10.00'))
+            factories.TransactionFactory(source=source, txn_type='Debit', amount=D('10.00'))
+
+        self.orders = list(
+            user.orders.select_related('billing_address__country').prefetch_related(
+                'lines__attributes', 'sources__source_type', 'sources__transactions'
+            )
+        )
+
+    def get_cases(self):
+        return OrderedDict([
+            ('OrderSerializer', lambda: OrderSerializer(self.orders, many=True).data),
+            ('CompiledOrderSerializer', lambda: CompiledOrderSerializer(self.orders, many=True).data),
+        ])
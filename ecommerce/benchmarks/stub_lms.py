@@ -0,0 +1,123 @@
+"""A local stand-in for the LMS, against which benchmarks can make outbound calls."""
+from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+import json
+import random
+import re
+from SocketServer import ThreadingMixIn
+import threading
+import time
+
+
+ENROLLMENT_PATH = '/api/enrollment/v1/enrollment'
+HEARTBEAT_PATH = '/heartbeat'
+OAUTH2_PATH = '/oauth2'
+
+
+class StubLmsRequestHandler(BaseHTTPRequestHandler):
+    """Responds to enrollment, heartbeat and access token requests as the LMS would, if all is well.
+
+    Each response is delayed by the server's latency. A fraction of responses, given by the
+    server's error rate, are replaced by errors.
+    """
+    ACCESS_TOKEN_PATH = re.compile(r'^{}/access_token/(?P<token>[^/]+)/$'.format(OAUTH2_PATH))
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        if self.path == HEARTBEAT_PATH:
+            self.respond(200, {})
+            return
+
+        match = self.ACCESS_TOKEN_PATH.match(self.path)
+        if match:
+            # Tokens are the usernames of the users to whom they were issued.
+            self.respond(200, {'username': match.group('token'), 'scope': 'read write', 'expires_in': 3600})
+            return
+
+        self.respond(404, {'message': 'Not found.'})
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        body = self.rfile.read(int(self.headers.getheader('Content-Length') or 0))
+        if self.path != ENROLLMENT_PATH:
+            self.respond(404, {'message': 'Not found.'})
+            return
+
+        data = json.loads(body)
+        self.respond(200, {
+            'user': data.get('user'),
+            'mode': data.get('mode'),
+            'is_active': True,
+            'course_details': data.get('course_details'),
+        })
+
+    def respond(self, status, data):
+        self.server.stub.simulate_latency()
+        if self.server.stub.should_fail():
+            status, data = 500, {'message': 'Simulated LMS error.'}
+
+        content = json.dumps(data)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+    def __init__(self, server_address, handler_class, stub):
+        HTTPServer.__init__(self, server_address, handler_class)
+        self.stub = stub
+
+
+class StubLmsServer(object):
+    """Serves a stub LMS from a background thread, on a free local port.
+
+    Arguments:
+        latency (float): Number of seconds by which each response is delayed.
+        error_rate (float): Fraction, between 0 and 1, of requests answered with HTTP 500.
+        seed (int): Seed determining which requests fail.
+
+    Example:
+        >>> with StubLmsServer(latency=0.05) as lms:
+        ...     requests.get(lms.url + HEARTBEAT_PATH)
+    """
+
+    def __init__(self, latency=0.0, error_rate=0.0, seed=None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return 'http://{host}:{port}'.format(host=host, port=port)
+
+    def start(self):
+        self._server = _ThreadingHTTPServer(('127.0.0.1', 0), StubLmsRequestHandler, self)
+        thread = threading.Thread(target=self._server.serve_forever, kwargs={'poll_interval': 0.1}, name='stub-lms')
+        thread.daemon = True
+        thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def simulate_latency(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def should_fail(self):
+        with self._lock:
+            return self._random.random() < self.error_rate
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
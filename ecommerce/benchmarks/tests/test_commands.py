@@ -0,0 +1,117 @@
+"""Tests for the benchmark management commands."""
+import json
+import os
+import shutil
+from StringIO import StringIO
+import tempfile
+
+from django.core.management import call_command, CommandError
+from django.test import TestCase
+import mock
+from oscar.core.loading import get_model
+
+
+Basket = get_model('basket', 'Basket')
+Order = get_model('order', 'Order')
+
+
+class RunBenchmarksCommandTests(TestCase):
+    def test_run_benchmark(self):
+        """The command should report a measurement for each case, discarding benchmark data."""
+        out = StringIO()
+        call_command('run_benchmarks', 'order_serialization', iterations=2, stdout=out)
+
+        output = out.getvalue()
+        self.assertIn('OrderSerializer', output)
+        self.assertIn('CompiledOrderSerializer', output)
+        self.assertFalse(Order.objects.exists())
+
+    def test_unknown_benchmark(self):
+        """The command should fail if asked to run a benchmark which doesn't exist."""
+        with self.assertRaises(CommandError):
+            call_command('run_benchmarks', 'not-a-benchmark')
+
+    def test_checkout_api_benchmark(self):
+        """The command should drive each API endpoint, reporting the queries made by each request."""
+        out = StringIO()
+        call_command('run_benchmarks', 'checkout_api', iterations=1, stdout=out)
+
+        output = out.getvalue()
+        for label in ('v1 create order (free)', 'v2 create basket (paid)', 'v2 fulfill order'):
+            self.assertIn(label, output)
+        self.assertNotIn(' 0 queries/run', output)
+        self.assertFalse(Order.objects.exists())
+
+    def test_baseline(self):
+        """The command should save measurements, and compare later measurements against them."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'baseline.json')
+
+        call_command('run_benchmarks', 'order_serialization', iterations=2, save_baseline=path, stdout=StringIO())
+        with open(path) as f:
+            baseline = json.load(f)
+        self.assertEqual(
+            [result['label'] for result in baseline['order_serialization']],
+            ['OrderSerializer', 'CompiledOrderSerializer']
+        )
+
+        out = StringIO()
+        call_command('run_benchmarks', 'order_serialization', iterations=2, compare=path, stdout=out)
+        self.assertEqual(out.getvalue().count('vs. baseline'), 2)
+
+    def test_boot_time_benchmark(self):
+        """The command should measure the time taken to boot, limiting the number of boots."""
+        out = StringIO()
+        with mock.patch('ecommerce.importtime.profile_boot') as profile_boot:
+            call_command('run_benchmarks', 'boot_time', iterations=100, stdout=out)
+
+        self.assertIn('worker boot with URLconf', out.getvalue())
+        # Each case is run once to warm up, then up to 10 times.
+        self.assertEqual(profile_boot.call_count, 22)
+
+
+class GenerateSyntheticDataCommandTests(TestCase):
+    def generate(self, prefix, seed=1):
+        out = StringIO()
+        call_command(
+            'generate_synthetic_data', seed=seed, users=10, orders=30, open_baskets=5, courses=4, prefix=prefix,
+            batch_size=7, end_date='2015-06-01', stdout=out
+        )
+        orders = Order.objects.filter(user__username__startswith=prefix).order_by('id')
+        return out.getvalue(), [
+            (order.user.username[len(prefix):], order.status, order.total_incl_tax, order.date_placed,
+             order.lines.count(), order.sources.count())
+            for order in orders
+        ]
+
+    def test_generate(self):
+        """The command should create the requested number of rows, consistently with one another."""
+        output, orders = self.generate('first')
+
+        self.assertIn('order.Order: 30 rows', output)
+        self.assertIn('user.User: 10 rows', output)
+        self.assertEqual(len(orders), 30)
+        self.assertEqual(Basket.objects.filter(status=Basket.OPEN).count(), 5)
+        self.assertEqual(Basket.objects.filter(status=Basket.SUBMITTED).count(), 30)
+        for order in Order.objects.all():
+            self.assertEqual(order.total_incl_tax, sum(line.line_price_incl_tax for line in order.lines.all()))
+            self.assertEqual(order.lines.count(), order.basket.lines.count())
+            self.assertEqual(order.sources.exists(), order.total_incl_tax > 0)
+
+    def test_deterministic(self):
+        """The command should generate the same data from the same seed, and different data from others."""
+        __, first = self.generate('first')
+        __, second = self.generate('second')
+        __, third = self.generate('third', seed=2)
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, third)
+
+    def test_invalid_options(self):
+        """The command should fail if given an invalid end date, or no courses from which to order."""
+        with self.assertRaises(CommandError):
+            call_command('generate_synthetic_data', end_date='yesterday')
+
+        with self.assertRaises(CommandError):
+            call_command('generate_synthetic_data', courses=0)
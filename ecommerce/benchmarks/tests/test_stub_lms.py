@@ -0,0 +1,29 @@
+"""Tests of the stub LMS."""
+import json
+
+from django.test import TestCase
+import requests
+
+from ecommerce.benchmarks.stub_lms import ENROLLMENT_PATH, HEARTBEAT_PATH, OAUTH2_PATH, StubLmsServer
+
+
+class StubLmsServerTests(TestCase):
+    def test_responses(self):
+        """The stub should respond to enrollment, heartbeat and access token requests."""
+        with StubLmsServer() as lms:
+            data = {'user': 'saul', 'mode': 'honor', 'course_details': {'course_id': 'edX/DemoX/Demo_Course'}}
+            response = requests.post(lms.url + ENROLLMENT_PATH, data=json.dumps(data))
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()['user'], 'saul')
+
+            self.assertEqual(requests.get(lms.url + HEARTBEAT_PATH).status_code, 200)
+
+            response = requests.get('{}{}/access_token/saul/'.format(lms.url, OAUTH2_PATH))
+            self.assertEqual(response.json()['username'], 'saul')
+
+            self.assertEqual(requests.get(lms.url + '/other').status_code, 404)
+
+    def test_errors(self):
+        """The stub should respond to the configured fraction of requests with errors."""
+        with StubLmsServer(error_rate=1) as lms:
+            self.assertEqual(requests.get(lms.url + HEARTBEAT_PATH).status_code, 500)
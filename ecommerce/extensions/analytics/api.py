@@ -0,0 +1,69 @@
+"""Functions recording raw analytics events for later rollup."""
+from oscar.core.loading import get_model
+
+
+AnalyticsEvent = get_model('analytics', 'AnalyticsEvent')
+
+
+def _get_user_id(user):
+    return user.id if user is not None and user.is_authenticated() else None
+
+
+def record_product_view(product, user):
+    """Record a view of the given product.
+
+    Arguments:
+        product (Product): Product which was viewed.
+        user (User): User who viewed the product. May be anonymous.
+    """
+    return AnalyticsEvent.objects.create(
+        event_type=AnalyticsEvent.PRODUCT_VIEW, product_id=product.id, user_id=_get_user_id(user)
+    )
+
+
+def record_basket_addition(product, user):
+    """Record the addition of the given product to a basket.
+
+    Arguments:
+        product (Product): Product which was added.
+        user (User): User who added the product. May be anonymous.
+    """
+    return AnalyticsEvent.objects.create(
+        event_type=AnalyticsEvent.BASKET_ADDITION, product_id=product.id, user_id=_get_user_id(user)
+    )
+
+
+def record_basket_additions(products, user):
+    """Record the addition of each of the given products to a basket, with a single query.
+
+    Arguments:
+        products (list of Product): Products which were added.
+        user (User): User who added the products. May be anonymous.
+    """
+    user_id = _get_user_id(user)
+    AnalyticsEvent.objects.bulk_create([
+        AnalyticsEvent(event_type=AnalyticsEvent.BASKET_ADDITION, product_id=product.id, user_id=user_id)
+        for product in products
+    ])
+
+
+def record_order(order):
+    """Record the placement of the given order, and the purchase of each of its lines, with a single query.
+
+    Arguments:
+        order (Order): Order which was placed.
+    """
+    user_id = _get_user_id(order.user)
+    events = [
+        AnalyticsEvent(
+            event_type=AnalyticsEvent.PURCHASE, product_id=line.product_id, user_id=user_id, quantity=line.quantity
+        )
+        for line in order.lines.all()
+        if line.product_id is not None
+    ]
+    if user_id is not None:
+        events.append(AnalyticsEvent(
+            event_type=AnalyticsEvent.ORDER, user_id=user_id, quantity=order.num_items, amount=order.total_incl_tax
+        ))
+
+    AnalyticsEvent.objects.bulk_create(events)
@@ -1,4 +1,3 @@
-import analytics
 from django.conf import settings
 from oscar.apps.analytics import config
 
@@ -9,7 +8,13 @@ class AnalyticsConfig(config.AnalyticsConfig):
     def ready(self):
         if settings.INSTALL_DEFAULT_ANALYTICS_RECEIVERS:
             from oscar.apps.analytics import receivers  # noqa pylint: disable=unused-variable
+        elif settings.RECORD_ANALYTICS_EVENTS:
+            from ecommerce.extensions.analytics import receivers  # noqa pylint: disable=unused-variable
 
-        # Initialize Segment
-        analytics.write_key = settings.SEGMENT_KEY
-        analytics.debug = settings.DEBUG
+        if settings.SEGMENT_KEY:
+            from ecommerce.extensions.analytics import tracking  # noqa pylint: disable=unused-variable
+
+            # Initialize Segment. The client is only imported when it's used, since it's slow to import.
+            import analytics
+            analytics.write_key = settings.SEGMENT_KEY
+            analytics.debug = settings.DEBUG
@@ -0,0 +1,234 @@
+"""Non-blocking emission of events to Segment."""
+import atexit
+from datetime import datetime
+import logging
+import os
+import threading
+import time
+from uuid import uuid4
+
+from analytics.request import post
+from analytics.version import VERSION
+from dateutil.tz import tzutc
+from django.conf import settings
+from django.utils.six.moves import queue  # pylint: disable=import-error
+
+from ecommerce import metrics
+
+
+logger = logging.getLogger(__name__)
+
+EVENTS = metrics.Counter('ecommerce_segment_events_total', 'Events emitted to Segment.', ('outcome',))
+QUEUE_DEPTH = metrics.Gauge('ecommerce_segment_queue_depth', 'Events awaiting sending to Segment.')
+LATENCY = metrics.Histogram(
+    'ecommerce_segment_latency_seconds', 'Time from queuing events to their acknowledgement by Segment.'
+)
+
+
+class SegmentEmitter(object):
+    """Emits events to Segment in batches, from a background thread.
+
+    Emitting an event only adds it to a bounded in-memory queue. If the queue is full,
+    because Segment is slow or unavailable, the event is dropped rather than blocking the
+    caller. A background thread sends queued events in batches; events queued while a batch
+    is being sent are sent together in the next batch. Under gevent, whose monkey-patching
+    makes `threading` primitives cooperative, the thread is a greenlet.
+
+    The thread is started by the first event emitted in each process, so emitters created
+    before a server forks its workers operate in each worker. Events still queued when a
+    process exits are flushed, for up to `shutdown_timeout` seconds.
+
+    The emitter's counters, queue depth and latency are exposed as metrics, as well as by `stats()`.
+
+    Arguments:
+        write_key (str): Write key of the Segment project to which events are sent.
+        max_queue_size (int): Maximum number of events awaiting sending.
+        batch_size (int): Maximum number of events sent by a single request.
+        shutdown_timeout (float): Maximum number of seconds for which to flush events at exit.
+        send (callable): Function which sends a batch of events to Segment, given the write key
+            and a `batch` keyword argument.
+    """
+    COUNTERS = ('queued', 'sent', 'dropped', 'failed')
+
+    def __init__(self, write_key, max_queue_size=10000, batch_size=100, shutdown_timeout=5, send=post):
+        self.write_key = write_key
+        self.batch_size = batch_size
+        self.shutdown_timeout = shutdown_timeout
+        self._send = send
+        self._queue = queue.Queue(max_queue_size)
+        self._lock = threading.Lock()
+        self._pid = None
+        self._counters = dict.fromkeys(self.COUNTERS, 0)
+        self._total_latency = 0.0
+        self._max_latency = 0.0
+
+    def track(self, user_id, event, properties=None):
+        """Queue a track call, without blocking.
+
+        Arguments:
+            user_id: ID of the user who performed the action.
+            event (str): Name of the action (e.g., 'Completed Order').
+            properties (dict): JSON-serializable properties of the action.
+
+        Returns:
+            bool: True if the event was queued, False if it was dropped because the queue was full.
+        """
+        self._ensure_started()
+
+        message = {
+            'type': 'track',
+            'userId': user_id,
+            'event': event,
+            'properties': properties or {},
+            'timestamp': datetime.now(tzutc()).isoformat(),
+            'messageId': str(uuid4()),
+            'context': {'library': {'name': 'analytics-python', 'version': VERSION}},
+        }
+
+        try:
+            self._queue.put_nowait((time.time(), message))
+        except queue.Full:
+            self._increment('dropped')
+            logger.warning(u"Segment event queue is full. Dropped event [%s].", event)
+            return False
+
+        self._increment('queued')
+        QUEUE_DEPTH.inc()
+        return True
+
+    def flush(self, timeout=None):
+        """Block until all queued events have been sent, or the timeout expires.
+
+        Arguments:
+            timeout (float): Maximum number of seconds to wait. Waits indefinitely if None.
+
+        Returns:
+            bool: True if all events were sent (or failed to send), False if the timeout expired.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+
+        return True
+
+    def shutdown(self):
+        """Flush queued events before the process exits."""
+        if not self.flush(self.shutdown_timeout):
+            logger.warning(
+                u"Timed out flushing Segment events at exit. [%d] events were not sent.", self._queue.qsize()
+            )
+
+    def stats(self):
+        """Return the emitter's counters, queue depth, and the latency of events sent.
+
+        Latency is measured from when an event is queued to when it is acknowledged by Segment.
+
+        Returns:
+            dict
+        """
+        with self._lock:
+            stats = dict(self._counters)
+            stats['max_latency'] = self._max_latency
+            stats['mean_latency'] = self._total_latency / stats['sent'] if stats['sent'] else 0.0
+
+        stats['queue_depth'] = self._queue.qsize()
+        return stats
+
+    def _increment(self, counter, count=1):
+        with self._lock:
+            self._counters[counter] += count
+        EVENTS.inc(count, outcome=counter)
+
+    def _ensure_started(self):
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+
+        with self._lock:
+            if self._pid != pid:
+                thread = threading.Thread(target=self._run, name='segment-emitter')
+                thread.daemon = True
+                thread.start()
+                atexit.register(self.shutdown)
+                self._pid = pid
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            QUEUE_DEPTH.dec(len(batch))
+            try:
+                self._upload(batch)
+            finally:
+                for __ in batch:
+                    self._queue.task_done()
+
+    def _upload(self, batch):
+        queued_at, messages = zip(*batch)
+        try:
+            self._send(self.write_key, batch=list(messages))
+        except Exception:  # pylint: disable=broad-except
+            logger.exception(u"Failed to send [%d] events to Segment.", len(messages))
+            self._increment('failed', len(messages))
+            return
+
+        now = time.time()
+        latencies = [now - timestamp for timestamp in queued_at]
+        with self._lock:
+            self._counters['sent'] += len(messages)
+            self._total_latency += sum(latencies)
+            self._max_latency = max(self._max_latency, max(latencies))
+
+        EVENTS.inc(len(messages), outcome='sent')
+        for latency in latencies:
+            LATENCY.observe(latency)
+
+
+_emitter = None
+_emitter_lock = threading.Lock()
+
+
+def get_emitter():
+    """Return this process's emitter, configured by the SEGMENT_* settings.
+
+    Returns:
+        SegmentEmitter: The emitter, or None if SEGMENT_KEY is not set.
+    """
+    global _emitter  # pylint: disable=global-statement
+
+    if not settings.SEGMENT_KEY:
+        return None
+
+    if _emitter is None:
+        with _emitter_lock:
+            if _emitter is None:
+                _emitter = SegmentEmitter(
+                    settings.SEGMENT_KEY,
+                    max_queue_size=settings.SEGMENT_MAX_QUEUE_SIZE,
+                    batch_size=settings.SEGMENT_BATCH_SIZE,
+                    shutdown_timeout=settings.SEGMENT_SHUTDOWN_TIMEOUT,
+                )
+
+    return _emitter
+
+
+def track(user_id, event, properties=None):
+    """Queue a track call on this process's emitter, if Segment is configured.
+
+    Returns:
+        bool: True if the event was queued.
+    """
+    emitter = get_emitter()
+    if emitter is None:
+        return False
+    return emitter.track(user_id, event, properties)
@@ -0,0 +1,149 @@
+"""Fold raw analytics events into product and user records."""
+from collections import defaultdict
+import logging
+from optparse import make_option
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, Max, Sum
+from oscar.core.loading import get_model
+
+
+logger = logging.getLogger(__name__)
+
+AnalyticsEvent = get_model('analytics', 'AnalyticsEvent')
+ProductRecord = get_model('analytics', 'ProductRecord')
+UserRecord = get_model('analytics', 'UserRecord')
+
+
+class Command(BaseCommand):
+    help = 'Fold raw analytics events, in batches, into product and user records.'
+
+    option_list = BaseCommand.option_list + (
+        make_option(
+            '--batch-size',
+            action='store',
+            dest='batch_size',
+            type='int',
+            default=1000,
+            help='Maximum number of events to roll up in a single transaction.'
+        ),
+    )
+
+    # Fields which are set to the latest value, rather than incremented
+    ASSIGNED_FIELDS = ('date_last_order',)
+
+    def handle(self, *args, **options):
+        rolled_up = 0
+        while True:
+            count = self.rollup(options['batch_size'])
+            rolled_up += count
+            if count < options['batch_size']:
+                break
+
+        logger.info(u"Rolled up [%d] analytics events", rolled_up)
+
+    def rollup(self, batch_size):
+        """Fold a batch of events into product and user records, then delete them.
+
+        Returns:
+            int: The number of events rolled up.
+        """
+        with transaction.atomic():
+            # Locking the batch prevents concurrent rollups from counting the same events.
+            events = AnalyticsEvent.objects.select_for_update().order_by('id')
+            ids = list(events.values_list('id', flat=True)[:batch_size])
+            if not ids:
+                return 0
+
+            events = AnalyticsEvent.objects.filter(id__in=ids)
+            self.update_records(ProductRecord, 'product', self.get_product_increments(events))
+            self.update_records(UserRecord, 'user', self.get_user_increments(events))
+            events.delete()
+
+        return len(ids)
+
+    def get_product_increments(self, events):
+        """Aggregate the given events by product.
+
+        Returns:
+            dict: Mapping of product IDs to dicts of ProductRecord field increments.
+        """
+        increments = defaultdict(dict)
+        rows = events.exclude(product_id=None).values('event_type', 'product_id').annotate(
+            count=Count('id'), quantity=Sum('quantity')
+        )
+        for row in rows:
+            values = increments[row['product_id']]
+            if row['event_type'] == AnalyticsEvent.PRODUCT_VIEW:
+                values['num_views'] = row['count']
+            elif row['event_type'] == AnalyticsEvent.BASKET_ADDITION:
+                values['num_basket_additions'] = row['count']
+            elif row['event_type'] == AnalyticsEvent.PURCHASE:
+                values['num_purchases'] = row['quantity']
+
+        return increments
+
+    def get_user_increments(self, events):
+        """Aggregate the given events by user.
+
+        Returns:
+            dict: Mapping of user IDs to dicts of UserRecord field increments.
+        """
+        increments = defaultdict(dict)
+        rows = events.exclude(user_id=None).values('event_type', 'user_id').annotate(
+            count=Count('id'), quantity=Sum('quantity'), amount=Sum('amount'), last_created=Max('created')
+        )
+        for row in rows:
+            values = increments[row['user_id']]
+            if row['event_type'] == AnalyticsEvent.PRODUCT_VIEW:
+                values['num_product_views'] = row['count']
+            elif row['event_type'] == AnalyticsEvent.BASKET_ADDITION:
+                values['num_basket_additions'] = row['count']
+            elif row['event_type'] == AnalyticsEvent.PURCHASE:
+                values['num_order_lines'] = row['count']
+                values['num_order_items'] = row['quantity']
+            elif row['event_type'] == AnalyticsEvent.ORDER:
+                values['num_orders'] = row['count']
+                values['total_spent'] = row['amount']
+                values['date_last_order'] = row['last_created']
+
+        return increments
+
+    def update_records(self, model, field_name, increments):
+        """Apply the given increments to records, creating any which don't exist.
+
+        Records receiving identical increments are updated by a single
+        `UPDATE ... SET x = x + n` statement, so no record is read or locked beforehand.
+
+        Arguments:
+            model (Model): ProductRecord or UserRecord.
+            field_name (str): Name of the model's one-to-one field.
+            increments (dict): Mapping of IDs of related objects to dicts of field increments.
+        """
+        if not increments:
+            return
+
+        field = model._meta.get_field(field_name)  # pylint: disable=protected-access
+        lookup = '{}__in'.format(field.attname)
+
+        existing = set(
+            model.objects.filter(**{lookup: list(increments)}).order_by().values_list(field.attname, flat=True)
+        )
+        missing = [pk for pk in increments if pk not in existing]
+        if missing:
+            # Events may refer to products or users deleted since they were recorded.
+            related = field.rel.to._default_manager  # pylint: disable=protected-access
+            missing = related.filter(pk__in=missing).values_list('pk', flat=True)
+            model.objects.bulk_create([model(**dict(increments[pk], **{field.attname: pk})) for pk in missing])
+
+        groups = defaultdict(list)
+        for pk in existing:
+            groups[tuple(sorted(increments[pk].items()))].append(pk)
+
+        for values, pks in groups.items():
+            updates = {
+                name: value if name in self.ASSIGNED_FIELDS else F(name) + value
+                for name, value in values
+            }
+            model.objects.filter(**{lookup: pks}).update(**updates)
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0002_auto_20140827_1705'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalyticsEvent',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('event_type', models.CharField(max_length=32, verbose_name='Event Type')),
+                ('product_id', models.PositiveIntegerField(null=True)),
+                ('user_id', models.PositiveIntegerField(null=True)),
+                ('quantity', models.PositiveIntegerField(default=1)),
+                ('amount', models.DecimalField(null=True, max_digits=12, decimal_places=2)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+            },
+            bases=(models.Model,),
+        ),
+    ]
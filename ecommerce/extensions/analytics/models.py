@@ -1 +1,31 @@
-from oscar.apps.analytics.models import *  # pragma: no cover pylint: disable=wildcard-import
+from django.db import models
+from django.utils.translation import ugettext_lazy as _
+
+
+class AnalyticsEvent(models.Model):
+    """A raw analytics event, awaiting rollup into product and user records.
+
+    Events are only ever inserted by the request path, which takes no locks on the
+    records they describe. The rollup_analytics_events command periodically folds
+    them into ProductRecord and UserRecord, then deletes them.
+
+    Products and users are referenced by ID rather than by foreign key; on MySQL,
+    checking a foreign key constraint takes a shared lock on the referenced row.
+    """
+    PRODUCT_VIEW = 'product_view'
+    BASKET_ADDITION = 'basket_addition'
+    # One event per line of a placed order
+    PURCHASE = 'purchase'
+    # One event per placed order
+    ORDER = 'order'
+
+    event_type = models.CharField(_("Event Type"), max_length=32)
+    product_id = models.PositiveIntegerField(null=True)
+    user_id = models.PositiveIntegerField(null=True)
+    quantity = models.PositiveIntegerField(default=1)
+    # Total of an order, including tax; only recorded for order events
+    amount = models.DecimalField(decimal_places=2, max_digits=12, null=True)
+    created = models.DateTimeField(auto_now_add=True)
+
+
+from oscar.apps.analytics.models import *  # noqa pylint: disable=wildcard-import,unused-wildcard-import
@@ -0,0 +1,27 @@
+"""Receivers recording raw analytics events, as cheap replacements for Oscar's analytics receivers.
+
+Oscar's receivers update ProductRecord and UserRecord as each event occurs, taking row
+locks which serialize concurrent checkouts of the same product. These receivers only
+insert events, which the rollup_analytics_events command folds into those records.
+"""
+from django.dispatch import receiver
+from oscar.apps.basket.signals import basket_addition
+from oscar.apps.catalogue.signals import product_viewed
+from oscar.apps.order.signals import order_placed
+
+from ecommerce.extensions.analytics import api
+
+
+@receiver(product_viewed, dispatch_uid='analytics.record_product_view')
+def record_product_view(sender, product, user, **kwargs):  # pylint: disable=unused-argument
+    api.record_product_view(product, user)
+
+
+@receiver(basket_addition, dispatch_uid='analytics.record_basket_addition')
+def record_basket_addition(sender, product, user, **kwargs):  # pylint: disable=unused-argument
+    api.record_basket_addition(product, user)
+
+
+@receiver(order_placed, dispatch_uid='analytics.record_order')
+def record_order(sender, order, user, **kwargs):  # pylint: disable=unused-argument
+    api.record_order(order)
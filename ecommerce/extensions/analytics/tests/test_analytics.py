@@ -1,13 +1,24 @@
 # -*- coding: utf-8 -*-
 """Unit tests for the analytics app."""
+from decimal import Decimal as D
+
 from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from oscar.apps.basket.signals import basket_addition
+from oscar.apps.catalogue.signals import product_viewed
+from oscar.apps.order.signals import order_placed
 from oscar.core.loading import get_model
+from oscar.test import factories
 
 from ecommerce.tests.mixins import BasketCreationMixin
 
 
+AnalyticsEvent = get_model('analytics', 'AnalyticsEvent')
 ProductRecord = get_model('analytics', 'ProductRecord')
+User = get_user_model()
 
 
 class AnalyticsTests(BasketCreationMixin, TestCase):
@@ -25,10 +36,12 @@ class AnalyticsTests(BasketCreationMixin, TestCase):
         # Verify that no product records are kept
         self.assertFalse(ProductRecord.objects.all().exists())
 
-    @override_settings(INSTALL_DEFAULT_ANALYTICS_RECEIVERS=True)
+    # Oscar's receivers execute queries for each product, which query budgets don't allow for.
+    @override_settings(INSTALL_DEFAULT_ANALYTICS_RECEIVERS=True, QUERY_BUDGET_ENFORCEMENT='log')
     def test_order_receiver_enabled(self):
         """Verify that Oscar's Analytics order receiver can be re-enabled."""
         self._initialize()
+        self.addCleanup(self._disconnect_default_receivers)
 
         self.assert_successful_basket_creation(skus=[self.FREE_SKU], checkout=True)
 
@@ -36,6 +49,55 @@ class AnalyticsTests(BasketCreationMixin, TestCase):
         product = ProductRecord.objects.get(product=self.free_product)
         self.assertEqual(product.num_purchases, 1)
 
+    @override_settings(INSTALL_DEFAULT_ANALYTICS_RECEIVERS=False, RECORD_ANALYTICS_EVENTS=True)
+    def test_events_recorded(self):
+        """Verify that raw events are recorded in place of Oscar's analytics receivers."""
+        self._initialize()
+
+        self.assert_successful_basket_creation(skus=[self.FREE_SKU], checkout=True)
+
+        events = AnalyticsEvent.objects.order_by('id')
+        self.assertEqual(
+            [(event.event_type, event.product_id) for event in events],
+            [
+                (AnalyticsEvent.BASKET_ADDITION, self.free_product.id),
+                (AnalyticsEvent.PURCHASE, self.free_product.id),
+                (AnalyticsEvent.ORDER, None),
+            ]
+        )
+        user = User.objects.get(username=self.USER_DATA['username'])
+        self.assertTrue(all(event.user_id == user.id for event in events))
+
+    @override_settings(INSTALL_DEFAULT_ANALYTICS_RECEIVERS=False, RECORD_ANALYTICS_EVENTS=True)
+    def test_basket_additions_recorded_together(self):
+        """Verify that the addition of several products to a basket is recorded with a single query."""
+        self._initialize()
+        other_product = factories.ProductFactory(
+            structure='child', parent=self.base_product, stockrecords__price_excl_tax=D('0.00')
+        )
+        skus = [self.FREE_SKU, other_product.stockrecords.get().partner_sku]
+
+        with CaptureQueriesContext(connection) as context:
+            self.assert_successful_basket_creation(skus=skus)
+
+        inserts = [query for query in context.captured_queries if 'INSERT INTO "analytics_' in query['sql']]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(
+            sorted(AnalyticsEvent.objects.values_list('event_type', 'product_id')),
+            sorted([
+                (AnalyticsEvent.BASKET_ADDITION, self.free_product.id),
+                (AnalyticsEvent.BASKET_ADDITION, other_product.id),
+            ])
+        )
+
+    def _disconnect_default_receivers(self):
+        """Disconnect Oscar's receivers, which otherwise remain connected once installed."""
+        from oscar.apps.analytics import receivers
+
+        product_viewed.disconnect(receivers.receive_product_view)
+        basket_addition.disconnect(receivers.receive_basket_addition)
+        order_placed.disconnect(receivers.receive_order_placed)
+
     def _initialize(self):
         """Execute initialization tasks for the analytics app."""
         # Django executes app config during startup for every management command.
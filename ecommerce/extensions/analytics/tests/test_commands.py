@@ -0,0 +1,107 @@
+"""Tests for the analytics app's management commands."""
+from decimal import Decimal as D
+
+from django.core.management import call_command
+from django.test import TestCase
+from oscar.core.loading import get_model
+from oscar.test import factories
+
+from ecommerce.extensions.analytics import api
+from ecommerce.tests.mixins import UserMixin
+
+
+AnalyticsEvent = get_model('analytics', 'AnalyticsEvent')
+ProductRecord = get_model('analytics', 'ProductRecord')
+UserRecord = get_model('analytics', 'UserRecord')
+
+
+class RollupAnalyticsEventsCommandTests(UserMixin, TestCase):
+    def setUp(self):
+        super(RollupAnalyticsEventsCommandTests, self).setUp()
+        self.user = self.create_user()
+        self.product = factories.create_product(price=D('10.00'))
+
+    def record_events(self):
+        """Record product views and a basket addition, and place an order, whose events are recorded on placement."""
+        api.record_product_view(self.product, self.user)
+        api.record_product_view(self.product, self.user)
+        api.record_basket_addition(self.product, self.user)
+
+        basket = factories.create_basket(empty=True)
+        basket.add_product(self.product, quantity=2)
+        return factories.create_order(user=self.user, basket=basket)
+
+    def test_rollup(self):
+        """Verify that events are folded into product and user records, then deleted."""
+        order = self.record_events()
+
+        call_command('rollup_analytics_events', batch_size=2)
+
+        self.assertFalse(AnalyticsEvent.objects.exists())
+
+        product_record = ProductRecord.objects.get(product=self.product)
+        self.assertEqual(
+            (product_record.num_views, product_record.num_basket_additions, product_record.num_purchases),
+            (2, 1, 2)
+        )
+
+        user_record = UserRecord.objects.get(user=self.user)
+        self.assertEqual(user_record.num_product_views, 2)
+        self.assertEqual(user_record.num_basket_additions, 1)
+        self.assertEqual(user_record.num_orders, 1)
+        self.assertEqual(user_record.num_order_lines, 1)
+        self.assertEqual(user_record.num_order_items, 2)
+        self.assertEqual(user_record.total_spent, order.total_incl_tax)
+        self.assertIsNotNone(user_record.date_last_order)
+
+    def test_rollup_increments(self):
+        """Verify that events are added to existing records."""
+        self.record_events()
+        call_command('rollup_analytics_events')
+        self.record_events()
+        call_command('rollup_analytics_events')
+
+        product_record = ProductRecord.objects.get(product=self.product)
+        self.assertEqual(
+            (product_record.num_views, product_record.num_basket_additions, product_record.num_purchases),
+            (4, 2, 4)
+        )
+        self.assertEqual(UserRecord.objects.get(user=self.user).num_orders, 2)
+
+    def test_identical_increments(self):
+        """Verify that records receiving identical increments are updated by a single query."""
+        products = [self.product] + [factories.create_product() for __ in xrange(4)]
+        for product in products:
+            api.record_product_view(product, None)
+        call_command('rollup_analytics_events')
+
+        for product in products:
+            api.record_product_view(product, None)
+
+        # Lock the events, aggregate them by product, find existing records, update them, aggregate
+        # the events by user (there are none), and delete the events, within a savepoint.
+        with self.assertNumQueries(8):
+            call_command('rollup_analytics_events')
+
+        self.assertEqual(set(ProductRecord.objects.values_list('num_views', flat=True)), {2})
+
+    def test_deleted_product(self):
+        """Verify that events referring to deleted products are discarded."""
+        api.record_product_view(self.product, None)
+        self.product.delete()
+
+        call_command('rollup_analytics_events')
+
+        self.assertFalse(AnalyticsEvent.objects.exists())
+        self.assertFalse(ProductRecord.objects.exists())
+
+    def test_anonymous_order(self):
+        """Verify that orders placed anonymously only contribute to product records."""
+        basket = factories.create_basket(empty=True)
+        basket.add_product(self.product)
+        factories.create_order(basket=basket)
+
+        call_command('rollup_analytics_events')
+
+        self.assertEqual(ProductRecord.objects.get(product=self.product).num_purchases, 1)
+        self.assertFalse(UserRecord.objects.exists())
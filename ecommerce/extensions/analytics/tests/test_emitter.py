@@ -0,0 +1,159 @@
+"""Tests of the Segment event emitter."""
+import threading
+import time
+
+from django.core.urlresolvers import reverse
+from django.test import TestCase
+from django.test.utils import override_settings
+import mock
+from oscar.test import factories
+
+from ecommerce.extensions.analytics import emitter
+from ecommerce.extensions.analytics.emitter import SegmentEmitter
+from ecommerce.extensions.analytics.tracking import track_completed_order
+from ecommerce.tests.mixins import UserMixin
+
+
+class SegmentEmitterTests(UserMixin, TestCase):
+    def setUp(self):
+        super(SegmentEmitterTests, self).setUp()
+        self.batches = []
+        self.unblock = threading.Event()
+        self.unblock.set()
+        self.addCleanup(self.unblock.set)
+
+    def send(self, write_key, batch):
+        self.unblock.wait()
+        self.batches.append((write_key, [message['event'] for message in batch]))
+
+    def wait_for_empty_queue(self, segment):
+        """Wait for the emitter's thread to take all queued events off the queue."""
+        while segment.stats()['queue_depth']:
+            time.sleep(0.001)
+
+    def create_emitter(self, **kwargs):
+        return SegmentEmitter('fake-key', send=self.send, **kwargs)
+
+    def test_track(self):
+        """Verify that tracked events are sent in the background."""
+        segment = self.create_emitter()
+        self.assertTrue(segment.track(1, 'Completed Order', {'orderId': 'EDX-100001'}))
+        self.assertTrue(segment.flush(1))
+
+        self.assertEqual(self.batches, [('fake-key', ['Completed Order'])])
+        stats = segment.stats()
+        self.assertEqual((stats['queued'], stats['sent'], stats['dropped'], stats['failed']), (1, 1, 0, 0))
+        self.assertEqual(stats['queue_depth'], 0)
+        self.assertGreater(stats['max_latency'], 0)
+
+    def test_batching(self):
+        """Verify that events queued while a batch is being sent are sent together, in batches of limited size."""
+        segment = self.create_emitter(batch_size=2)
+        self.unblock.clear()
+        segment.track(1, '0')
+        self.wait_for_empty_queue(segment)
+        for index in xrange(1, 4):
+            segment.track(1, str(index))
+
+        self.unblock.set()
+        self.assertTrue(segment.flush(1))
+
+        self.assertEqual([events for __, events in self.batches], [['0'], ['1', '2'], ['3']])
+
+    def test_queue_full(self):
+        """Verify that events are dropped, without blocking, when Segment is too slow to keep up."""
+        segment = self.create_emitter(max_queue_size=1)
+        self.unblock.clear()
+
+        # The first event is taken off the queue, and blocks while being sent. The second fills the queue.
+        segment.track(1, 'first')
+        self.wait_for_empty_queue(segment)
+        self.assertTrue(segment.track(1, 'second'))
+        self.assertFalse(segment.track(1, 'third'))
+
+        self.assertFalse(segment.flush(0.01))
+
+        self.unblock.set()
+        self.assertTrue(segment.flush(1))
+        stats = segment.stats()
+        self.assertEqual((stats['queued'], stats['sent'], stats['dropped']), (2, 2, 1))
+
+    def test_send_failure(self):
+        """Verify that events which can't be sent are counted, and don't stop later events from being sent."""
+        send = mock.Mock(side_effect=[Exception, None])
+        segment = SegmentEmitter('fake-key', send=send)
+
+        segment.track(1, 'first')
+        self.assertTrue(segment.flush(1))
+        segment.track(1, 'second')
+        self.assertTrue(segment.flush(1))
+
+        stats = segment.stats()
+        self.assertEqual((stats['sent'], stats['failed']), (1, 1))
+
+    def test_metrics(self):
+        """Verify that the emitter's counters, queue depth and latency are exposed as metrics."""
+        segment = self.create_emitter(max_queue_size=1)
+        self.unblock.clear()
+        segment.track(1, 'first')
+        self.wait_for_empty_queue(segment)
+        segment.track(1, 'second')
+        segment.track(1, 'dropped')
+        self.unblock.set()
+        self.assertTrue(segment.flush(1))
+
+        segment = SegmentEmitter('fake-key', send=mock.Mock(side_effect=Exception))
+        segment.track(1, 'failed')
+        self.assertTrue(segment.flush(1))
+
+        user = self.create_user(is_staff=True)
+        self.client.login(username=user.username, password=self.password)
+        content = self.client.get(reverse('metrics')).content
+
+        for outcome in SegmentEmitter.COUNTERS:
+            self.assertIn('ecommerce_segment_events_total{{outcome="{}"}}'.format(outcome), content)
+        self.assertIn('ecommerce_segment_queue_depth ', content)
+        self.assertIn('ecommerce_segment_latency_seconds_count ', content)
+
+    def test_get_emitter(self):
+        """Verify that emitters are only created if Segment is configured."""
+        with override_settings(SEGMENT_KEY=None):
+            self.assertIsNone(emitter.get_emitter())
+            self.assertFalse(emitter.track(1, 'Completed Order'))
+
+        with mock.patch.object(emitter, '_emitter', None):
+            with override_settings(SEGMENT_KEY='fake-key', SEGMENT_BATCH_SIZE=10):
+                segment = emitter.get_emitter()
+                self.assertEqual((segment.write_key, segment.batch_size), ('fake-key', 10))
+                self.assertIs(emitter.get_emitter(), segment)
+
+
+class TrackingTests(TestCase):
+    @mock.patch.object(emitter, 'track')
+    def test_track_completed_order(self, mock_track):
+        """Verify that placed orders are tracked."""
+        user = factories.UserFactory()
+        order = factories.create_order(user=user)
+        line = order.lines.get()
+        # Placing the order also calls the receiver, if it is connected.
+        mock_track.reset_mock()
+
+        track_completed_order(None, order=order, user=user)
+
+        mock_track.assert_called_once_with(user.id, 'Completed Order', {
+            'orderId': order.number,
+            'total': str(order.total_excl_tax),
+            'currency': order.currency,
+            'products': [{
+                'id': line.partner_sku,
+                'name': line.title,
+                'price': str(line.line_price_excl_tax),
+                'quantity': 1,
+            }],
+        })
+
+    @mock.patch.object(emitter, 'track')
+    def test_anonymous_order(self, mock_track):
+        """Verify that orders placed anonymously are not tracked."""
+        track_completed_order(None, order=factories.create_order(), user=None)
+        self.assertFalse(mock_track.called)
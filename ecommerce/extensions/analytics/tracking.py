@@ -0,0 +1,27 @@
+"""Receivers emitting order events to Segment."""
+from django.dispatch import receiver
+from oscar.apps.order.signals import order_placed
+
+from ecommerce.extensions.analytics import emitter
+
+
+@receiver(order_placed, dispatch_uid='analytics.track_completed_order')
+def track_completed_order(sender, order, **kwargs):  # pylint: disable=unused-argument
+    """Emit a 'Completed Order' event, without waiting for Segment."""
+    if order.user_id is None:
+        return
+
+    emitter.track(order.user_id, 'Completed Order', {
+        'orderId': order.number,
+        'total': str(order.total_excl_tax),
+        'currency': order.currency,
+        'products': [
+            {
+                'id': line.partner_sku,
+                'name': line.title,
+                'price': str(line.line_price_excl_tax),
+                'quantity': line.quantity,
+            }
+            for line in order.lines.all()
+        ],
+    })
@@ -4,9 +4,15 @@
 class APIDictionaryKeys(object):
     """Dictionary keys used repeatedly in the ecommerce API."""
     BASKET_ID = u'id'
+    BASKET_IDS = u'basket_ids'
     CHECKOUT = u'checkout'
+    FIELDS = u'fields'
     ORDER = u'order'
+    ORDERS = u'orders'
+    ORDER_BASKET_ID = u'basket_id'
     ORDER_NUMBER = u'number'
+    ORDER_NUMBERS = u'numbers'
+    ORDER_STATUS = u'status'
     ORDER_TOTAL = u'total'
     PAYMENT_DATA = u'payment_data'
     PAYMENT_FORM_DATA = u'payment_form_data'
@@ -16,6 +22,7 @@ class APIDictionaryKeys(object):
     SHIPPING_CHARGE = u'shipping_charge'
     SHIPPING_METHOD = u'shipping_method'
     SKU = u'sku'
+    TIMEOUT = u'timeout'
 
 
 class APIConstants(object):
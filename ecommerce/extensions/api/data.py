@@ -1,10 +1,16 @@
 """Functions used for data retrieval and manipulation by the API."""
+from collections import OrderedDict
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import PermissionDenied
+from django.db import transaction
 from oscar.core.loading import get_model, get_class
 
 from ecommerce.extensions.api import exceptions
 from ecommerce.extensions.api.constants import APIConstants as AC
 
 Basket = get_model('basket', 'Basket')
+Line = get_model('basket', 'Line')
 Product = get_model('catalogue', 'Product')
 
 Selector = get_class('partner.strategy', 'Selector')
@@ -16,18 +22,17 @@ OrderTotalCalculator = get_class('checkout.calculators', 'OrderTotalCalculator')
 def get_basket(user):
     """Retrieve the basket belonging to the indicated user.
 
-    If no such basket exists, create a new one. If multiple such baskets exist,
-    merge them into one.
+    If no such basket exists, create a new one. The user's row is locked while doing
+    so, preventing concurrent requests from each creating a basket. If multiple editable
+    baskets exist, the oldest is returned; the others are left for the `compact_baskets`
+    management command to merge into it.
     """
-    editable_baskets = Basket.objects.filter(owner=user, status__in=Basket.editable_statuses)
-    if len(editable_baskets) == 0:
-        basket = Basket.objects.create(owner=user)
-    else:
-        stale_baskets = list(editable_baskets)
-        basket = stale_baskets.pop(0)
-        for stale_basket in stale_baskets:
-            # Don't add line quantities when merging baskets
-            basket.merge(stale_basket, add_quantities=False)
+    with transaction.atomic():
+        get_user_model().objects.select_for_update().filter(pk=user.pk).exists()
+
+        basket = Basket.objects.filter(owner=user, status__in=Basket.editable_statuses).order_by('id').first()
+        if basket is None:
+            basket = Basket.objects.create(owner=user)
 
     # Assign the appropriate strategy class to the basket
     basket.strategy = Selector().strategy(user=user)
@@ -45,6 +50,104 @@ def get_product(sku):
         )
 
 
+def get_products(skus):
+    """Retrieve the products corresponding to the provided SKUs, using a constant number of queries.
+
+    Products are returned with their stock records, product classes, and parents' product
+    classes preloaded, so that strategies can price them and check their availability
+    without further queries.
+
+    Arguments:
+        skus (list): SKUs of the products to retrieve. A SKU may appear more than once.
+
+    Returns:
+        list: Products, in the same order as the provided SKUs.
+
+    Raises:
+        ProductNotFoundError: If any SKU does not correspond to a product.
+    """
+    products = Product.objects.filter(stockrecords__partner_sku__in=skus).distinct().select_related(
+        'product_class', 'parent__product_class'
+    ).prefetch_related('stockrecords')
+
+    products_by_sku = {}
+    for product in products:
+        for stockrecord in product.stockrecords.all():
+            products_by_sku[stockrecord.partner_sku] = product
+
+    for sku in skus:
+        if sku not in products_by_sku:
+            raise exceptions.ProductNotFoundError(
+                exceptions.PRODUCT_NOT_FOUND_DEVELOPER_MESSAGE.format(sku=sku)
+            )
+
+    return [products_by_sku[sku] for sku in skus]
+
+
+def add_products(basket, products):
+    """Add one of each of the provided products to the basket, using a constant number of queries.
+
+    Equivalent to calling `basket.add_product(product)` for each product. Quantities of
+    lines already in the basket, or of products provided more than once, are incremented;
+    all new lines are created with a single query.
+
+    Arguments:
+        basket (Basket): The basket to add products to. Must have a strategy assigned.
+        products (list): Products to add, such as those returned by `get_products`.
+
+    Raises:
+        PermissionDenied: If the basket cannot be edited.
+        ValueError: If a product has no stock record, or has a price in a currency other
+            than that of the basket's existing lines.
+    """
+    if not basket.can_be_edited:
+        raise PermissionDenied(u"You cannot modify a {status} basket".format(status=basket.status.lower()))
+
+    if basket.id is None:
+        basket.save()
+
+    existing_lines = {line.line_reference: line for line in basket.lines.all()}
+    # All lines in a basket share the same currency
+    currency = next((line.price_currency for line in existing_lines.itervalues()), None)
+    lines = OrderedDict()
+    for product in products:
+        stock_info = basket.strategy.fetch_for_product(product)
+        if stock_info.stockrecord is None:
+            raise ValueError(u"Basket lines must all have stock records. "
+                             u"Strategy hasn't found any stock record for product {}".format(product))
+
+        currency = currency or stock_info.price.currency
+        if stock_info.price.currency != currency:
+            raise ValueError(u"Basket lines must all have the same currency. Proposed line has currency {}, "
+                             u"while basket has currency {}".format(stock_info.price.currency, currency))
+
+        # pylint: disable=protected-access
+        line_reference = basket._create_line_reference(product, stock_info.stockrecord, None)
+        line = lines.get(line_reference)
+        if line is None:
+            line = lines[line_reference] = Line(
+                basket=basket,
+                line_reference=line_reference,
+                product=product,
+                stockrecord=stock_info.stockrecord,
+                quantity=0,
+                price_excl_tax=stock_info.price.excl_tax,
+                price_currency=stock_info.price.currency,
+            )
+            if stock_info.price.is_tax_known:
+                line.price_incl_tax = stock_info.price.incl_tax
+        line.quantity += 1
+
+    for line_reference in lines.keys():
+        existing_line = existing_lines.get(line_reference)
+        if existing_line:
+            existing_line.quantity += lines.pop(line_reference).quantity
+            existing_line.save()
+
+    Line.objects.bulk_create(lines.values())
+    basket.reset_offer_applications()
+
+
 def get_order_metadata(basket):
     """Retrieve information required to place an order.
 
@@ -0,0 +1,125 @@
+"""Decorators for use with ecommerce API views."""
+from datetime import timedelta
+import functools
+import hashlib
+import json
+import logging
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+from ecommerce.extensions.api import exceptions
+from ecommerce.extensions.api.models import IdempotentResponse
+
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_KEY_HEADER = 'HTTP_IDEMPOTENCY_KEY'
+IDEMPOTENT_REPLAY_HEADER = 'Idempotent-Replayed'
+
+
+def _fingerprint(request):
+    """Compute a digest identifying the method, path and data of a request."""
+    content = json.dumps([request.method, request.path, request.data], cls=JSONEncoder, sort_keys=True)
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def _error_response(developer_message, status_code):
+    logger.error(developer_message)
+    return Response({'developer_message': developer_message}, status=status_code)
+
+
+def idempotent(view_method):
+    """Allow clients to safely retry requests to the decorated view method.
+
+    Clients opt in by sending a unique value in the Idempotency-Key header. The first
+    request made by a user with a given key is executed normally, and its response
+    is stored for IDEMPOTENCY_KEY_TTL seconds. Subsequent requests made by the same user
+    with the same key receive the stored response, marked with an Idempotent-Replayed
+    header, without the view method being executed again.
+
+    Reusing a key for a different request results in a 400 response. Retrying a request
+    while the original is still being processed results in an immediate 409 response.
+    Server errors are not stored, so that requests which fail with them may be retried.
+    Requests without the header are unaffected.
+
+    The key is claimed in a transaction of its own, committed before the view method is
+    executed, in another transaction, so that concurrent retries see the claim rather than
+    waiting for the original request to finish. Decorated views must therefore be exempt
+    from ATOMIC_REQUESTS (see NonAtomicRequestsMixin).
+    """
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.META.get(IDEMPOTENCY_KEY_HEADER)
+        if not key:
+            with transaction.atomic():
+                return view_method(self, request, *args, **kwargs)
+
+        if len(key) > IdempotentResponse.KEY_MAX_LENGTH:
+            return _error_response(exceptions.IDEMPOTENCY_KEY_INVALID_DEVELOPER_MESSAGE, status.HTTP_400_BAD_REQUEST)
+
+        fingerprint = _fingerprint(request)
+
+        try:
+            record = IdempotentResponse.objects.get(user=request.user, key=key)
+        except IdempotentResponse.DoesNotExist:
+            record = None
+        else:
+            if record.is_expired:
+                record.delete()
+                record = None
+
+        if record is not None:
+            if record.request_fingerprint != fingerprint:
+                return _error_response(
+                    exceptions.IDEMPOTENCY_KEY_REUSED_DEVELOPER_MESSAGE.format(key=key),
+                    status.HTTP_400_BAD_REQUEST
+                )
+            elif not record.is_complete:
+                return _error_response(
+                    exceptions.IDEMPOTENCY_KEY_IN_PROGRESS_DEVELOPER_MESSAGE.format(key=key),
+                    status.HTTP_409_CONFLICT
+                )
+
+            logger.info(u"Replaying stored response to request with idempotency key [%s]", key)
+            response = Response(json.loads(record.content), status=record.status_code)
+            response[IDEMPOTENT_REPLAY_HEADER] = 'true'
+            return response
+
+        # Claim the key, and commit the claim, before doing any work. A concurrent request
+        # with the same key will violate the unique constraint on user and key.
+        try:
+            with transaction.atomic():
+                record = IdempotentResponse.objects.create(
+                    user=request.user,
+                    key=key,
+                    request_fingerprint=fingerprint,
+                    expires=timezone.now() + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+                )
+        except IntegrityError:
+            return _error_response(
+                exceptions.IDEMPOTENCY_KEY_IN_PROGRESS_DEVELOPER_MESSAGE.format(key=key),
+                status.HTTP_409_CONFLICT
+            )
+
+        try:
+            with transaction.atomic():
+                response = view_method(self, request, *args, **kwargs)
+        except Exception:
+            record.delete()
+            raise
+
+        if response.status_code >= 500 or not hasattr(response, 'data'):
+            record.delete()
+        else:
+            record.status_code = response.status_code
+            record.content = json.dumps(response.data, cls=JSONEncoder)
+            record.save()
+
+        return response
+
+    return wrapper
@@ -14,6 +14,16 @@ PRODUCT_NOT_FOUND_USER_MESSAGE = _("We couldn't find one of the products you're
 PRODUCT_UNAVAILABLE_DEVELOPER_MESSAGE = u"Product with SKU [{sku}] is [{availability}]"
 PRODUCT_UNAVAILABLE_USER_MESSAGE = _("One of the products you're trying to order is unavailable.")
 
+ORDER_LOOKUPS_MISSING_DEVELOPER_MESSAGE = u"Neither basket IDs nor order numbers were provided"
+ORDER_LOOKUPS_EXCEEDED_DEVELOPER_MESSAGE = u"No more than [{limit}] basket IDs and order numbers may be provided"
+BASKET_ID_INVALID_DEVELOPER_MESSAGE = u"Basket ID [{basket_id}] is not an integer"
+TIMEOUT_INVALID_DEVELOPER_MESSAGE = u"Timeout [{timeout}] is not a number of seconds between 0 and [{maximum}]"
+UNKNOWN_FIELDS_DEVELOPER_MESSAGE = u"Orders have no field(s) named [{fields}]"
+
+IDEMPOTENCY_KEY_INVALID_DEVELOPER_MESSAGE = u"Idempotency keys may not be longer than 255 characters"
+IDEMPOTENCY_KEY_REUSED_DEVELOPER_MESSAGE = u"Idempotency key [{key}] was already used for a different request"
+IDEMPOTENCY_KEY_IN_PROGRESS_DEVELOPER_MESSAGE = u"A request with idempotency key [{key}] is already being processed"
+
 
 class ApiError(Exception):
     """Standard error raised by the API."""
@@ -0,0 +1,103 @@
+"""Compact users' editable baskets, and delete baskets which are no longer needed."""
+from datetime import timedelta
+from itertools import groupby
+import logging
+from optparse import make_option
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+from oscar.core.loading import get_model
+
+
+logger = logging.getLogger(__name__)
+
+Basket = get_model('basket', 'Basket')
+
+
+class Command(BaseCommand):
+    help = (
+        'Merge extra editable baskets into the basket returned for each user, then delete merged baskets and '
+        'frozen baskets which were abandoned without an order being placed.'
+    )
+
+    option_list = BaseCommand.option_list + (
+        make_option(
+            '--chunk-size',
+            action='store',
+            dest='chunk_size',
+            type='int',
+            default=500,
+            help='Maximum number of users or baskets to process in a single transaction.'
+        ),
+        make_option(
+            '--days',
+            action='store',
+            dest='days',
+            type='int',
+            default=14,
+            help='Age, in days, after which frozen baskets without an order are deleted.'
+        ),
+    )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        cutoff = timezone.now() - timedelta(days=options['days'])
+
+        merged = self.merge_editable_baskets(chunk_size)
+        logger.info(u"Merged [%d] extra editable baskets", merged)
+
+        stale_baskets = Basket.objects.filter(status=Basket.MERGED) | Basket.objects.filter(
+            status=Basket.FROZEN, date_created__lt=cutoff, order__isnull=True
+        )
+        deleted = self.delete_in_chunks(stale_baskets, chunk_size)
+        logger.info(u"Deleted [%d] merged or abandoned baskets", deleted)
+
+    def merge_editable_baskets(self, chunk_size):
+        """Merge each user's editable baskets into the oldest, which is the one returned by `data.get_basket`.
+
+        Returns:
+            int: The number of baskets merged.
+        """
+        owner_ids = list(
+            Basket.objects.filter(status__in=Basket.editable_statuses, owner__isnull=False)
+            .values('owner')
+            .annotate(basket_count=Count('id'))
+            .filter(basket_count__gt=1)
+            .order_by('owner')
+            .values_list('owner', flat=True)
+        )
+
+        merged = 0
+        for start in xrange(0, len(owner_ids), chunk_size):
+            with transaction.atomic():
+                baskets = Basket.objects.select_for_update().filter(
+                    owner__in=owner_ids[start:start + chunk_size],
+                    status__in=Basket.editable_statuses
+                ).order_by('owner', 'id')
+
+                for __, owner_baskets in groupby(baskets, lambda basket: basket.owner_id):
+                    basket = next(owner_baskets)
+                    for stale_basket in owner_baskets:
+                        # Don't add line quantities when merging baskets
+                        basket.merge(stale_basket, add_quantities=False)
+                        merged += 1
+
+        return merged
+
+    def delete_in_chunks(self, queryset, chunk_size):
+        """Delete the baskets in the given queryset, at most chunk_size at a time.
+
+        Returns:
+            int: The number of baskets deleted.
+        """
+        deleted = 0
+        while True:
+            ids = list(queryset.order_by('id').values_list('id', flat=True)[:chunk_size])
+            if not ids:
+                return deleted
+
+            with transaction.atomic():
+                Basket.objects.filter(id__in=ids).delete()
+            deleted += len(ids)
@@ -0,0 +1,19 @@
+"""Delete stored responses to idempotent requests whose keys have expired."""
+import logging
+
+from django.core.management.base import NoArgsCommand
+
+from ecommerce.extensions.api.models import IdempotentResponse
+
+
+logger = logging.getLogger(__name__)
+
+
+class Command(NoArgsCommand):
+    help = 'Delete stored responses to requests made with Idempotency-Key headers once their keys expire.'
+
+    def handle_noargs(self, **options):
+        expired = IdempotentResponse.objects.expired()
+        count = expired.count()
+        expired.delete()
+        logger.info(u"Deleted [%d] expired idempotent responses", count)
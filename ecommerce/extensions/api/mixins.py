@@ -0,0 +1,100 @@
+"""Mixins for use with ecommerce API views."""
+from django.db import transaction
+from rest_framework.exceptions import ParseError
+
+from ecommerce import routers
+from ecommerce.extensions.api import exceptions, serializers
+from ecommerce.extensions.api.constants import APIConstants as AC
+
+
+class SparseOrderFieldsMixin(object):
+    """Allow callers to request a subset of order fields.
+
+    Callers list the fields they need in the `fields` query parameter, separated by
+    commas (e.g., `?fields=number,status`). Only those fields are serialized, and only
+    the related objects those fields need are joined or prefetched. If the parameter
+    is absent, all fields are returned.
+    """
+    serializer_class = serializers.CompiledOrderSerializer
+
+    # Related objects joined (select_related) or prefetched (prefetch_related) to serialize each field.
+    FIELD_SELECTS = {
+        'billing_address': ('billing_address__country',),
+    }
+    FIELD_PREFETCHES = {
+        'sources': ('sources__source_type', 'sources__transactions'),
+        # Line descriptions include line attributes.
+        'lines': ('lines__attributes',),
+    }
+
+    def get_requested_fields(self):
+        """Return the list of order fields requested by the caller, or None if all fields are wanted.
+
+        Raises:
+            ParseError: If any requested field is not an order field.
+        """
+        value = self.request.query_params.get(AC.KEYS.FIELDS)
+        if value is None:
+            return None
+
+        fields = [field.strip() for field in value.split(',') if field.strip()]
+        unknown = [field for field in fields if field not in self.serializer_class.get_field_names()]
+        if unknown:
+            raise ParseError(exceptions.UNKNOWN_FIELDS_DEVELOPER_MESSAGE.format(fields=', '.join(unknown)))
+
+        return fields
+
+    def prefetch_requested_fields(self, queryset):
+        """Join or prefetch only those related objects needed to serialize the requested fields."""
+        fields = self.get_requested_fields()
+        if fields is None:
+            fields = self.serializer_class.get_field_names()
+
+        selects = [lookup for field in fields for lookup in self.FIELD_SELECTS.get(field, ())]
+        prefetches = [lookup for field in fields for lookup in self.FIELD_PREFETCHES.get(field, ())]
+
+        if selects:
+            queryset = queryset.select_related(*selects)
+        if prefetches:
+            queryset = queryset.prefetch_related(*prefetches)
+
+        return queryset
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs['fields'] = self.get_requested_fields()
+        return super(SparseOrderFieldsMixin, self).get_serializer(*args, **kwargs)
+
+
+class ReadReplicaMixin(object):
+    """Route reads made by safe requests to the read replica.
+
+    Routing begins after the request has been authenticated, since authentication may
+    create or update the user, and ends once the request has been dispatched, even if
+    the view raises an exception. Subclasses may set `read_replica` to False to read from
+    the primary.
+    """
+    read_replica = True
+
+    def initial(self, request, *args, **kwargs):
+        super(ReadReplicaMixin, self).initial(request, *args, **kwargs)
+        if self.read_replica and request.method in routers.SAFE_METHODS:
+            self.previous_routing = routers.activate(request.user)  # pylint: disable=attribute-defined-outside-init
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super(ReadReplicaMixin, self).dispatch(request, *args, **kwargs)
+        finally:
+            if hasattr(self, 'previous_routing'):
+                routers.restore(self.previous_routing)
+                del self.previous_routing
+
+
+class NonAtomicRequestsMixin(object):
+    """Exempt views from ATOMIC_REQUESTS, so that their methods can commit some work separately.
+
+    Methods of such views must manage their own transactions; methods decorated with
+    `idempotent` are executed in a transaction of their own.
+    """
+    @classmethod
+    def as_view(cls, **initkwargs):
+        return transaction.non_atomic_requests(super(NonAtomicRequestsMixin, cls).as_view(**initkwargs))
@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import ugettext_lazy as _
+
+
+class IdempotentResponseQuerySet(models.QuerySet):
+    def expired(self):
+        return self.filter(expires__lte=timezone.now())
+
+
+class IdempotentResponse(models.Model):
+    """The stored response to a request made with an Idempotency-Key header.
+
+    Requests are identified by the user who made them and the key they provided. A
+    record is created, without a response, as soon as such a request begins; the
+    response is filled in once the request completes, so that retries of the request
+    can be answered without repeating its work.
+    """
+    KEY_MAX_LENGTH = 255
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='idempotent_responses')
+    key = models.CharField(_("Idempotency Key"), max_length=KEY_MAX_LENGTH)
+    # SHA-256 of the request method, path and data, used to detect keys reused for different requests
+    request_fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True)
+    content = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    expires = models.DateTimeField(db_index=True)
+
+    objects = IdempotentResponseQuerySet.as_manager()
+
+    class Meta(object):
+        unique_together = ('user', 'key')
+
+    @property
+    def is_expired(self):
+        return self.expires <= timezone.now()
+
+    @property
+    def is_complete(self):
+        return self.status_code is not None
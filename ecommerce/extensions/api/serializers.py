@@ -1,8 +1,14 @@
 """Serializers for order and line item data."""
 # pylint: disable=abstract-method
+from collections import OrderedDict
+import decimal
 from decimal import Decimal as D
 
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import models
+from django.utils import six
 from rest_framework import serializers
+from rest_framework.fields import get_attribute, is_simple_callable
 
 
 class TransactionSerializer(serializers.Serializer):
@@ -90,6 +96,155 @@ class OrderSerializer(serializers.Serializer):
     billing_address = BillingAddressSerializer(allow_null=True)
 
 
+def _compile_attribute(source_attrs):
+    """Return a function which mirrors DRF's attribute lookup for the given source attributes."""
+    if len(source_attrs) != 1:
+        return lambda instance: get_attribute(instance, source_attrs)
+
+    attr = source_attrs[0]
+
+    def get_single_attribute(instance):
+        try:
+            value = getattr(instance, attr)
+        except ObjectDoesNotExist:
+            return None
+
+        if is_simple_callable(value):
+            value = value()
+
+        return value
+
+    return get_single_attribute
+
+
+def _compile_decimal(field):
+    """Return a function equivalent to DecimalField.to_representation, with its context built once."""
+    context = decimal.getcontext().copy()
+    context.prec = field.max_digits
+    exponent = D('.1') ** field.decimal_places
+    coerce_to_string = field.coerce_to_string
+
+    def to_representation(value):
+        if not isinstance(value, D):
+            value = D(six.text_type(value).strip())
+
+        quantized = value.quantize(exponent, context=context)
+        if not coerce_to_string:
+            return quantized
+        return '{0:f}'.format(quantized)
+
+    return to_representation
+
+
+def _compile_representation(field):
+    """Return a function equivalent to the given field's to_representation method.
+
+    Nested serializers are compiled recursively. Field types whose representation
+    is trivial are reduced to a builtin; anything else falls back to the field's
+    own bound method. Exact type checks are used so that subclasses overriding
+    to_representation keep their behavior.
+    """
+    if isinstance(field, serializers.ListSerializer):
+        child = _compile_representation(field.child)
+
+        def to_representation(data):
+            iterable = data.all() if isinstance(data, (models.Manager, models.QuerySet)) else data
+            return [child(item) for item in iterable]
+
+        return to_representation
+
+    if isinstance(field, serializers.Serializer):
+        return _compile_serializer(field)
+
+    field_type = type(field)
+    if field_type is serializers.CharField:
+        return six.text_type
+    elif field_type is serializers.IntegerField:
+        return int
+    elif field_type is serializers.DecimalField:
+        return _compile_decimal(field)
+
+    return field.to_representation
+
+
+def _compile_serializer(serializer, field_names=None):
+    """Return a function which renders an instance exactly as the given serializer would.
+
+    If field_names is provided, only the named top-level fields are rendered.
+    """
+    accessors = [
+        (field.field_name, _compile_attribute(field.source_attrs), _compile_representation(field))
+        for field in serializer.fields.values()
+        if not field.write_only and (field_names is None or field.field_name in field_names)
+    ]
+
+    def to_representation(instance):
+        ret = OrderedDict()
+        for field_name, get_value, represent in accessors:
+            value = get_value(instance)
+            ret[field_name] = None if value is None else represent(value)
+        return ret
+
+    return to_representation
+
+
+class CompiledSerializer(serializers.BaseSerializer):
+    """Read-only serializer which renders instances using accessors precompiled from another serializer.
+
+    DRF serializers look up and run every field for every instance they render. Subclasses
+    instead name a regular serializer in `serializer_class`; its fields are walked once, and
+    the resulting accessors are reused for every subsequent instance. Output is identical to
+    that of `serializer_class`.
+
+    Callers may pass a list of top-level field names as the `fields` keyword argument to
+    render only those fields.
+    """
+    serializer_class = None
+
+    def __init__(self, *args, **kwargs):
+        self.requested_fields = kwargs.pop('fields', None)
+        super(CompiledSerializer, self).__init__(*args, **kwargs)
+
+    @classmethod
+    def get_field_names(cls):
+        """Return the names of the top-level fields rendered by this class, in declaration order."""
+        field_names = cls.__dict__.get('_field_names')
+        if field_names is None:
+            # pylint: disable=not-callable
+            field_names = [
+                name for name, field in cls.serializer_class().fields.items() if not field.write_only
+            ]
+            cls._field_names = field_names
+        return field_names
+
+    @classmethod
+    def get_compiled(cls, fields=None):
+        """Return the compiled representation function for the given fields, compiling it if necessary.
+
+        Arguments:
+            fields (iterable): Names of the top-level fields to render. All fields are rendered if None.
+        """
+        cache = cls.__dict__.get('_compiled')
+        if cache is None:
+            cache = cls._compiled = {}
+
+        # Normalize the requested fields to declaration order, bounding the number of cache entries.
+        key = None if fields is None else tuple(name for name in cls.get_field_names() if name in fields)
+        compiled = cache.get(key)
+        if compiled is None:
+            compiled = _compile_serializer(cls.serializer_class(), key)  # pylint: disable=not-callable
+            cache[key] = compiled
+        return compiled
+
+    def to_representation(self, instance):
+        return self.get_compiled(self.requested_fields)(instance)
+
+
+class CompiledOrderSerializer(CompiledSerializer):
+    """Read-only, compiled equivalent of OrderSerializer."""
+    serializer_class = OrderSerializer
+
+
 class PaymentProcessorSerializer(serializers.Serializer):
     """ Serializer to use with instances of processors.BasePaymentProcessor """
     def to_representation(self, instance):
@@ -0,0 +1,59 @@
+"""Tests for the API's management commands."""
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from oscar.core.loading import get_class, get_model
+from oscar.test import factories
+
+from ecommerce.tests.mixins import UserMixin
+
+
+Basket = get_model('basket', 'Basket')
+Selector = get_class('partner.strategy', 'Selector')
+
+
+class CompactBasketsCommandTests(UserMixin, TestCase):
+    def setUp(self):
+        super(CompactBasketsCommandTests, self).setUp()
+        self.user = self.create_user()
+        self.product = factories.create_product()
+        factories.create_stockrecord(self.product, num_in_stock=2)
+
+    def create_basket(self, status=Basket.OPEN, days_old=0, **kwargs):
+        """Create a basket with the given status, containing one product, backdated by the given number of days."""
+        basket = factories.BasketFactory(**kwargs)
+        basket.strategy = Selector().strategy()
+        basket.add_product(self.product)
+        Basket.objects.filter(id=basket.id).update(
+            status=status,
+            date_created=timezone.now() - timedelta(days=days_old)
+        )
+        basket.status = status
+        return basket
+
+    def test_merge_editable_baskets(self):
+        """Each user's extra editable baskets should be merged into their oldest one, then deleted."""
+        other_user = self.create_user()
+        baskets = [self.create_basket(owner=self.user) for __ in xrange(3)]
+        other_basket = self.create_basket(owner=other_user)
+
+        call_command('compact_baskets', chunk_size=1)
+
+        self.assertEqual(list(Basket.objects.filter(owner=self.user)), baskets[:1])
+        self.assertEqual(baskets[0].lines.get().quantity, 1)
+        self.assertEqual(list(Basket.objects.filter(owner=other_user)), [other_basket])
+
+    def test_delete_abandoned_frozen_baskets(self):
+        """Frozen baskets older than the cutoff should be deleted, unless an order was placed for them."""
+        abandoned = self.create_basket(owner=self.user, status=Basket.FROZEN, days_old=15)
+        recent = self.create_basket(owner=self.user, status=Basket.FROZEN, days_old=1)
+        ordered = self.create_basket(owner=self.user, status=Basket.FROZEN, days_old=15)
+        factories.create_order(basket=ordered, user=self.user)
+        submitted = self.create_basket(owner=self.user, status=Basket.SUBMITTED, days_old=15)
+
+        call_command('compact_baskets', days=14)
+
+        self.assertFalse(Basket.objects.filter(id=abandoned.id).exists())
+        self.assertEqual(set(Basket.objects.all()), {recent, ordered, submitted})
@@ -0,0 +1,101 @@
+"""Tests for the API's data retrieval functions."""
+from django.core.exceptions import PermissionDenied
+from django.test import TestCase
+from oscar.core.loading import get_class, get_model
+from oscar.test import factories
+
+from ecommerce.extensions.api import data, exceptions
+from ecommerce.tests.mixins import UserMixin
+
+
+Basket = get_model('basket', 'Basket')
+Selector = get_class('partner.strategy', 'Selector')
+
+
+class GetBasketTests(UserMixin, TestCase):
+    def setUp(self):
+        super(GetBasketTests, self).setUp()
+        self.user = self.create_user()
+
+    def test_create_basket(self):
+        """A new basket should be created if the user has no editable baskets."""
+        factories.BasketFactory(owner=self.user, status=Basket.FROZEN)
+
+        basket = data.get_basket(self.user)
+
+        self.assertEqual(basket.status, Basket.OPEN)
+        self.assertEqual(basket.owner, self.user)
+        self.assertEqual(Basket.objects.filter(owner=self.user).count(), 2)
+        self.assertIsNotNone(basket.strategy)
+
+    def test_existing_basket(self):
+        """The user's oldest editable basket should be returned, without modifying any others."""
+        baskets = [factories.BasketFactory(owner=self.user) for __ in xrange(2)]
+
+        # Savepoint creation and release, locking the user, and retrieving the basket
+        with self.assertNumQueries(4):
+            basket = data.get_basket(self.user)
+
+        self.assertEqual(basket, baskets[0])
+        self.assertEqual(Basket.objects.filter(owner=self.user, status=Basket.OPEN).count(), 2)
+
+
+class AddProductsTests(TestCase):
+    def setUp(self):
+        super(AddProductsTests, self).setUp()
+        self.skus = [u'SKU-{}'.format(i) for i in xrange(10)]
+        for sku in self.skus:
+            factories.create_product(partner_sku=sku, price=5)
+
+    def create_basket(self):
+        basket = factories.BasketFactory()
+        basket.strategy = Selector().strategy()
+        return basket
+
+    def assert_lines_equal(self, actual, expected):
+        """Verify that two baskets contain equivalent lines."""
+        fields = ('line_reference', 'product', 'stockrecord', 'quantity', 'price_currency', 'price_excl_tax',
+                  'price_incl_tax')
+        self.assertEqual(
+            list(actual.lines.order_by('line_reference').values_list(*fields)),
+            list(expected.lines.order_by('line_reference').values_list(*fields))
+        )
+
+    def test_get_products(self):
+        """Products should be returned in the order of the given SKUs, including repeated SKUs."""
+        skus = self.skus[1::-1] + self.skus[:1]
+
+        with self.assertNumQueries(2):
+            products = data.get_products(skus)
+
+        self.assertEqual([product.stockrecords.all()[0].partner_sku for product in products], skus)
+
+    def test_get_products_not_found(self):
+        """An error should be raised if any SKU does not correspond to a product."""
+        with self.assertRaises(exceptions.ProductNotFoundError):
+            data.get_products(self.skus + ['not-a-sku'])
+
+    def test_add_products(self):
+        """Adding products in bulk should produce the same lines as adding them one at a time."""
+        products = data.get_products(self.skus + self.skus[:2])
+        expected = self.create_basket()
+        for product in products:
+            expected.add_product(product)
+
+        basket = self.create_basket()
+        basket.add_product(products[0])
+
+        # Retrieving the basket's existing lines, updating the existing line, and creating all others
+        with self.assertNumQueries(3):
+            data.add_products(basket, products[1:])
+
+        self.assert_lines_equal(basket, expected)
+        self.assertEqual(basket.num_items, len(products))
+
+    def test_add_products_frozen_basket(self):
+        """Products should not be added to baskets which cannot be edited."""
+        basket = self.create_basket()
+        basket.freeze()
+
+        with self.assertRaises(PermissionDenied):
+            data.add_products(basket, data.get_products(self.skus))
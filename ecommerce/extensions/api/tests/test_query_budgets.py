@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""Tests of the query budgets of API endpoints.
+
+Each budgeted endpoint is requested as a typical client would request it, for an order of a
+single seat, with Segment tracking installed as it is in production, and the number of queries
+executed is compared to the number expected. Budgets may only exceed these numbers by a little
+headroom, so that regressions fail requests made by tests, and the expected numbers must be
+updated, deliberately, along with the budgets.
+"""
+import json
+
+import httpretty
+import mock
+from django.conf import settings
+from django.contrib.sites.models import Site
+from django.core.cache import cache
+from django.core.urlresolvers import reverse
+from django.test import TestCase, override_settings
+from oscar.core.loading import get_model
+from oscar.test import factories
+
+from ecommerce import querylog
+from ecommerce.extensions.analytics import tracking  # noqa pylint: disable=unused-import
+from ecommerce.extensions.api.constants import APIConstants as AC
+from ecommerce.extensions.fulfillment.mixins import FulfillmentMixin
+from ecommerce.extensions.fulfillment.status import LINE, ORDER
+from ecommerce.extensions.order.notifications import notifier
+from ecommerce.tests.mixins import BasketCreationMixin
+
+
+Order = get_model('order', 'Order')
+ShippingEventType = get_model('order', 'ShippingEventType')
+
+# Number of queries executed by a typical request to each budgeted endpoint
+EXPECTED_QUERY_COUNTS = {
+    'api:v1:orders:create_list': 53,
+    'api:v1:orders:retrieve': 7,
+    'api:v1:orders:fulfill': 24,
+    'api:v2:baskets:create': 49,
+    'api:v2:baskets:retrieve_order': 6,
+    'api:v2:baskets:wait_for_order': 11,
+    'api:v2:orders:list': 7,
+    'api:v2:orders:statuses': 3,
+    'api:v2:orders:retrieve': 6,
+    'api:v2:orders:fulfill': 24,
+    'api:v2:payment:list_processors': 1,
+}
+
+# Maximum number of queries by which a budget may exceed the number executed by a typical request
+HEADROOM = 3
+
+check_budget = querylog.check_budget
+
+
+@override_settings(QUERY_BUDGET_ENFORCEMENT='raise', EDX_API_KEY='edx-api-key')
+class QueryBudgetTests(BasketCreationMixin, TestCase):
+    def setUp(self):
+        super(QueryBudgetTests, self).setUp()
+        self.addCleanup(cache.clear)
+        ShippingEventType.objects.create(name=FulfillmentMixin.SHIPPING_EVENT_NAME)
+
+        seat_class = factories.ProductClassFactory(name='Seat', requires_shipping=False, track_stock=False)
+        course = factories.ProductFactory(structure='parent', product_class=seat_class, stockrecords=None)
+        seat = factories.ProductFactory(structure='child', parent=course, stockrecords__price_excl_tax=0)
+        for code, value in (('certificate_type', 'honor'), ('course_key', 'edX/DemoX/Demo_Course')):
+            attribute = factories.ProductAttributeFactory(name=code, code=code, product_class=seat_class, type='text')
+            factories.ProductAttributeValueFactory(attribute=attribute, product=seat, value_text=value)
+        self.seat_sku = seat.stockrecords.get().partner_sku
+
+        httpretty.enable()
+        self.addCleanup(httpretty.disable)
+        self.addCleanup(httpretty.reset)
+        httpretty.register_uri(httpretty.POST, settings.ENROLLMENT_API_URL, status=200, body='{}')
+
+        self.token = 'JWT ' + self.generate_token(self.USER_DATA)
+        # Cache the current site, and authenticate once, creating the user, as a long-running process
+        # and a typical client's earlier requests would have.
+        Site.objects.get_current()
+        with mock.patch.object(querylog, 'check_budget'):
+            self.client.get(reverse('api:v2:payment:list_processors'), HTTP_AUTHORIZATION=self.token)
+
+    def assert_query_count(self, endpoint, expected, method, path, data=None, **kwargs):
+        """Make a request, verifying that it succeeds, within its endpoint's budget, using the expected number of
+        queries."""
+        with mock.patch.object(querylog, 'check_budget', side_effect=check_budget) as mock_check_budget:
+            response = getattr(self.client, method)(path, data, HTTP_AUTHORIZATION=self.token, **kwargs)
+
+        self.assertLess(response.status_code, 300, response.content)
+        mock_check_budget.assert_called_once_with(endpoint, expected)
+
+    def assert_typical_query_count(self, endpoint, *args, **kwargs):
+        self.assert_query_count(endpoint, EXPECTED_QUERY_COUNTS[endpoint], *args, **kwargs)
+
+    def place_order(self):
+        """Place an order for the seat, through the basket API."""
+        self.create_basket(skus=[self.seat_sku], checkout=True)
+        order = Order.objects.get()
+        self.assertEqual(order.status, ORDER.COMPLETE)
+        return order
+
+    def test_budgets(self):
+        """Every budgeted endpoint should be tested, and its budget should leave only a little headroom."""
+        self.assertEqual(set(settings.QUERY_BUDGETS), set(EXPECTED_QUERY_COUNTS))
+        for endpoint, budget in settings.QUERY_BUDGETS.items():
+            self.assertLessEqual(budget - EXPECTED_QUERY_COUNTS[endpoint], HEADROOM, endpoint)
+
+    def test_basket_create(self):
+        data = json.dumps({AC.KEYS.PRODUCTS: [{AC.KEYS.SKU: self.seat_sku}], AC.KEYS.CHECKOUT: True})
+        self.assert_typical_query_count(
+            'api:v2:baskets:create', 'post', reverse('api:v2:baskets:create'), data, content_type='application/json'
+        )
+
+    def test_v1_order_create(self):
+        path = reverse('api:v1:orders:create_list')
+        self.assert_typical_query_count('api:v1:orders:create_list', 'post', path, {'sku': self.seat_sku})
+        # Listing orders shares the endpoint's budget.
+        self.assert_query_count('api:v1:orders:create_list', 6, 'get', path)
+
+    def test_order_reads(self):
+        order = self.place_order()
+        for endpoint in ('api:v1:orders:retrieve', 'api:v2:orders:retrieve'):
+            self.assert_typical_query_count(endpoint, 'get', reverse(endpoint, kwargs={'number': order.number}))
+
+        self.assert_typical_query_count('api:v2:orders:list', 'get', reverse('api:v2:orders:list'))
+        self.assert_typical_query_count(
+            'api:v2:orders:statuses', 'get', reverse('api:v2:orders:statuses'), {'numbers': order.number}
+        )
+
+    def test_basket_order_reads(self):
+        order = self.place_order()
+        kwargs = {'basket_id': order.basket_id}
+        self.assert_typical_query_count(
+            'api:v2:baskets:retrieve_order', 'get', reverse('api:v2:baskets:retrieve_order', kwargs=kwargs)
+        )
+        # Orders whose statuses have already changed are returned without waiting.
+        self.assert_query_count(
+            'api:v2:baskets:wait_for_order', 6, 'get', reverse('api:v2:baskets:wait_for_order', kwargs=kwargs),
+            {'status': ORDER.OPEN}
+        )
+
+    def test_basket_order_wait(self):
+        order = self.place_order()
+        Order.objects.filter(id=order.id).update(status=ORDER.OPEN)
+
+        def complete_order(*args):  # pylint: disable=unused-argument
+            Order.objects.filter(id=order.id).update(status=ORDER.COMPLETE)
+            return True
+
+        endpoint = 'api:v2:baskets:wait_for_order'
+        path = reverse(endpoint, kwargs={'basket_id': order.basket_id})
+        with mock.patch.object(notifier, 'wait', side_effect=complete_order):
+            # The request also executes the query by which the order's status is changed.
+            self.assert_query_count(
+                endpoint, EXPECTED_QUERY_COUNTS[endpoint] + 1, 'get', path, {'status': ORDER.OPEN, 'timeout': 10}
+            )
+
+    def test_payment_processors(self):
+        self.assert_typical_query_count(
+            'api:v2:payment:list_processors', 'get', reverse('api:v2:payment:list_processors')
+        )
+
+    def test_fulfill(self):
+        order = self.place_order()
+        order.user.is_superuser = True
+        order.user.save()
+
+        for endpoint in ('api:v1:orders:fulfill', 'api:v2:orders:fulfill'):
+            Order.objects.filter(id=order.id).update(status=ORDER.FULFILLMENT_ERROR)
+            order.lines.update(status=LINE.FULFILLMENT_SERVER_ERROR)
+            self.assert_typical_query_count(endpoint, 'put', reverse(endpoint, kwargs={'number': order.number}))
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""Parity tests for the compiled order serializer."""
+from decimal import Decimal as D
+
+from django.test import TestCase
+from oscar.core.loading import get_model
+from oscar.test import factories
+from rest_framework.renderers import JSONRenderer
+
+from ecommerce.extensions.api.serializers import CompiledOrderSerializer, OrderSerializer
+
+
+Order = get_model('order', 'Order')
+
+
+class CompiledOrderSerializerTests(TestCase):
+    """Verify that CompiledOrderSerializer output is identical to OrderSerializer output."""
+
+    def assert_parity(self, instance, many=False):
+        """Verify that both serializers produce equal data, rendered to identical bytes."""
+        expected = OrderSerializer(instance, many=many).data
+        actual = CompiledOrderSerializer(instance, many=many).data
+
+        self.assertEqual(actual, expected)
+        self.assertEqual(list(actual), list(expected))
+        self.assertEqual(JSONRenderer().render(actual), JSONRenderer().render(expected))
+
+    def create_order_with_source(self):
+        """Create an order with a billing address and a payment source with transactions."""
+        billing_address = factories.BillingAddressFactory(line3=u'Ünïcode Lane', state='MA')
+        order = factories.create_order(billing_address=billing_address)
+
+        source = factories.SourceFactory(
+            order=order,
+            amount_allocated=D('10.005'),
+            amount_debited=D('10'),
+            reference=u'ρεφερενψε',
+            label='',
+        )
+        factories.TransactionFactory(source=source, txn_type='Debit', amount=D('10.00'))
+        factories.TransactionFactory(source=source, txn_type='Refund', amount=D('0.5'))
+
+        return order
+
+    def test_order(self):
+        """An order without a billing address or sources should serialize identically."""
+        self.assert_parity(factories.create_order())
+
+    def test_order_with_source_and_billing_address(self):
+        """Nested sources, transactions and billing addresses should serialize identically."""
+        self.assert_parity(self.create_order_with_source())
+
+    def test_order_with_multiple_lines(self):
+        """Every line of an order should serialize identically."""
+        basket = factories.create_basket()
+        product = factories.create_product()
+        factories.create_stockrecord(product, num_in_stock=2, price_excl_tax=D('99.999'))
+        basket.add_product(product, quantity=2)
+        order = factories.create_order(basket=basket)
+
+        self.assertEqual(order.lines.count(), 2)
+        self.assert_parity(order)
+
+    def test_many(self):
+        """Lists of orders, such as those on list endpoints, should serialize identically."""
+        factories.create_order()
+        self.create_order_with_source()
+
+        self.assert_parity(Order.objects.all(), many=True)
+        self.assert_parity(
+            Order.objects.prefetch_related('lines', 'sources__transactions').select_related('billing_address'),
+            many=True
+        )
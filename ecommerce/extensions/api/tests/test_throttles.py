@@ -0,0 +1,27 @@
+"""Tests of the API's throttles."""
+from django.core.cache import cache
+from django.test import TestCase, RequestFactory
+import mock
+
+from ecommerce.extensions.api.throttles import THROTTLED_REQUESTS, UserRateThrottle
+from ecommerce.tests.mixins import UserMixin
+
+
+class UserRateThrottleTests(UserMixin, TestCase):
+    def setUp(self):
+        super(UserRateThrottleTests, self).setUp()
+        self.addCleanup(cache.clear)
+
+    @mock.patch.object(THROTTLED_REQUESTS, 'inc')
+    def test_throttled_requests_counted(self, mock_inc):
+        """Verify that requests rejected by the throttle are counted."""
+        request = RequestFactory().get('/')
+        request.user = self.create_user()
+
+        throttle = UserRateThrottle()
+        for __ in xrange(throttle.num_requests):
+            self.assertTrue(throttle.allow_request(request, None))
+        self.assertFalse(mock_inc.called)
+
+        self.assertFalse(throttle.allow_request(request, None))
+        mock_inc.assert_called_once_with(scope='user')
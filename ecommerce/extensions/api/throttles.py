@@ -0,0 +1,19 @@
+"""Throttles which record the requests they reject."""
+from rest_framework import throttling
+
+from ecommerce import metrics
+
+
+THROTTLED_REQUESTS = metrics.Counter(
+    'ecommerce_throttled_requests_total', 'API requests rejected by rate throttles, by scope.', ('scope',)
+)
+
+
+class UserRateThrottle(throttling.UserRateThrottle):
+    """Limits the rate of API requests made by each user, counting the requests rejected."""
+
+    def allow_request(self, request, view):
+        allowed = super(UserRateThrottle, self).allow_request(request, view)
+        if not allowed:
+            THROTTLED_REQUESTS.inc(scope=self.scope)
+        return allowed
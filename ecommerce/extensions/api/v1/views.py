@@ -3,6 +3,7 @@ import logging
 
 from django.conf import settings
 from django.http import Http404
+from oscar.apps.basket.signals import basket_addition
 from oscar.core.loading import get_class, get_classes, get_model
 from rest_framework import status
 from rest_framework.generics import UpdateAPIView, RetrieveAPIView, ListCreateAPIView
@@ -10,6 +11,8 @@ from rest_framework.permissions import IsAuthenticated, DjangoModelPermissions
 from rest_framework.response import Response
 
 from ecommerce.extensions.api import data, exceptions, serializers
+from ecommerce.extensions.api.decorators import idempotent
+from ecommerce.extensions.api.mixins import NonAtomicRequestsMixin, ReadReplicaMixin
 from ecommerce.extensions.fulfillment.mixins import FulfillmentMixin
 from ecommerce.extensions.payment.helpers import get_processor_class
 
@@ -22,10 +25,12 @@ Order = get_model('order', 'Order')
 OrderTotalCalculator = get_class('checkout.calculators', 'OrderTotalCalculator')
 
 # pylint: disable=unbalanced-tuple-unpacking
-OrderCreator, OrderNumberGenerator = get_classes('order.utils', ['OrderCreator', 'OrderNumberGenerator'])
+FreeOrderCreator, OrderCreator, OrderNumberGenerator = get_classes(
+    'order.utils', ['FreeOrderCreator', 'OrderCreator', 'OrderNumberGenerator']
+)
 
 
-class RetrieveOrderView(RetrieveAPIView):
+class RetrieveOrderView(ReadReplicaMixin, RetrieveAPIView):
     """Allow the viewing of Paid Orders.
 
     Given an order number, allow the viewing of a paid order. This endpoint will only return an order if
@@ -63,7 +68,7 @@ class RetrieveOrderView(RetrieveAPIView):
         }'
     """
     permission_classes = (IsAuthenticated,)
-    serializer_class = serializers.OrderSerializer
+    serializer_class = serializers.CompiledOrderSerializer
     lookup_field = 'number'
     queryset = Order.objects.all()
 
@@ -88,7 +93,7 @@ class RetrieveOrderView(RetrieveAPIView):
             raise Http404
 
 
-class OrderListCreateAPIView(FulfillmentMixin, ListCreateAPIView):
+class OrderListCreateAPIView(NonAtomicRequestsMixin, ReadReplicaMixin, FulfillmentMixin, ListCreateAPIView):
     """
     Endpoint for listing or creating orders.
 
@@ -102,6 +107,14 @@ class OrderListCreateAPIView(FulfillmentMixin, ListCreateAPIView):
     def get_queryset(self):
         return self.request.user.orders.order_by('-date_placed')
 
+    def get_serializer_class(self):
+        # Listing is read-only, so it can use the compiled serializer. The regular serializer
+        # is kept for other methods, such as when the browsable API renders the creation form.
+        if self.request.method == 'GET':
+            return serializers.CompiledOrderSerializer
+        return self.serializer_class
+
+    @idempotent
     def create(self, request, *args, **kwargs):
         """Add one product to a basket, then prepare an order.
 
@@ -117,6 +130,10 @@ class OrderListCreateAPIView(FulfillmentMixin, ListCreateAPIView):
         total is zero (i.e., the ordered product was free), an attempt to
         fulfill the order is made.
 
+        Callers may safely retry requests by sending a unique value in the
+        Idempotency-Key HTTP header. Retries with the same key receive the
+        original response, without another order being placed.
+
         Arguments:
             request (HttpRequest)
 
@@ -179,8 +196,8 @@ class OrderListCreateAPIView(FulfillmentMixin, ListCreateAPIView):
 
         # If an exception is raised before order creation but after basket creation,
         # an empty basket for the user will be left in the system. However, if this
-        # user attempts to order again, the `get_basket` utility will merge all old
-        # baskets with a new one, returning a fresh basket.
+        # user attempts to order again, the `get_basket` utility will return that
+        # basket rather than creating another one.
         if not availability.is_available_to_buy:
             return self._report_bad_request(
                 exceptions.PRODUCT_UNAVAILABLE_DEVELOPER_MESSAGE.format(
@@ -224,10 +241,11 @@ class OrderListCreateAPIView(FulfillmentMixin, ListCreateAPIView):
         # Baskets with a status of 'Frozen' or 'Submitted' are not retrieved at the
         # start of a new order. To prevent stale items from ending up in the basket
         # at the start of an order, we want to guarantee that this endpoint creates
-        # new orders iff the basket in use is frozen first. Since ATOMIC_REQUESTS is
-        # assumed to be enabled, wrapping this block with an `atomic()` context
-        # manager to ensure atomicity would be redundant.
+        # new orders iff the basket in use is frozen first. Since the `idempotent`
+        # decorator executes `create` in a transaction, wrapping this block with an
+        # `atomic()` context manager to ensure atomicity would be redundant.
         basket.add_product(product)
+        basket_addition.send(sender=self, product=product, user=basket.owner, request=self.request)
         basket.freeze()
 
         logger.info(
@@ -240,7 +258,9 @@ class OrderListCreateAPIView(FulfillmentMixin, ListCreateAPIView):
         shipping_charge = shipping_method.calculate(basket)
         total = OrderTotalCalculator().calculate(basket, shipping_charge)
 
-        order = OrderCreator().place_order(
+        # Free orders have no discounts or payment details, so can be placed with fewer queries
+        creator = FreeOrderCreator() if total.excl_tax == self.FREE else OrderCreator()
+        order = creator.place_order(
             basket,
             total,
             shipping_method,
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 """Unit tests of ecommerce API views."""
+import datetime
 import json
 import logging
 from decimal import Decimal
@@ -9,23 +10,31 @@ import ddt
 import httpretty
 import mock
 from django.contrib.auth import get_user_model
-from django.core.urlresolvers import reverse
+from django.core.management import call_command
+from django.core.urlresolvers import resolve, reverse
 from django.test import TestCase, override_settings
+from django.utils.timezone import now
 from oscar.test import factories
 from oscar.core.loading import get_model
 from rest_framework import status
 from rest_framework.throttling import UserRateThrottle
 
-from ecommerce.extensions.api import exceptions as api_exceptions
+from ecommerce.extensions.api import data, exceptions as api_exceptions
 from ecommerce.extensions.api.serializers import OrderSerializer
 from ecommerce.extensions.api.constants import APIConstants as AC
+from ecommerce.extensions.api.models import IdempotentResponse
 from ecommerce.extensions.api.tests.test_authentication import AccessTokenMixin, OAUTH2_PROVIDER_URL
+from ecommerce.extensions.api.v2.views import OrderByBasketWaitView
+from ecommerce.extensions.fulfillment.status import LINE, ORDER
+from ecommerce.extensions.order.notifications import notifier
 from ecommerce.extensions.payment import exceptions as payment_exceptions
 from ecommerce.extensions.payment.processors import BasePaymentProcessor, Cybersource
 from ecommerce.tests.mixins import UserMixin, ThrottlingMixin, BasketCreationMixin
 
 
 Basket = get_model('basket', 'Basket')
+Order = get_model('order', 'Order')
+ShippingEventType = get_model('order', 'ShippingEventType')
 
 
 @ddt.ddt
@@ -213,6 +222,93 @@ class BasketCreateViewTests(BasketCreationMixin, ThrottlingMixin, TestCase):
         response = self.create_basket(skus=[self.PAID_SKU], token=token)
         self.assertEqual(response.status_code, 401)
 
+    def test_idempotent_retry(self):
+        """Test that retried requests with the same idempotency key replay the original response."""
+        ShippingEventType.objects.create(name=self.SHIPPING_EVENT_NAME)
+
+        response = self.create_basket(skus=[self.FREE_SKU], checkout=True, idempotency_key='retry-me')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Idempotent-Replayed', response)
+
+        # Session and user retrieval, and the stored response lookup
+        with self.assertNumQueries(3):
+            retry = self.create_basket(skus=[self.FREE_SKU], checkout=True, idempotency_key='retry-me')
+        self.assertEqual(retry.status_code, 200)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(json.loads(retry.content), json.loads(response.content))
+
+        # The basket was only populated, and the order only placed, once
+        self.assertEqual(Basket.objects.get().num_lines, 1)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_concurrent_idempotent_retry(self):
+        """Test that retries made while the original request is in progress are rejected without waiting for it."""
+        # The key must be claimed outside of the transaction in which the request's work is done.
+        self.assertTrue(resolve(self.PATH).func._non_atomic_requests)  # pylint: disable=protected-access
+
+        retries = []
+        get_basket = data.get_basket
+
+        def retry_and_get_basket(user):
+            retries.append(self.create_basket(skus=[self.PAID_SKU], idempotency_key='retry-me'))
+            return get_basket(user)
+
+        with mock.patch.object(data, 'get_basket', side_effect=retry_and_get_basket):
+            response = self.create_basket(skus=[self.PAID_SKU], idempotency_key='retry-me')
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(len(retries), 1)
+        retry = retries[0]
+        self.assertEqual(retry.status_code, 409)
+        self.assertEqual(
+            retry.data['developer_message'],
+            api_exceptions.IDEMPOTENCY_KEY_IN_PROGRESS_DEVELOPER_MESSAGE.format(key='retry-me')
+        )
+
+        # Once the original request is complete, retries receive its response.
+        retry = self.create_basket(skus=[self.PAID_SKU], idempotency_key='retry-me')
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(json.loads(retry.content), json.loads(response.content))
+        self.assertEqual(Basket.objects.get().num_lines, 1)
+
+    def test_idempotency_key_reused(self):
+        """Test that reusing an idempotency key for a different request fails."""
+        response = self.create_basket(skus=[self.PAID_SKU], idempotency_key='reuse-me')
+        self.assertEqual(response.status_code, 200)
+
+        response = self.create_basket(skus=[self.ALTERNATE_PAID_SKU], idempotency_key='reuse-me')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data['developer_message'],
+            api_exceptions.IDEMPOTENCY_KEY_REUSED_DEVELOPER_MESSAGE.format(key='reuse-me')
+        )
+
+    def test_idempotent_bad_request(self):
+        """Test that responses to bad requests are also replayed."""
+        response = self.create_basket(skus=[self.BAD_SKU], idempotency_key='bad-request')
+        self.assertEqual(response.status_code, 400)
+
+        retry = self.create_basket(skus=[self.BAD_SKU], idempotency_key='bad-request')
+        self.assertEqual(retry.status_code, 400)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(json.loads(retry.content), json.loads(response.content))
+
+    def test_expired_idempotency_key(self):
+        """Test that requests made after an idempotency key has expired are executed again."""
+        self.create_basket(skus=[self.PAID_SKU], idempotency_key='expire-me')
+        IdempotentResponse.objects.update(expires=now() - datetime.timedelta(seconds=1))
+
+        response = self.create_basket(skus=[self.ALTERNATE_PAID_SKU], idempotency_key='expire-me')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Idempotent-Replayed', response)
+        self.assertEqual(Basket.objects.get().num_lines, 2)
+
+        call_command('delete_expired_idempotent_responses')
+        self.assertEqual(IdempotentResponse.objects.count(), 1)
+        IdempotentResponse.objects.update(expires=now() - datetime.timedelta(seconds=1))
+        call_command('delete_expired_idempotent_responses')
+        self.assertFalse(IdempotentResponse.objects.exists())
+
     def _bad_request_dict(self, developer_message, user_message):
         bad_request_dict = {
             'developer_message': developer_message,
@@ -247,6 +343,20 @@ class RetrieveOrderViewTests(ThrottlingMixin, UserMixin, TestCase):
         response = self.client.get(self.url, HTTP_AUTHORIZATION=other_token)
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
+    def test_get_order_fields(self):
+        """Test that only the fields named in the fields query parameter are returned."""
+        response = self.client.get(self.url, {'fields': 'status,number'}, HTTP_AUTHORIZATION=self.token)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            json.loads(response.content),
+            {'number': unicode(self.order.number), 'status': self.order.status}
+        )
+
+    def test_get_order_unknown_fields(self):
+        """Test that requesting a field orders don't have results in a 400."""
+        response = self.client.get(self.url, {'fields': 'number,not-a-field'}, HTTP_AUTHORIZATION=self.token)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
 
 class OrderByBasketRetrieveViewTests(RetrieveOrderViewTests):
     """Test cases for getting orders using the basket id. """
@@ -255,6 +365,81 @@ class OrderByBasketRetrieveViewTests(RetrieveOrderViewTests):
         return reverse('api:v2:baskets:retrieve_order', kwargs={'basket_id': self.order.basket.id})
 
 
+@ddt.ddt
+class OrderByBasketWaitViewTests(RetrieveOrderViewTests):
+    """Test cases for long-polling for changes to orders' statuses. """
+    def setUp(self):
+        super(OrderByBasketWaitViewTests, self).setUp()
+        # Don't wait in the test cases inherited from RetrieveOrderViewTests.
+        patcher = mock.patch.object(OrderByBasketWaitView, 'DEFAULT_TIMEOUT', 0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @property
+    def url(self):
+        return reverse('api:v2:baskets:wait_for_order', kwargs={'basket_id': self.order.basket.id})
+
+    def wait(self, **params):
+        response = self.client.get(self.url, params, HTTP_AUTHORIZATION=self.token)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data[AC.KEYS.ORDER_STATUS]
+
+    def complete_order(self, *args):  # pylint: disable=unused-argument
+        """Complete the order, as another request would."""
+        self.order.set_status(ORDER.COMPLETE)
+        return True
+
+    def test_status_already_changed(self):
+        """The order should be returned immediately if its status differs from the given one."""
+        with mock.patch.object(notifier, 'wait') as mock_wait:
+            self.assertEqual(self.wait(status='Pending', timeout=10), ORDER.OPEN)
+            self.assertFalse(mock_wait.called)
+
+    def test_notified(self):
+        """The order should be returned once the waiter is notified of a change to its status."""
+        with mock.patch.object(notifier, 'wait', side_effect=self.complete_order) as mock_wait:
+            self.assertEqual(self.wait(timeout=10), ORDER.COMPLETE)
+            self.assertEqual(mock_wait.call_count, 1)
+
+    def test_changed_by_other_process(self):
+        """Status changes made by other processes should be noticed when the waiter rechecks the status version."""
+        def complete_order_elsewhere(*args):  # pylint: disable=unused-argument
+            Order.objects.filter(id=self.order.id).update(status=ORDER.COMPLETE)
+            notifier.notify(self.order.number)
+            return False
+
+        with mock.patch.object(notifier, 'wait', side_effect=complete_order_elsewhere):
+            self.assertEqual(self.wait(timeout=10), ORDER.COMPLETE)
+
+    def test_timeout(self):
+        """The unchanged order should be returned once the timeout expires."""
+        with mock.patch.object(notifier, 'wait', return_value=False) as mock_wait:
+            self.assertEqual(self.wait(timeout=0.01), ORDER.OPEN)
+            self.assertTrue(mock_wait.called)
+
+    def test_timeout_while_awaiting_commit(self):
+        """Waiting for notified status changes to be committed should end once the timeout expires."""
+        clock = mock.Mock()
+        clock.time.return_value = 1000.0
+
+        def sleep(seconds):
+            clock.time.return_value += seconds
+
+        clock.sleep.side_effect = sleep
+
+        with mock.patch.object(notifier, 'wait', return_value=True):
+            with mock.patch('ecommerce.extensions.api.v2.views.time', clock):
+                self.assertEqual(self.wait(timeout=0.2), ORDER.OPEN)
+
+        self.assertAlmostEqual(sum(call[0][0] for call in clock.sleep.call_args_list), 0.2)
+
+    @ddt.data('soon', '-1', '61')
+    def test_invalid_timeout(self, timeout):
+        """Timeouts which aren't a number of seconds between 0 and MAX_TIMEOUT should be rejected."""
+        response = self.client.get(self.url, {'timeout': timeout}, HTTP_AUTHORIZATION=self.token)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
 class OrderListViewTests(AccessTokenMixin, ThrottlingMixin, UserMixin, TestCase):
     def setUp(self):
         super(OrderListViewTests, self).setUp()
@@ -311,6 +496,26 @@ class OrderListViewTests(AccessTokenMixin, ThrottlingMixin, UserMixin, TestCase)
         self.assertEqual(content['results'][0]['number'], unicode(order_2.number))
         self.assertEqual(content['results'][1]['number'], unicode(order.number))
 
+    def test_with_fields(self):
+        """ The view should only serialize, and only fetch data for, the requested fields. """
+        for __ in xrange(3):
+            factories.create_order(user=self.user)
+
+        # The full representation prefetches its nested objects instead of fetching them per order.
+        with self.assertNumQueries(8):
+            response = self.client.get(self.path, HTTP_AUTHORIZATION=self.token)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)['results'][0]['lines'][0]['status'], LINE.OPEN)
+
+        with self.assertNumQueries(5):
+            response = self.client.get(self.path, {'fields': 'number,status'}, HTTP_AUTHORIZATION=self.token)
+        self.assertEqual(response.status_code, 200)
+
+        content = json.loads(response.content)
+        self.assertEqual(content['count'], 3)
+        for result in content['results']:
+            self.assertEqual(set(result), {'number', 'status'})
+
     def test_with_other_users_orders(self):
         """ The view should only return orders for the authenticated users. """
         other_user = self.create_user()
@@ -319,6 +524,74 @@ class OrderListViewTests(AccessTokenMixin, ThrottlingMixin, UserMixin, TestCase)
         self.assert_empty_result_response(response)
 
 
+@ddt.ddt
+class OrderStatusListViewTests(ThrottlingMixin, UserMixin, TestCase):
+    def setUp(self):
+        super(OrderStatusListViewTests, self).setUp()
+        self.path = reverse('api:v2:orders:statuses')
+        self.user = self.create_user()
+        self.token = self.generate_jwt_token_header(self.user)
+        self.orders = [factories.create_order(user=self.user) for __ in xrange(3)]
+
+    def get_statuses(self, **params):
+        return self.client.get(self.path, params, HTTP_AUTHORIZATION=self.token)
+
+    def assert_statuses_returned(self, response, orders):
+        """ Verifies that the response contains the statuses of exactly the given orders. """
+        self.assertEqual(response.status_code, 200)
+        expected = [
+            {'basket_id': order.basket.id, 'number': unicode(order.number), 'status': order.status}
+            for order in orders
+        ]
+        self.assertEqual(json.loads(response.content)['orders'], expected)
+
+    def test_not_authenticated(self):
+        """ If the user is not authenticated, the view should return HTTP status 401. """
+        response = self.client.get(self.path, {'numbers': self.orders[0].number})
+        self.assertEqual(response.status_code, 401)
+
+    def test_lookup(self):
+        """ Orders should be found by basket ID, by order number, or by both, using one query. """
+        response = self.get_statuses(basket_ids=','.join(str(order.basket.id) for order in self.orders))
+        self.assert_statuses_returned(response, self.orders)
+
+        response = self.get_statuses(numbers=self.orders[1].number)
+        self.assert_statuses_returned(response, self.orders[1:2])
+
+        # Savepoint creation and release, user retrieval, and the order lookup itself
+        with self.assertNumQueries(4):
+            response = self.get_statuses(basket_ids=self.orders[0].basket.id, numbers=self.orders[2].number)
+        self.assert_statuses_returned(response, [self.orders[0], self.orders[2]])
+
+    def test_other_users_orders(self):
+        """ Orders belonging to other users, and unknown orders, should be omitted. """
+        other_order = factories.create_order(user=self.create_user())
+        numbers = [str(other_order.number), 'not-an-order', str(self.orders[0].number)]
+        response = self.get_statuses(numbers=','.join(numbers))
+        self.assert_statuses_returned(response, self.orders[:1])
+
+    def test_caching(self):
+        """ Results should be cached briefly, so that repeated lookups don't hit the database. """
+        response = self.get_statuses(numbers=self.orders[0].number)
+        self.assert_statuses_returned(response, self.orders[:1])
+
+        # Savepoint creation and release, and user retrieval
+        with self.assertNumQueries(3):
+            response = self.get_statuses(numbers=self.orders[0].number)
+        self.assert_statuses_returned(response, self.orders[:1])
+
+    @ddt.data(
+        {},
+        {'numbers': ''},
+        {'basket_ids': 'not-an-id'},
+        {'numbers': ','.join(str(number) for number in xrange(301))},
+    )
+    def test_bad_request(self, params):
+        """ Missing, malformed, or too many identifiers should result in a 400. """
+        response = self.get_statuses(**params)
+        self.assertEqual(response.status_code, 400)
+
+
 class DummyProcessor1(BasePaymentProcessor):  # pylint: disable=abstract-method
     NAME = "dummy-1"
 
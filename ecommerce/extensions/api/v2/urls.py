@@ -14,11 +14,17 @@ BASKET_URLS = patterns(
         views.OrderByBasketRetrieveView.as_view(),
         name='retrieve_order'
     ),
+    url(
+        r'^{basket_id}/order/wait/$'.format(basket_id=BASKET_ID_PATTERN),
+        views.OrderByBasketWaitView.as_view(),
+        name='wait_for_order'
+    ),
 )
 
 ORDER_URLS = patterns(
     '',
     url(r'^$', views.OrderListView.as_view(), name='list'),
+    url(r'^statuses/$', views.OrderStatusListView.as_view(), name='statuses'),
     url(
         r'^{number}/$'.format(number=ORDER_NUMBER_PATTERN),
         views.OrderRetrieveView.as_view(),
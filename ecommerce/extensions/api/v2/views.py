@@ -1,19 +1,32 @@
 """HTTP endpoints for interacting with Oscar."""
+import hashlib
 import logging
+import time
 
 from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Q
 from django.http import Http404
+from oscar.apps.basket.signals import basket_addition
 from oscar.core.loading import get_model
 from rest_framework import status
+from rest_framework.exceptions import ParseError
 from rest_framework.generics import CreateAPIView, RetrieveAPIView, ListAPIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
+from ecommerce import metrics
+from ecommerce.extensions.analytics import api as analytics
 from ecommerce.extensions.api import data, exceptions as api_exceptions, serializers
 from ecommerce.extensions.api.constants import APIConstants as AC
+from ecommerce.extensions.api.decorators import idempotent
+from ecommerce.extensions.api.mixins import NonAtomicRequestsMixin, ReadReplicaMixin, SparseOrderFieldsMixin
 # noinspection PyUnresolvedReferences
 from ecommerce.extensions.api.v1.views import OrderFulfillView  # pylint: disable=unused-import
 from ecommerce.extensions.checkout.mixins import EdxOrderPlacementMixin
+from ecommerce.extensions.order.notifications import notifier
 from ecommerce.extensions.payment import exceptions as payment_exceptions
 from ecommerce.extensions.payment.helpers import (get_processor_class, get_default_processor_class,
                                                   get_processor_class_by_name)
@@ -21,10 +34,18 @@ from ecommerce.extensions.payment.helpers import (get_processor_class, get_defau
 
 logger = logging.getLogger(__name__)
 
+CHECKOUTS = metrics.Counter(
+    'ecommerce_checkouts_total', 'Checkouts performed through the basket API, by outcome.', ('outcome',)
+)
+CHECKOUT_DURATION = metrics.Histogram(
+    'ecommerce_checkout_duration_seconds', 'Time taken to perform checkouts through the basket API, by outcome.',
+    ('outcome',)
+)
+
 Order = get_model('order', 'Order')
 
 
-class BasketCreateView(EdxOrderPlacementMixin, CreateAPIView):
+class BasketCreateView(NonAtomicRequestsMixin, EdxOrderPlacementMixin, CreateAPIView):
     """Endpoint for creating baskets.
 
     If requested, performs checkout operations on baskets, placing an order if
@@ -32,6 +53,7 @@ class BasketCreateView(EdxOrderPlacementMixin, CreateAPIView):
     """
     permission_classes = (IsAuthenticated,)
 
+    @idempotent
     def create(self, request, *args, **kwargs):
         """Add products to the authenticated user's basket.
 
@@ -53,6 +75,11 @@ class BasketCreateView(EdxOrderPlacementMixin, CreateAPIView):
         contain user details. At a minimum, these details must include a
         username; providing an email is recommended.
 
+        Callers may safely retry requests by sending a unique value in the
+        Idempotency-Key HTTP header. Retries with the same key receive the
+        original response, without products being added or checkout being
+        performed again.
+
         Arguments:
             request (HttpRequest): With parameters 'products', 'checkout', and
                 'payment_processor_name' in the body.
@@ -121,19 +148,24 @@ class BasketCreateView(EdxOrderPlacementMixin, CreateAPIView):
 
         requested_products = request.data.get(AC.KEYS.PRODUCTS)
         if requested_products:
+            skus = []
             for requested_product in requested_products:
                 sku = requested_product.get(AC.KEYS.SKU)
-                if sku:
-                    try:
-                        product = data.get_product(sku)
-                    except api_exceptions.ProductNotFoundError as error:
-                        return self._report_bad_request(error.message, api_exceptions.PRODUCT_NOT_FOUND_USER_MESSAGE)
-                else:
+                if not sku:
                     return self._report_bad_request(
                         api_exceptions.SKU_NOT_FOUND_DEVELOPER_MESSAGE,
                         api_exceptions.SKU_NOT_FOUND_USER_MESSAGE
                     )
+                skus.append(sku)
 
+            try:
+                products = data.get_products(skus)
+            except api_exceptions.ProductNotFoundError as error:
+                return self._report_bad_request(error.message, api_exceptions.PRODUCT_NOT_FOUND_USER_MESSAGE)
+
+            # All products are validated before any are added, so that the basket is left
+            # untouched if any of them are unavailable.
+            for sku, product in zip(skus, products):
                 availability = basket.strategy.fetch_for_product(product).availability
                 if not availability.is_available_to_buy:
                     return self._report_bad_request(
@@ -144,12 +176,18 @@ class BasketCreateView(EdxOrderPlacementMixin, CreateAPIView):
                         api_exceptions.PRODUCT_UNAVAILABLE_USER_MESSAGE
                     )
 
-                basket.add_product(product)
-                logger.info(
-                    u"Added product with SKU [%s] to basket [%d]",
-                    sku,
-                    basket.id,
-                )
+            data.add_products(basket, products)
+            if settings.INSTALL_DEFAULT_ANALYTICS_RECEIVERS:
+                for product in products:
+                    basket_addition.send(sender=self, product=product, user=request.user, request=request)
+            elif settings.RECORD_ANALYTICS_EVENTS:
+                # Recorded together, rather than by a receiver of a signal sent for each product.
+                analytics.record_basket_additions(products, request.user)
+            logger.info(
+                u"Added products with SKUs [%s] to basket [%d]",
+                u', '.join(skus),
+                basket.id,
+            )
         else:
             return self._report_bad_request(
                 api_exceptions.PRODUCT_OBJECTS_MISSING_DEVELOPER_MESSAGE,
@@ -193,6 +231,7 @@ class BasketCreateView(EdxOrderPlacementMixin, CreateAPIView):
         Returns:
             dict: Response data.
         """
+        started = time.time()
         basket.freeze()
         logger.info(
             u"Froze basket [%d]",
@@ -211,20 +250,19 @@ class BasketCreateView(EdxOrderPlacementMixin, CreateAPIView):
             )
 
             # Place an order, attempting to fulfill it immediately
-            order = self.handle_order_placement(
+            order = self.handle_free_order_placement(
                 order_number=order_metadata[AC.KEYS.ORDER_NUMBER],
                 user=basket.owner,
                 basket=basket,
-                shipping_address=None,
                 shipping_method=order_metadata[AC.KEYS.SHIPPING_METHOD],
                 shipping_charge=order_metadata[AC.KEYS.SHIPPING_CHARGE],
-                billing_address=None,
                 order_total=order_metadata[AC.KEYS.ORDER_TOTAL],
             )
 
             # Note: Our order serializer could be used here, but in an effort to pare down the information
             # returned by this endpoint, simply returning the order number will suffice for now.
             response_data[AC.KEYS.ORDER] = {AC.KEYS.ORDER_NUMBER: order.number}
+            outcome = 'free_order'
         else:
             payment_data = {
                 AC.KEYS.PAYMENT_PROCESSOR_NAME: payment_processor.NAME,
@@ -233,6 +271,10 @@ class BasketCreateView(EdxOrderPlacementMixin, CreateAPIView):
             }
 
             response_data[AC.KEYS.PAYMENT_DATA] = payment_data
+            outcome = 'payment'
+
+        CHECKOUTS.inc(outcome=outcome)
+        CHECKOUT_DURATION.observe(time.time() - started, outcome=outcome)
 
         return response_data
 
@@ -269,23 +311,24 @@ class BasketCreateView(EdxOrderPlacementMixin, CreateAPIView):
         )
 
 
-class OrderListView(ListAPIView):
+class OrderListView(ReadReplicaMixin, SparseOrderFieldsMixin, ListAPIView):
     """Endpoint for listing orders.
 
     Results are ordered with the newest order being the first in the list of results.
+    A subset of order fields may be requested with the `fields` query parameter.
     """
     permission_classes = (IsAuthenticated,)
-    serializer_class = serializers.OrderSerializer
 
     def get_queryset(self):
-        return self.request.user.orders.order_by('-date_placed')
+        return self.prefetch_requested_fields(self.request.user.orders.order_by('-date_placed'))
 
 
-class OrderRetrieveView(RetrieveAPIView):
+class OrderRetrieveView(ReadReplicaMixin, SparseOrderFieldsMixin, RetrieveAPIView):
     """Allow the viewing of orders.
 
     Given an order number, allow the viewing of the corresponding order. This endpoint will return a 404 response
     status if no order is found. This endpoint will only return orders associated with the authenticated user.
+    A subset of order fields may be requested with the `fields` query parameter.
 
     Returns:
         Order: The requested order.
@@ -315,12 +358,19 @@ class OrderRetrieveView(RetrieveAPIView):
             "status": "Complete",
             "total_excl_tax": 0.0
         }'
+
+        >>> url = 'http://localhost:8002/api/v2/orders/100022?fields=number,status'
+        >>> response = requests.get(url, headers=headers)
+        >>> response.content
+        '{"number": "OSCR-100022", "status": "Complete"}'
     """
     permission_classes = (IsAuthenticated,)
-    serializer_class = serializers.OrderSerializer
     lookup_field = AC.KEYS.ORDER_NUMBER
     queryset = Order.objects.all()
 
+    def get_queryset(self):
+        return self.prefetch_requested_fields(super(OrderRetrieveView, self).get_queryset())
+
     def get_object(self):
         """Retrieve the order for this request.
 
@@ -336,7 +386,8 @@ class OrderRetrieveView(RetrieveAPIView):
 
         """
         order = super(OrderRetrieveView, self).get_object()
-        if order and order.user.username == self.request.user.username:
+        # Compare IDs, rather than usernames, to avoid fetching the order's user.
+        if order and order.user_id == self.request.user.id:
             return order
         else:
             raise Http404
@@ -351,6 +402,181 @@ class OrderByBasketRetrieveView(OrderRetrieveView):
     lookup_field = 'basket_id'
 
 
+class OrderByBasketWaitView(OrderByBasketRetrieveView):
+    """Long-poll for a change to the status of the order placed using a basket.
+
+    Works like OrderByBasketRetrieveView, except that the response is withheld until the
+    order's status differs from the one given in the `status` query parameter, or until
+    `timeout` seconds (at most MAX_TIMEOUT) have passed. If no status is given, the order's
+    status when the request is received is used. The order is returned in either case;
+    callers compare its status to decide whether to wait again.
+
+    Waiting requests are woken when the order's status is changed, and hold no database
+    connection or transaction while waiting. They are intended to be served by gevent workers,
+    with which many thousands of waiting requests may be held open cheaply.
+
+    Example:
+        >>> url = 'http://localhost:8002/api/v2/baskets/7/order/wait/?status=Open&timeout=30&fields=number,status'
+        >>> response = requests.get(url, headers=headers)
+        >>> response.content
+        '{"number": "OSCR-100007", "status": "Complete"}'
+    """
+    # Reads follow notifications of writes, so must be made from the primary.
+    read_replica = False
+
+    DEFAULT_TIMEOUT = 30
+    MAX_TIMEOUT = 60
+    # Number of seconds between checks for status changes made by other processes
+    RECHECK_INTERVAL = 5
+    # Notifications may precede the commit of the status change; these delays, in seconds,
+    # are waited in turn until the change is visible, or until the timeout expires.
+    COMMIT_DELAYS = (0, 0.05, 0.1, 0.25, 0.5, 1)
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Waiting within a transaction would hide status changes and hold the transaction open.
+        return transaction.non_atomic_requests(super(OrderByBasketWaitView, cls).as_view(**initkwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        timeout = self._get_timeout()
+        order = self.get_object()
+        known_status = request.query_params.get(AC.KEYS.ORDER_STATUS, order.status)
+
+        if order.status == known_status and self._wait_for_status_change(order, known_status, timeout):
+            order = self.get_object()
+
+        return Response(self.get_serializer(order).data)
+
+    def _get_timeout(self):
+        value = self.request.query_params.get(AC.KEYS.TIMEOUT)
+        if value is None:
+            return self.DEFAULT_TIMEOUT
+
+        try:
+            timeout = float(value)
+        except ValueError:
+            timeout = None
+
+        if timeout is None or not 0 <= timeout <= self.MAX_TIMEOUT:
+            raise ParseError(
+                api_exceptions.TIMEOUT_INVALID_DEVELOPER_MESSAGE.format(timeout=value, maximum=self.MAX_TIMEOUT)
+            )
+
+        return timeout
+
+    def _wait_for_status_change(self, order, known_status, timeout):
+        """Wait until the order's status differs from the given status.
+
+        Returns:
+            bool: True if the status changed, False if the timeout expired first.
+        """
+        deadline = time.time() + timeout
+        version = notifier.get_version(order.number)
+
+        while True:
+            # Don't hold a database connection while idle. Connections can't be closed within a transaction.
+            if not connection.in_atomic_block:
+                connection.close()
+
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return False
+
+            notified = notifier.wait(order.number, min(remaining, self.RECHECK_INTERVAL))
+            current_version = notifier.get_version(order.number)
+            if not notified and current_version == version:
+                continue
+
+            version = current_version
+            for delay in self.COMMIT_DELAYS:
+                time.sleep(min(delay, max(0, deadline - time.time())))
+                if Order.objects.filter(id=order.id).exclude(status=known_status).exists():
+                    return True
+                if time.time() >= deadline:
+                    return False
+
+
+class OrderStatusListView(ReadReplicaMixin, APIView):
+    """Look up the statuses of many of the authenticated user's orders at once.
+
+    Orders are identified by the IDs of the baskets from which they were placed, by
+    their order numbers, or by a mix of both. Each identifier list is passed as a
+    comma-separated query parameter. All orders are retrieved with a single query,
+    and results are cached briefly, so that clients polling for order completion
+    can do so with one request rather than one request per basket.
+
+    Orders which don't exist, or which belong to other users, are omitted from the results.
+
+    Example:
+        >>> url = 'http://localhost:8002/api/v2/orders/statuses/?basket_ids=7,8&numbers=OSCR-100042'
+        >>> response = requests.get(url, headers=headers)
+        >>> json.loads(response.content)
+        {
+            u'orders': [
+                {u'basket_id': 7, u'number': u'OSCR-100007', u'status': u'Complete'},
+                {u'basket_id': 42, u'number': u'OSCR-100042', u'status': u'Open'}
+            ]
+        }
+    """
+    permission_classes = (IsAuthenticated,)
+
+    # Maximum number of basket IDs and order numbers, combined, which may be looked up in one request
+    MAX_LOOKUPS = 300
+    # Number of seconds for which results are cached
+    CACHE_TIMEOUT = 5
+
+    def get(self, request):
+        basket_ids = self._get_list_parameter(AC.KEYS.BASKET_IDS)
+        numbers = self._get_list_parameter(AC.KEYS.ORDER_NUMBERS)
+
+        if not (basket_ids or numbers):
+            raise ParseError(api_exceptions.ORDER_LOOKUPS_MISSING_DEVELOPER_MESSAGE)
+
+        if len(basket_ids) + len(numbers) > self.MAX_LOOKUPS:
+            raise ParseError(api_exceptions.ORDER_LOOKUPS_EXCEEDED_DEVELOPER_MESSAGE.format(limit=self.MAX_LOOKUPS))
+
+        basket_ids = sorted(set(self._parse_basket_id(basket_id) for basket_id in basket_ids))
+        numbers = sorted(set(numbers))
+
+        cache_key = self._get_cache_key(request.user, basket_ids, numbers)
+        orders = cache.get(cache_key)
+        if orders is None:
+            orders = self._get_order_statuses(request.user, basket_ids, numbers)
+            cache.set(cache_key, orders, self.CACHE_TIMEOUT)
+
+        return Response({AC.KEYS.ORDERS: orders})
+
+    def _get_list_parameter(self, name):
+        """Split a comma-separated query parameter into a list of non-empty values."""
+        value = self.request.query_params.get(name, u'')
+        return [item.strip() for item in value.split(',') if item.strip()]
+
+    def _parse_basket_id(self, basket_id):
+        try:
+            return int(basket_id)
+        except ValueError:
+            raise ParseError(api_exceptions.BASKET_ID_INVALID_DEVELOPER_MESSAGE.format(basket_id=basket_id))
+
+    def _get_cache_key(self, user, basket_ids, numbers):
+        identifiers = u'{basket_ids}|{numbers}'.format(
+            basket_ids=u','.join(unicode(basket_id) for basket_id in basket_ids),
+            numbers=u','.join(numbers)
+        )
+        digest = hashlib.md5(identifiers.encode('utf-8')).hexdigest()
+        return u'order_statuses.{user_id}.{digest}'.format(user_id=user.id, digest=digest)
+
+    def _get_order_statuses(self, user, basket_ids, numbers):
+        """Retrieve the statuses of the given user's matching orders with a single query."""
+        lookup = Q()
+        if basket_ids:
+            lookup |= Q(basket_id__in=basket_ids)
+        if numbers:
+            lookup |= Q(number__in=numbers)
+
+        fields = (AC.KEYS.ORDER_BASKET_ID, AC.KEYS.ORDER_NUMBER, AC.KEYS.ORDER_STATUS)
+        return list(Order.objects.filter(lookup, user=user).order_by('id').values(*fields))
+
+
 class PaymentProcessorListView(ListAPIView):
     """View that lists the available payment processors."""
     pagination_class = None
@@ -1,11 +1,25 @@
 from django.conf.urls import url, include
 from oscar import app
 
+from ecommerce.routers import use_read_replica
+
 
 class EdxShop(app.Shop):
     # URLs are only visible to users with staff permissions
     default_permissions = 'is_staff'
 
+    # Names of read-mostly dashboard URLs whose safe requests read from the read replica
+    read_replica_url_names = ('order-list', 'catalogue-product-list', 'partner-list', 'users-index')
+
+    def get_url_decorator(self, pattern):
+        decorator = super(EdxShop, self).get_url_decorator(pattern)
+        if pattern.name not in self.read_replica_url_names:
+            return decorator
+
+        if decorator is None:
+            return use_read_replica
+        return lambda view: decorator(use_read_replica(view))
+
     def get_urls(self):
         urls = [
             # Make management dashboard accessible at the root
@@ -1,13 +1,15 @@
-from oscar.core.loading import get_model
+from oscar.core.loading import get_class, get_model
 from oscar.apps.checkout.mixins import OrderPlacementMixin
 
 from ecommerce.extensions.fulfillment.mixins import FulfillmentMixin
 from ecommerce.extensions.fulfillment.status import ORDER
+from ecommerce.extensions.order.reference_data import source_types
 from ecommerce.extensions.order.constants import PaymentEventTypeName
 
 
 Source = get_model('payment', 'Source')
-SourceType = get_model('payment', 'SourceType')
+
+FreeOrderCreator = get_class('order.utils', 'FreeOrderCreator')
 
 
 class EdxOrderPlacementMixin(OrderPlacementMixin, FulfillmentMixin):
@@ -40,7 +42,7 @@ class EdxOrderPlacementMixin(OrderPlacementMixin, FulfillmentMixin):
         # NOTE: If the payment processor in use requires us to explicitly clear
         # authorized transactions (e.g., PayPal), this method should be modified to
         # perform any necessary requests.
-        source_type, __ = SourceType.objects.get_or_create(name=payment_processor.NAME)
+        source_type = source_types.get_or_create(payment_processor.NAME)
         source = Source(
             source_type=source_type,
             reference=reference,
@@ -55,6 +57,28 @@ class EdxOrderPlacementMixin(OrderPlacementMixin, FulfillmentMixin):
             reference=reference
         )
 
+    def handle_free_order_placement(self, order_number, user, basket, shipping_method, shipping_charge,
+                                    order_total):
+        """Place an order for a free basket, then take any actions required after it has been placed.
+
+        Equivalent to `handle_order_placement`, but uses the FreeOrderCreator, since free orders
+        have no addresses, payment details or discounts to record.
+
+        Returns:
+            Order: The newly-placed order.
+        """
+        order = FreeOrderCreator().place_order(
+            basket,
+            order_total,
+            shipping_method,
+            shipping_charge,
+            user=user,
+            order_number=order_number,
+            status=self.get_initial_order_status(basket)
+        )
+        basket.submit()
+        return self.handle_successful_order(order)
+
     def handle_successful_order(self, order):
         """Take any actions required after an order has been successfully placed.
 
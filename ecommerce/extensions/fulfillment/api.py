@@ -6,17 +6,28 @@ can successfully fulfill the product. Success can be reported back based on each
 
 """
 import logging
+import time
 
 from django.conf import settings
 from django.utils import importlib
 
+from ecommerce import metrics, timing
 from ecommerce.extensions.fulfillment import exceptions
 from ecommerce.extensions.fulfillment.status import ORDER, LINE
 
 
 logger = logging.getLogger(__name__)
 
+FULFILLED_ORDERS = metrics.Counter(
+    'ecommerce_fulfilled_orders_total', 'Orders whose fulfillment was attempted, by resulting status.', ('status',)
+)
+FULFILLED_LINES = metrics.Counter(
+    'ecommerce_fulfilled_lines_total', 'Order lines whose fulfillment was attempted, by resulting status.', ('status',)
+)
+FULFILLMENT_DURATION = metrics.Histogram('ecommerce_fulfillment_duration_seconds', 'Time taken to fulfill orders.')
 
+
+@timing.timed(timing.FULFILLMENT)
 def fulfill_order(order, lines):
     """ Fulfills line items in an Order
 
@@ -36,6 +47,7 @@ def fulfill_order(order, lines):
 
     """
     logger.info("Attempting to fulfill products for order [%s]", order.number)
+    started = time.time()
     if ORDER.COMPLETE not in order.available_statuses():
         error_msg = "Order has a current status of [{status}] which cannot be fulfilled.".format(status=order.status)
         logger.error(error_msg)
@@ -70,10 +82,13 @@ def fulfill_order(order, lines):
         # Check if all lines are successful, or there were errors, and set the status of the Order.
         order_status = ORDER.COMPLETE
         for line in lines.all():
-            if line.status != LINE.COMPLETE:
+            FULFILLED_LINES.inc(status=line.status)
+            if line.status != LINE.COMPLETE and order_status == ORDER.COMPLETE:
                 logger.error('There was an error while fulfilling order [%s]', order.number)
                 order_status = ORDER.FULFILLMENT_ERROR
-                break
         order.set_status(order_status)
         logger.info("Finished fulfilling order [%s] with status [%s]", order.number, order.status)
+
+        FULFILLED_ORDERS.inc(status=order.status)
+        FULFILLMENT_DURATION.observe(time.time() - started)
         return order  # pylint: disable=lost-exception
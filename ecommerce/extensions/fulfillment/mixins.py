@@ -1,8 +1,8 @@
 """Mixins to support views that fulfill orders."""
-from oscar.core.loading import get_model, get_class
+from oscar.core.loading import get_class
 
+from ecommerce.extensions.order.reference_data import shipping_event_types
 
-ShippingEventType = get_model('order', 'ShippingEventType')
 
 EventHandler = get_class('order.processing', 'EventHandler')
 
@@ -16,6 +16,6 @@ class FulfillmentMixin(object):
         order_lines = order.lines.all()
         line_quantities = [line.quantity for line in order_lines]
 
-        shipping_event, __ = ShippingEventType.objects.get_or_create(name=self.SHIPPING_EVENT_NAME)
+        shipping_event = shipping_event_types.get_or_create(self.SHIPPING_EVENT_NAME)
         fulfilled_order = EventHandler().handle_shipping_event(order, shipping_event, order_lines, line_quantities)
         return fulfilled_order
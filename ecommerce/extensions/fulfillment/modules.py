@@ -10,9 +10,9 @@ import logging
 from django.conf import settings
 from oscar.apps.catalogue.models import ProductAttributeValue
 from rest_framework import status
-import requests
 from requests.exceptions import ConnectionError, Timeout
 
+from ecommerce import outbound
 from ecommerce.extensions.fulfillment.status import LINE
 
 
@@ -164,7 +164,8 @@ class EnrollmentFulfillmentModule(BaseFulfillmentModule):
             }
 
             try:
-                response = requests.post(
+                response = outbound.post(
+                    outbound.ENROLLMENT,
                     enrollment_api_url,
                     data=json.dumps(data),
                     headers=headers,
@@ -0,0 +1,71 @@
+"""Custom migration operations."""
+from __future__ import unicode_literals
+
+from django.db.migrations.operations.base import Operation
+
+
+class AddIndex(Operation):
+    """Create a named, possibly multi-column, index on a model's table.
+
+    Django 1.7 can only declare multi-column indexes through `Meta.index_together`, which
+    requires the model to be defined in this project. Most of the models we query hardest
+    are defined by Oscar, so this operation creates the index directly. It does not alter
+    the migration state, since the index is not part of the model definition.
+
+    The model may belong to an app other than the one containing the migration, in which
+    case the migration must depend on that app.
+    """
+    reduces_to_sql = True
+    reversible = True
+
+    def __init__(self, app_label, model_name, fields, name):
+        self.app_label = app_label
+        self.model_name = model_name
+        self.fields = fields
+        self.name = name
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.render().get_model(self.app_label, self.model_name)
+        if self.allowed_to_migrate(schema_editor.connection.alias, model):
+            self.create(schema_editor, model)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        model = from_state.render().get_model(self.app_label, self.model_name)
+        if self.allowed_to_migrate(schema_editor.connection.alias, model):
+            self.drop(schema_editor, model)
+
+    def create(self, schema_editor, model):
+        """Create the index on the given model's table.
+
+        Arguments:
+            schema_editor (BaseDatabaseSchemaEditor): Editor used to execute the statement.
+            model (Model): Model whose table is indexed.
+        """
+        opts = model._meta  # pylint: disable=protected-access
+        columns = [opts.get_field(field_name).column for field_name in self.fields]
+        schema_editor.execute(schema_editor.sql_create_index % {
+            'name': schema_editor.quote_name(self.name),
+            'table': schema_editor.quote_name(opts.db_table),
+            'columns': ', '.join(schema_editor.quote_name(column) for column in columns),
+            'extra': '',
+        })
+
+    def drop(self, schema_editor, model):
+        """Drop the index from the given model's table.
+
+        Arguments:
+            schema_editor (BaseDatabaseSchemaEditor): Editor used to execute the statement.
+            model (Model): Model whose table is indexed.
+        """
+        schema_editor.execute(schema_editor.sql_delete_index % {
+            'name': schema_editor.quote_name(self.name),
+            'table': schema_editor.quote_name(model._meta.db_table),  # pylint: disable=protected-access
+        })
+
+    def describe(self):
+        return 'Create index {name} on {model} ({fields})'.format(
+            name=self.name, model=self.model_name, fields=', '.join(self.fields)
+        )
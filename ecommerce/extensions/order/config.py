@@ -3,3 +3,12 @@ from oscar.apps.order import config
 
 class OrderConfig(config.OrderConfig):
     name = 'ecommerce.extensions.order'
+
+    def ready(self):
+        super(OrderConfig, self).ready()
+
+        from ecommerce.extensions.order import reference_data
+
+        # Caches aren't warmed here, which would query the database for every management command
+        # and in master processes before they fork workers. Workers warm them (see ecommerce/warmup.py).
+        reference_data.connect_signals()
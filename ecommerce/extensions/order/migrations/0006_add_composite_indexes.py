@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+from ecommerce.extensions.operations import AddIndex
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('basket', '0001_initial'),
+        ('order', '0005_deprecate_order_payment_processor'),
+    ]
+
+    operations = [
+        # Listing a user's orders, newest first
+        AddIndex('order', 'order', ['user', 'date_placed'], 'order_order_user_id_date_placed'),
+        # Scanning for lines with a given status, such as fulfillment errors
+        AddIndex('order', 'line', ['status', 'order'], 'order_line_status_order_id'),
+        # The basket app is provided by Oscar, without migrations of our own, so its index is created here.
+        # Scanning for baskets with a given status, such as when compacting baskets
+        AddIndex('basket', 'basket', ['status', 'date_created'], 'basket_basket_status_date_created'),
+    ]
@@ -1,14 +1,28 @@
 # noinspection PyUnresolvedReferences
-from django.db import models
+from django.db import models, transaction
 from django.utils.translation import ugettext_lazy as _
-from oscar.apps.order.abstract_models import AbstractOrder
+from oscar.apps.order.abstract_models import AbstractLine, AbstractOrder
 
 from ecommerce.extensions.fulfillment.status import ORDER
+from ecommerce.extensions.order.notifications import notifier
+from ecommerce.extensions.outbox import api as outbox
 
 
 class Order(AbstractOrder):
     payment_processor = models.CharField(_("Payment Processor"), max_length=32, blank=True, null=True)
 
+    def set_status(self, new_status):
+        """Set a new status for this order, recording the change in the outbox and notifying waiters."""
+        old_status = self.status
+        with transaction.atomic():
+            super(Order, self).set_status(new_status)
+            if self.status != old_status:
+                outbox.record_order_status_change(self, old_status)
+
+        if self.status != old_status:
+            notifier.notify(self.number)
+    set_status.alters_data = True
+
     @property
     def can_retry_fulfillment(self):
         """ Returns a boolean indicating if order is eligible to retry fulfillment. """
@@ -43,5 +57,16 @@ class Order(AbstractOrder):
             return False
 
 
+class Line(AbstractLine):
+    def set_status(self, new_status):
+        """Set a new status for this line, recording the change in the outbox."""
+        old_status = self.status
+        with transaction.atomic():
+            super(Line, self).set_status(new_status)
+            if self.status != old_status:
+                outbox.record_line_status_change(self, old_status)
+    set_status.alters_data = True
+
+
 # If two models with the same name are declared within an app, Django will only use the first one.
 from oscar.apps.order.models import *  # noqa pylint: disable=wildcard-import,unused-wildcard-import
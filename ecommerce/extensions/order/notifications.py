@@ -0,0 +1,79 @@
+"""Notification of changes to orders' statuses, used to wake requests waiting for those changes."""
+from collections import defaultdict
+import threading
+
+from django.core.cache import cache
+
+
+VERSION_CACHE_KEY = u'order_status_version.{number}'
+# Number of seconds for which status versions are cached
+VERSION_TIMEOUT = 60 * 60
+
+
+class StatusChangeNotifier(object):
+    """Wakes threads waiting for the status of an order to change.
+
+    Waiters in this process are woken as soon as `notify` is called. Under gevent, whose
+    monkey-patching makes `threading` primitives cooperative, idle waiters are greenlets
+    blocked on an event, consuming no CPU.
+
+    Status changes made by other processes can't wake waiters directly. Instead, `notify`
+    also increments a per-order version in the cache, which waiters compare periodically.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waiters = defaultdict(set)
+
+    def get_version(self, number):
+        """Return the number of times the status of the given order is known to have changed.
+
+        Arguments:
+            number (unicode): Number of the order.
+        """
+        return cache.get(VERSION_CACHE_KEY.format(number=number), 0)
+
+    def notify(self, number):
+        """Wake any threads waiting for the status of the given order to change.
+
+        Arguments:
+            number (unicode): Number of the order whose status has changed.
+        """
+        key = VERSION_CACHE_KEY.format(number=number)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, VERSION_TIMEOUT)
+
+        with self._lock:
+            events = self._waiters.pop(number, ())
+
+        for event in events:
+            event.set()
+
+    def wait(self, number, timeout):
+        """Block until this process is notified of a change to the given order's status, or the timeout expires.
+
+        Arguments:
+            number (unicode): Number of the order.
+            timeout (float): Maximum number of seconds to wait.
+
+        Returns:
+            bool: True if a change was notified, False if the timeout expired.
+        """
+        event = threading.Event()
+        with self._lock:
+            self._waiters[number].add(event)
+
+        try:
+            return event.wait(timeout)
+        finally:
+            with self._lock:
+                waiters = self._waiters.get(number)
+                if waiters is not None:
+                    waiters.discard(event)
+                    if not waiters:
+                        del self._waiters[number]
+
+
+notifier = StatusChangeNotifier()
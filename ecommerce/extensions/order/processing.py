@@ -6,12 +6,17 @@ errors explaining why fulfillment may fail.
 
 """
 
+from django.db.models import Sum
 from oscar.apps.order import processing, exceptions
+from oscar.core.loading import get_model
 
 from ecommerce.extensions.fulfillment import api as fulfillment_api
 from ecommerce.extensions.fulfillment.status import LINE
 
 
+ShippingEventQuantity = get_model('order', 'ShippingEventQuantity')
+
+
 class EventHandler(processing.EventHandler):
     """ Handles Order Processing
 
@@ -34,26 +39,42 @@ class EventHandler(processing.EventHandler):
 
         The ShippingEvent will only contain related LineQuantity objects for items that have been successfully
         fulfilled/shipped (e.g. status is Complete). If no items have been fulfilled, the value None will be returned.
+
+        Quantities previously shipped for every line are retrieved with a single query, and all LineQuantity
+        objects are created with another, so the number of queries made does not depend on the number of lines.
         """
         reference = kwargs.get('reference', '')
-        event = order.shipping_events.create(event_type=event_type, notes=reference)
-        event_has_lines = False
-
-        try:
-            for line, quantity in zip(lines, line_quantities):
-                # The line should only be added to the ShippingEvent if the line is complete and was
-                # not previously shipped.
-                if line.status == LINE.COMPLETE and not line.has_shipping_event_occurred(event_type):
-                    event.line_quantities.create(line=line, quantity=quantity)
-                    event_has_lines = True
-        except exceptions.InvalidShippingEvent:  # pragma: no cover
-            # CCB: It is practically impossible to mock event.line_quantities.create() and force an error. If the
-            # implementation changes in the future, please remove the pragma and test this branch.
-            event.delete()
-            raise
-
-        if not event_has_lines:
-            event.delete()
+        lines = list(lines)
+
+        shipped_quantities = dict(
+            ShippingEventQuantity.objects.filter(line__in=lines, event__event_type=event_type)
+            .values('line')
+            .annotate(shipped_quantity=Sum('quantity'))
+            .values_list('line', 'shipped_quantity')
+        )
+
+        line_quantities_to_create = []
+        for line, quantity in zip(lines, line_quantities):
+            shipped_quantity = shipped_quantities.get(line.id, 0)
+
+            # The line should only be added to the ShippingEvent if the line is complete and was
+            # not previously shipped.
+            if line.status != LINE.COMPLETE or shipped_quantity == line.quantity:
+                continue
+
+            # Mirror the validation performed by ShippingEventQuantity.save(), which bulk creation bypasses
+            quantity = quantity or line.quantity
+            if shipped_quantity + quantity > line.quantity:
+                raise exceptions.InvalidShippingEvent
+
+            line_quantities_to_create.append(ShippingEventQuantity(line=line, quantity=quantity))
+
+        if not line_quantities_to_create:
             return None
 
+        event = order.shipping_events.create(event_type=event_type, notes=reference)
+        for line_quantity in line_quantities_to_create:
+            line_quantity.event = event
+        ShippingEventQuantity.objects.bulk_create(line_quantities_to_create)
+
         return event
@@ -0,0 +1,84 @@
+"""Process-level caches of reference data, such as shipping event types and payment source types."""
+import logging
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.db.models.signals import post_delete, post_save
+from oscar.core.loading import get_model
+
+
+logger = logging.getLogger(__name__)
+
+
+class ReferenceDataCache(object):
+    """Caches the rows of a lookup model, keyed by a unique field, for the lifetime of the process.
+
+    Reference rows, such as shipping event types, are created once and rarely changed, but
+    are looked up while placing and fulfilling every order. Rows are cached once they are
+    known to exist; rows created by a lookup are not cached until they are next retrieved,
+    since the transaction creating them may yet be rolled back. Saving or deleting any row
+    of the model clears the cache within this process.
+
+    Caching is disabled if the REFERENCE_DATA_CACHE_ENABLED setting is False.
+    """
+
+    def __init__(self, model, key_field='name'):
+        self.model = model
+        self.key_field = key_field
+        self._rows = {}
+
+    @property
+    def enabled(self):
+        return getattr(settings, 'REFERENCE_DATA_CACHE_ENABLED', True)
+
+    def get_or_create(self, key):
+        """Return the row whose key field matches the given key, creating it if necessary.
+
+        Arguments:
+            key (unicode): Value of the key field identifying the row.
+        """
+        row = self._rows.get(key) if self.enabled else None
+        if row is None:
+            row, created = self.model.objects.get_or_create(**{self.key_field: key})
+            if self.enabled and not created:
+                self._rows[key] = row
+        return row
+
+    def warm(self):
+        """Load every row of the model into the cache."""
+        if self.enabled:
+            self._rows = {getattr(row, self.key_field): row for row in self.model.objects.all()}
+
+    def clear(self, **kwargs):  # pylint: disable=unused-argument
+        """Empty the cache. Accepts, and ignores, signal arguments so that it may be used as a receiver."""
+        self._rows = {}
+
+    def connect(self):
+        """Clear the cache whenever a row of the model is saved or deleted."""
+        dispatch_uid = u'{module}.{model}'.format(module=__name__, model=self.model.__name__)
+        for signal in (post_save, post_delete):
+            signal.connect(self.clear, sender=self.model, weak=False, dispatch_uid=dispatch_uid)
+
+shipping_event_types = ReferenceDataCache(get_model('order', 'ShippingEventType'))
+source_types = ReferenceDataCache(get_model('payment', 'SourceType'))
+
+REFERENCE_DATA_CACHES = (shipping_event_types, source_types)
+
+
+def connect_signals():
+    """Connect the receivers which invalidate every reference data cache."""
+    for cache in REFERENCE_DATA_CACHES:
+        cache.connect()
+
+
+def warm():
+    """Load every reference data cache.
+
+    Failures are logged rather than raised, since the database may not yet be migrated
+    when a worker warms up.
+    """
+    try:
+        for cache in REFERENCE_DATA_CACHES:
+            cache.warm()
+    except DatabaseError:
+        logger.warning(u"Unable to warm reference data caches", exc_info=True)
@@ -0,0 +1,64 @@
+"""Tests of the notification of changes to orders' statuses."""
+import threading
+
+from django.core.cache import cache
+from django.test import TestCase
+import mock
+from oscar.test import factories
+
+from ecommerce.extensions.fulfillment.status import ORDER
+from ecommerce.extensions.order.notifications import notifier, StatusChangeNotifier
+
+
+class StatusChangeNotifierTests(TestCase):
+    NUMBER = u'OSCR-100001'
+
+    def setUp(self):
+        super(StatusChangeNotifierTests, self).setUp()
+        self.addCleanup(cache.clear)
+        self.notifier = StatusChangeNotifier()
+
+    def test_notify_wakes_waiters(self):
+        """Waiters should be woken by a notification for their order, and only their order."""
+        results = {}
+
+        def wait(number):
+            results[number] = self.notifier.wait(number, 10)
+
+        threads = [threading.Thread(target=wait, args=(number,)) for number in (self.NUMBER, u'OSCR-100002')]
+        for thread in threads:
+            thread.start()
+
+        # Notify once both waiters are registered.
+        while len(self.notifier._waiters) < 2:  # pylint: disable=protected-access
+            threads[0].join(0.01)
+        self.notifier.notify(self.NUMBER)
+        threads[0].join()
+
+        self.assertEqual(results, {self.NUMBER: True})
+
+        self.notifier.notify(u'OSCR-100002')
+        threads[1].join()
+        self.assertFalse(self.notifier._waiters)  # pylint: disable=protected-access
+
+    def test_wait_timeout(self):
+        """Waiting should return False if no notification arrives before the timeout."""
+        self.assertFalse(self.notifier.wait(self.NUMBER, 0.01))
+        self.assertFalse(self.notifier._waiters)  # pylint: disable=protected-access
+
+    def test_version(self):
+        """Each notification should increment the order's status version."""
+        self.assertEqual(self.notifier.get_version(self.NUMBER), 0)
+        self.notifier.notify(self.NUMBER)
+        self.notifier.notify(self.NUMBER)
+        self.assertEqual(self.notifier.get_version(self.NUMBER), 2)
+
+    def test_set_status_notifies(self):
+        """Changing an order's status should notify waiters."""
+        order = factories.create_order()
+        with mock.patch.object(notifier, 'notify') as mock_notify:
+            order.set_status(ORDER.OPEN)
+            self.assertFalse(mock_notify.called)
+
+            order.set_status(ORDER.COMPLETE)
+            mock_notify.assert_called_once_with(order.number)
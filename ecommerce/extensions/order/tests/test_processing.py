@@ -1,4 +1,5 @@
 from django.test import TestCase
+from oscar.apps.order import exceptions
 from oscar.core.loading import get_model
 from oscar.test import factories
 
@@ -87,3 +88,33 @@ class EventHandlerTests(TestCase):
         self.assertEqual(shipping_event.order.id, order.id)
         self.assertEqual(shipping_event.lines.count(), 1)
         self.assertEqual(shipping_event.lines.first().id, lines[1].id)
+
+    def create_order_with_lines(self, num_lines):
+        """Create an order with the given number of complete lines."""
+        basket = factories.create_basket(empty=True)
+        for __ in xrange(num_lines):
+            basket.add_product(factories.create_product(num_in_stock=2))
+
+        order = factories.create_order(basket=basket)
+        order.lines.update(status=LINE.COMPLETE)
+        return order
+
+    def test_create_shipping_event_num_queries(self):
+        """ The number of queries made should not depend on the number of lines in the order. """
+        order = self.create_order_with_lines(3)
+        lines = list(order.lines.all())
+
+        # Retrieving previously-shipped quantities, creating the event, and creating its line quantities
+        with self.assertNumQueries(3):
+            EventHandler().create_shipping_event(order, self.shipping_event_type, lines, [1, 1, 1])
+
+        self.assertEqual(order.shipping_events.get().lines.count(), 3)
+
+    def test_create_shipping_event_invalid_quantity(self):
+        """ Shipping more than the quantity of a line should fail, without creating a ShippingEvent. """
+        order = self.create_order_with_lines(2)
+
+        with self.assertRaises(exceptions.InvalidShippingEvent):
+            EventHandler().create_shipping_event(order, self.shipping_event_type, order.lines.all(), [1, 2])
+
+        self.assertFalse(order.shipping_events.exists())
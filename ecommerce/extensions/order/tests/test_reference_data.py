@@ -0,0 +1,58 @@
+from django.test import TestCase, override_settings
+from oscar.core.loading import get_model
+
+from ecommerce.extensions.order.reference_data import shipping_event_types
+
+
+ShippingEventType = get_model('order', 'ShippingEventType')
+
+
+@override_settings(REFERENCE_DATA_CACHE_ENABLED=True)
+class ReferenceDataCacheTests(TestCase):
+    NAME = 'Shipped'
+
+    def setUp(self):
+        super(ReferenceDataCacheTests, self).setUp()
+        shipping_event_types.clear()
+        self.addCleanup(shipping_event_types.clear)
+
+    def test_get_or_create(self):
+        """ Rows should be cached once they are known to exist, rather than when they are created. """
+        self.assertFalse(ShippingEventType.objects.exists())
+        created = shipping_event_types.get_or_create(self.NAME)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(shipping_event_types.get_or_create(self.NAME), created)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(shipping_event_types.get_or_create(self.NAME), created)
+
+    def test_warm(self):
+        """ Warming the cache should load every row. """
+        event_type = ShippingEventType.objects.create(name=self.NAME)
+        shipping_event_types.warm()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(shipping_event_types.get_or_create(self.NAME), event_type)
+
+    def test_invalidation(self):
+        """ Saving or deleting a row should clear the cache. """
+        event_type = ShippingEventType.objects.create(name=self.NAME)
+        shipping_event_types.warm()
+
+        event_type.save()
+        with self.assertNumQueries(1):
+            shipping_event_types.get_or_create(self.NAME)
+
+        event_type.delete()
+        self.assertNotEqual(shipping_event_types.get_or_create(self.NAME).id, event_type.id)
+
+    @override_settings(REFERENCE_DATA_CACHE_ENABLED=False)
+    def test_disabled(self):
+        """ Rows should always be retrieved from the database if caching is disabled. """
+        ShippingEventType.objects.create(name=self.NAME)
+        shipping_event_types.warm()
+
+        for __ in xrange(2):
+            with self.assertNumQueries(1):
+                shipping_event_types.get_or_create(self.NAME)
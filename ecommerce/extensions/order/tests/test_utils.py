@@ -1,9 +1,25 @@
+# -*- coding: utf-8 -*-
 """Test Order Utility classes """
 from unittest import TestCase
-from django.test import override_settings
+
+from django.contrib.sites.models import Site
+from django.forms.models import model_to_dict
+from django.test import override_settings, TestCase as DjangoTestCase
+import mock
+from oscar.core.loading import get_class, get_model
+from oscar.test import factories
 from oscar.test.newfactories import BasketFactory
 
-from ecommerce.extensions.order.utils import OrderNumberGenerator
+from ecommerce.extensions.order.utils import FreeOrderCreator, OrderNumberGenerator
+
+
+Free = get_class('shipping.methods', 'Free')
+OrderCreator = get_class('order.utils', 'OrderCreator')
+OrderTotalCalculator = get_class('checkout.calculators', 'OrderTotalCalculator')
+Line = get_model('order', 'Line')
+Selector = get_class('partner.strategy', 'Selector')
+ProductClass = get_model('catalogue', 'ProductClass')
+StockRecord = get_model('partner', 'StockRecord')
 
 
 class UtilsTest(TestCase):
@@ -21,3 +37,122 @@ class UtilsTest(TestCase):
         self.assertIn(self.ORDER_NUMBER_PREFIX, new_order_number)
         self.assertIn(self.ORDER_NUMBER_PREFIX, next_order_number)
         self.assertNotEqual(new_order_number, next_order_number)
+
+
+class FreeOrderCreatorTests(DjangoTestCase):
+    """Verify that FreeOrderCreator places the same orders as OrderCreator."""
+    IGNORED_FIELDS = ('id', 'order', 'line', 'basket', 'number', 'date_placed')
+
+    def setUp(self):
+        super(FreeOrderCreatorTests, self).setUp()
+        self.user = factories.UserFactory()
+        self.products = [factories.create_product(price=0, num_in_stock=10) for __ in xrange(2)]
+        self.option = factories.OptionFactory()
+
+        # Prime the site cache, which is shared by both creators
+        Site.objects.get_current()
+
+    def create_basket(self, with_attributes=True):
+        basket = BasketFactory(owner=self.user)
+        basket.strategy = Selector().strategy()
+        basket.add_product(self.products[0], quantity=2)
+        options = [{'option': self.option, 'value': u'ʌɐlnǝ'}] if with_attributes else None
+        basket.add_product(self.products[1], options=options)
+        return basket
+
+    def get_order_arguments(self, basket):
+        """Return the positional arguments required to place an order for the given basket."""
+        shipping_method = Free()
+        shipping_charge = shipping_method.calculate(basket)
+        total = OrderTotalCalculator().calculate(basket, shipping_charge)
+        return basket, total, shipping_method, shipping_charge
+
+    def place_order(self, creator, basket):
+        return creator.place_order(*self.get_order_arguments(basket), user=self.user)
+
+    def serialize(self, instances):
+        return [
+            {name: value for name, value in model_to_dict(instance).items() if name not in self.IGNORED_FIELDS}
+            for instance in instances
+        ]
+
+    def test_parity(self):
+        """The free order creator should write the same records as the general order creator."""
+        expected = self.place_order(OrderCreator(), self.create_basket())
+        actual = self.place_order(FreeOrderCreator(), self.create_basket())
+
+        self.assertEqual(self.serialize([actual]), self.serialize([expected]))
+        self.assertEqual(actual.basket.owner, self.user)
+        for field in ('lines', 'line_prices'):
+            self.assertEqual(
+                self.serialize(getattr(actual, field).order_by('id')),
+                self.serialize(getattr(expected, field).order_by('id'))
+            )
+
+        for expected_line, actual_line in zip(expected.lines.order_by('id'), actual.lines.order_by('id')):
+            self.assertEqual(
+                self.serialize(actual_line.attributes.all()),
+                self.serialize(expected_line.attributes.all())
+            )
+
+        # Both orders should have allocated stock
+        self.assertEqual([record.num_allocated for record in StockRecord.objects.order_by('id')], [4, 2])
+
+        self.assert_line_prices_match_lines(actual)
+
+    def assert_line_prices_match_lines(self, order):
+        """Verify that each line's price, and any attributes, belong to the line for the same product."""
+        self.assertEqual(
+            sorted((price.line.product_id, price.quantity) for price in order.line_prices.all()),
+            sorted((product.id, quantity) for product, quantity in zip(self.products, (2, 1)))
+        )
+        attribute_lines = [attribute.line for line in order.lines.all() for attribute in line.attributes.all()]
+        self.assertEqual([line.product for line in attribute_lines], [self.products[1]])
+
+    def test_ids_assigned_out_of_order(self):
+        """Line prices and attributes should be attached to the right lines, whatever order IDs are assigned in."""
+        def bulk_create(lines):
+            # Insert the lines in reverse, then forget their IDs, as a bulk insert would.
+            for line in reversed(lines):
+                line.save()
+            for line in lines:
+                line.id = None
+
+        with mock.patch.object(Line.objects, 'bulk_create', side_effect=bulk_create):
+            order = self.place_order(FreeOrderCreator(), self.create_basket())
+
+        self.assert_line_prices_match_lines(order)
+
+    def test_indistinguishable_lines(self):
+        """Lines for the same stock record should be saved individually, with their own prices."""
+        basket = self.create_basket()
+        basket.add_product(self.products[0], options=[{'option': self.option, 'value': u'other'}])
+        basket.reset_offer_applications()
+
+        order = self.place_order(FreeOrderCreator(), basket)
+
+        self.assertEqual(
+            sorted((price.line.product_id, price.quantity) for price in order.line_prices.all()),
+            sorted([(self.products[0].id, 2), (self.products[0].id, 1), (self.products[1].id, 1)])
+        )
+
+    def test_num_queries(self):
+        """The number of queries made should not depend on the number of lines in the basket."""
+        # Like seats, these products don't track stock
+        ProductClass.objects.update(track_stock=False)
+        arguments = self.get_order_arguments(self.create_basket(with_attributes=False))
+
+        # Retrieving partners, creating the order and its lines, retrieving the keys of the created lines,
+        # and creating their prices. Basket lines are cached while calculating the order total. Receivers
+        # of the order_placed signal, such as Oscar's analytics, make their own queries.
+        with mock.patch('ecommerce.extensions.order.utils.order_placed') as mock_order_placed:
+            with self.assertNumQueries(5):
+                order = FreeOrderCreator().place_order(*arguments, user=self.user)
+
+        mock_order_placed.send.assert_called_once_with(sender=mock.ANY, order=order, user=self.user)
+
+    def test_paid_order(self):
+        """Orders which aren't free should be rejected."""
+        self.products[0].stockrecords.update(price_excl_tax=10)
+        with self.assertRaises(ValueError):
+            self.place_order(FreeOrderCreator(), self.create_basket())
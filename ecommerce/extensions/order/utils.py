@@ -1,5 +1,15 @@
 """Order Utility Classes. """
 from django.conf import settings
+from django.utils.translation import ugettext_lazy as _
+from oscar.apps.order.utils import OrderCreator
+from oscar.core.loading import get_class, get_model
+
+
+Line = get_model('order', 'Line')
+LineAttribute = get_model('order', 'LineAttribute')
+LinePrice = get_model('order', 'LinePrice')
+Partner = get_model('partner', 'Partner')
+order_placed = get_class('order.signals', 'order_placed')
 
 
 class OrderNumberGenerator(object):
@@ -26,3 +36,140 @@ class OrderNumberGenerator(object):
         prefix = getattr(settings, 'ORDER_NUMBER_PREFIX', 'OSCR')
         order_id = str(100000 + basket.id)
         return u"{prefix}-{order_id}".format(prefix=prefix, order_id=order_id)
+
+
+class FreeOrderCreator(OrderCreator):
+    """Places orders whose total is zero, using a constant number of queries.
+
+    Free orders, such as those for honor seats, have no shipping or billing address,
+    payment, discounts or vouchers. This creator skips the steps concerned with those,
+    and writes out the order, its lines, and their prices and attributes with bulk
+    queries. The records it creates are identical to those created by `OrderCreator`.
+
+    Duplicate order numbers are rejected by the database's unique constraint, rather
+    than by querying for an existing order beforehand.
+    """
+
+    def place_order(self, basket, total, shipping_method, shipping_charge,  # pylint: disable=arguments-differ
+                    user=None, order_number=None, status=None, **kwargs):
+        """Write out the models for a free order.
+
+        Arguments:
+            basket (Basket): The basket whose contents are being ordered. Must have a strategy assigned.
+            total (Price): The order total, which must be zero.
+            shipping_method (Base): The shipping method, recorded on the order.
+            shipping_charge (Price): The shipping charge, recorded on the order.
+            user (User): The user placing the order.
+            order_number (unicode): The order number. Generated from the basket if not provided.
+            status (unicode): The order's initial status. Defaults to OSCAR_INITIAL_ORDER_STATUS.
+
+        Returns:
+            Order: The newly-placed order.
+
+        Raises:
+            ValueError: If the order is not free, the basket is empty, or offers have been
+                applied to the basket.
+        """
+        if total.excl_tax != 0 or total.incl_tax != 0:
+            raise ValueError(_("Only free orders can be placed by this creator"))
+        if len(basket.offer_applications):
+            raise ValueError(_("Orders for baskets with offers applied cannot be placed by this creator"))
+
+        # The basket's lines, and their prices, are cached once the basket's total has been calculated
+        basket_lines = list(basket.all_lines())
+        if not basket_lines:
+            raise ValueError(_("Empty baskets cannot be submitted"))
+
+        if not order_number:
+            order_number = OrderNumberGenerator.order_number(basket)
+        if not status:
+            status = getattr(settings, 'OSCAR_INITIAL_ORDER_STATUS', None)
+
+        order = self.create_order_model(
+            user, basket, None, shipping_method, shipping_charge, None, total, order_number, status, **kwargs
+        )
+
+        partners = Partner.objects.in_bulk({line.stockrecord.partner_id for line in basket_lines})
+        order_lines = [
+            self.build_line_model(order, line, partners[line.stockrecord.partner_id]) for line in basket_lines
+        ]
+        self.create_line_models_in_bulk(order, order_lines)
+
+        prices = []
+        attributes = []
+        for order_line, basket_line in zip(order_lines, basket_lines):
+            for price_incl_tax, price_excl_tax, quantity in basket_line.get_price_breakdown():
+                prices.append(LinePrice(
+                    order=order,
+                    line=order_line,
+                    quantity=quantity,
+                    price_incl_tax=price_incl_tax,
+                    price_excl_tax=price_excl_tax
+                ))
+
+            for attr in basket_line.attributes.all():
+                attributes.append(LineAttribute(line=order_line, option=attr.option, type=attr.option.code,
+                                                value=attr.value))
+
+            self.update_stock_records(basket_line)
+
+        LinePrice.objects.bulk_create(prices)
+        if attributes:
+            LineAttribute.objects.bulk_create(attributes)
+
+        order_placed.send(sender=self, order=order, user=user)
+
+        return order
+
+    def create_line_models_in_bulk(self, order, order_lines):
+        """Save the given order lines, setting their IDs.
+
+        Bulk inserts don't provide the IDs of the rows they create, and the order in which
+        the database assigns IDs to the rows of a single insert isn't guaranteed. So saved rows
+        are matched to the unsaved lines by their stock record and SKU. Lines which can't be
+        told apart this way (e.g., lines for the same stock record with different options) are
+        saved individually.
+        """
+        keys = [(line.stockrecord_id, line.partner_sku) for line in order_lines]
+        if len(set(keys)) < len(keys):
+            for order_line in order_lines:
+                order_line.save()
+            return
+
+        Line.objects.bulk_create(order_lines)
+        line_ids = {
+            (stockrecord_id, partner_sku): line_id
+            for line_id, stockrecord_id, partner_sku in order.lines.values_list('id', 'stockrecord_id', 'partner_sku')
+        }
+        for order_line, key in zip(order_lines, keys):
+            order_line.id = line_ids[key]
+
+    def build_line_model(self, order, basket_line, partner):
+        """Return an unsaved order line equivalent to that created by `OrderCreator.create_line_models`."""
+        product = basket_line.product
+        stockrecord = basket_line.stockrecord
+
+        line = Line(
+            order=order,
+            partner=partner,
+            partner_name=partner.name,
+            partner_sku=stockrecord.partner_sku,
+            stockrecord=stockrecord,
+            product=product,
+            title=product.get_title(),
+            upc=product.upc,
+            quantity=basket_line.quantity,
+            line_price_excl_tax=basket_line.line_price_excl_tax_incl_discounts,
+            line_price_incl_tax=basket_line.line_price_incl_tax_incl_discounts,
+            line_price_before_discounts_excl_tax=basket_line.line_price_excl_tax,
+            line_price_before_discounts_incl_tax=basket_line.line_price_incl_tax,
+            unit_cost_price=stockrecord.cost_price,
+            unit_price_incl_tax=basket_line.unit_price_incl_tax,
+            unit_price_excl_tax=basket_line.unit_price_excl_tax,
+            unit_retail_price=stockrecord.price_retail,
+            est_dispatch_date=basket_line.purchase_info.availability.dispatch_date
+        )
+        if hasattr(settings, 'OSCAR_INITIAL_LINE_STATUS'):
+            line.status = settings.OSCAR_INITIAL_LINE_STATUS
+
+        return line
@@ -0,0 +1 @@
+default_app_config = 'ecommerce.extensions.outbox.config.OutboxConfig'  # pragma: no cover
@@ -0,0 +1,69 @@
+"""Functions recording order lifecycle events in the outbox."""
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import six
+from oscar.core.loading import get_model
+
+
+OutboxEvent = get_model('outbox', 'OutboxEvent')
+
+
+def record_event(event_type, order_number, data):
+    """Append an event to the outbox.
+
+    The event is written using the current database transaction, so it is only published
+    if the change it describes is committed.
+
+    Arguments:
+        event_type (str): Type of the event (e.g., OutboxEvent.ORDER_PLACED).
+        order_number (unicode): Number of the order to which the event relates.
+        data (dict): JSON-serializable event data.
+
+    Returns:
+        OutboxEvent
+    """
+    order_number = six.text_type(order_number)
+    payload = json.dumps(dict(data, order_number=order_number), cls=DjangoJSONEncoder, sort_keys=True)
+    return OutboxEvent.objects.create(event_type=event_type, order_number=order_number, payload=payload)
+
+
+def record_order_placed(order):
+    """Record the placement of the given order."""
+    lines = [
+        {
+            'id': line.id,
+            'partner_sku': line.partner_sku,
+            'quantity': line.quantity,
+            'status': line.status,
+        }
+        for line in order.lines.all()
+    ]
+
+    return record_event(OutboxEvent.ORDER_PLACED, order.number, {
+        'user_id': order.user_id,
+        'basket_id': order.basket_id,
+        'currency': order.currency,
+        'total_excl_tax': order.total_excl_tax,
+        'status': order.status,
+        'date_placed': order.date_placed,
+        'lines': lines,
+    })
+
+
+def record_order_status_change(order, old_status):
+    """Record a change to the status of the given order."""
+    return record_event(OutboxEvent.ORDER_STATUS_CHANGED, order.number, {
+        'old_status': old_status,
+        'status': order.status,
+    })
+
+
+def record_line_status_change(line, old_status):
+    """Record a change to the status of the given order line."""
+    return record_event(OutboxEvent.LINE_STATUS_CHANGED, line.order.number, {
+        'line_id': line.id,
+        'partner_sku': line.partner_sku,
+        'old_status': old_status,
+        'status': line.status,
+    })
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class OutboxConfig(AppConfig):
+    name = 'ecommerce.extensions.outbox'
+    verbose_name = 'Outbox'
+
+    def ready(self):
+        from ecommerce.extensions.outbox import receivers  # noqa pylint: disable=unused-variable
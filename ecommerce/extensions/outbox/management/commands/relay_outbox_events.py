@@ -0,0 +1,178 @@
+"""Publish outbox events to each configured sink."""
+from datetime import timedelta
+import logging
+from optparse import make_option
+import time
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+from oscar.core.loading import get_model
+
+from ecommerce.extensions.outbox.sinks import get_sinks
+
+
+logger = logging.getLogger(__name__)
+
+OutboxDelivery = get_model('outbox', 'OutboxDelivery')
+OutboxEvent = get_model('outbox', 'OutboxEvent')
+OutboxSink = get_model('outbox', 'OutboxSink')
+
+
+class Command(BaseCommand):
+    help = 'Publish outbox events, in batches, to the sinks listed in the OUTBOX_SINKS setting.'
+
+    option_list = BaseCommand.option_list + (
+        make_option(
+            '--batch-size',
+            action='store',
+            dest='batch_size',
+            type='int',
+            default=100,
+            help='Maximum number of events to publish to a sink at once.'
+        ),
+        make_option(
+            '--sink',
+            action='store',
+            dest='sink',
+            default=None,
+            help='Name of the only sink to which events should be published.'
+        ),
+        make_option(
+            '--poll-interval',
+            action='store',
+            dest='poll_interval',
+            type='float',
+            default=None,
+            help='Keep running, checking for new events at this interval, in seconds, once all have been published.'
+        ),
+    )
+
+    def handle(self, *args, **options):
+        sinks = get_sinks()
+        sink_names = [sink.NAME for sink in sinks]
+        if options['sink'] is not None:
+            sinks = [sink for sink in sinks if sink.NAME == options['sink']]
+            if not sinks:
+                raise CommandError(u"No sink named [{name}] is configured.".format(name=options['sink']))
+
+        while True:
+            for sink in sinks:
+                published = self.relay(sink, options['batch_size'])
+                logger.info(u"Published [%d] outbox events to sink [%s]", published, sink.NAME)
+
+            pruned = self.prune(sink_names, options['batch_size'])
+            logger.info(u"Deleted [%d] outbox events delivered to every sink", pruned)
+
+            if options['poll_interval'] is None:
+                return
+            time.sleep(options['poll_interval'])
+
+    def relay(self, sink, batch_size):
+        """Publish all pending events to the given sink, in batches, recording their delivery after each batch.
+
+        Event IDs are allocated when events are written, but become visible when their
+        transactions commit, possibly out of order. Each delivery is recorded, rather than the
+        last event published, so that an event committed after later ones have been published
+        is published by the next batch instead of being skipped.
+
+        Events are published outside of any transaction, while holding a lease on the sink,
+        so that a slow sink doesn't hold locks. If the lease expires before a batch has been
+        published, its delivery isn't recorded, and the relay holding the lease publishes it again.
+
+        Returns:
+            int: The number of events published.
+        """
+        outbox_sink, lease_id = self.acquire_lease(sink)
+        if outbox_sink is None:
+            logger.info(u"Another relay is publishing outbox events to sink [%s]", sink.NAME)
+            return 0
+
+        published = 0
+        try:
+            while True:
+                events = list(OutboxEvent.objects.exclude(deliveries__sink=outbox_sink).order_by('id')[:batch_size])
+                if not events:
+                    return published
+
+                sink.publish(events)
+
+                with transaction.atomic():
+                    if not self.renew_lease(outbox_sink, lease_id):
+                        logger.warning(u"Lost the lease on sink [%s] while publishing outbox events", sink.NAME)
+                        return published
+
+                    OutboxDelivery.objects.bulk_create(
+                        [OutboxDelivery(event=event, sink=outbox_sink) for event in events]
+                    )
+
+                published += len(events)
+        finally:
+            OutboxSink.objects.filter(pk=outbox_sink.pk, lease_id=lease_id).update(lease_id='', lease_expires=None)
+
+    def acquire_lease(self, sink):
+        """Lease the given sink for OUTBOX_RELAY_LEASE_SECONDS, unless another relay holds an unexpired lease.
+
+        Returns:
+            tuple: The leased OutboxSink and the ID of the lease, or (None, None) if another relay
+                holds the lease.
+        """
+        with transaction.atomic():
+            outbox_sink, __ = OutboxSink.objects.select_for_update().get_or_create(name=sink.NAME)
+            if outbox_sink.lease_id and outbox_sink.lease_expires > timezone.now():
+                return None, None
+
+            lease_id = uuid4().hex
+            outbox_sink.lease_id = lease_id
+            outbox_sink.lease_expires = self.get_lease_expiry()
+            outbox_sink.save()
+
+        return outbox_sink, lease_id
+
+    def renew_lease(self, outbox_sink, lease_id):
+        """Extend the given lease, if it is still held, locking the sink until the current transaction ends.
+
+        Returns:
+            bool: True if the lease was still held.
+        """
+        locked_sink = OutboxSink.objects.select_for_update().get(pk=outbox_sink.pk)
+        if locked_sink.lease_id != lease_id:
+            return False
+
+        locked_sink.lease_expires = self.get_lease_expiry()
+        locked_sink.save()
+        return True
+
+    def get_lease_expiry(self):
+        return timezone.now() + timedelta(seconds=settings.OUTBOX_RELAY_LEASE_SECONDS)
+
+    def prune(self, sink_names, batch_size):
+        """Delete events which have been delivered to every configured sink, and their deliveries.
+
+        This keeps the cost of finding undelivered events independent of the number of events
+        ever recorded. Sinks added later do not receive the deleted events.
+
+        Returns:
+            int: The number of events deleted.
+        """
+        if not sink_names:
+            return 0
+
+        delivered = OutboxEvent.objects.filter(deliveries__sink__name__in=sink_names).annotate(
+            sink_count=Count('deliveries')
+        ).filter(sink_count=len(sink_names))
+
+        pruned = 0
+        while True:
+            event_ids = list(delivered.values_list('id', flat=True)[:batch_size])
+            if not event_ids:
+                return pruned
+
+            with transaction.atomic():
+                OutboxDelivery.objects.filter(event_id__in=event_ids).delete()
+                OutboxEvent.objects.filter(id__in=event_ids).delete()
+
+            pruned += len(event_ids)
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxDelivery',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+            },
+            bases=(models.Model,),
+        ),
+        migrations.CreateModel(
+            name='OutboxEvent',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('event_type', models.CharField(max_length=64, verbose_name='Event Type')),
+                ('order_number', models.CharField(max_length=128, verbose_name='Order Number', db_index=True)),
+                ('payload', models.TextField()),
+                ('created', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+            },
+            bases=(models.Model,),
+        ),
+        migrations.CreateModel(
+            name='OutboxSink',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('name', models.CharField(unique=True, max_length=64, verbose_name='Name')),
+                ('lease_id', models.CharField(max_length=32, blank=True)),
+                ('lease_expires', models.DateTimeField(null=True, blank=True)),
+            ],
+            options={
+            },
+            bases=(models.Model,),
+        ),
+        migrations.AddField(
+            model_name='outboxdelivery',
+            name='event',
+            field=models.ForeignKey(related_name='deliveries', to='outbox.OutboxEvent'),
+            preserve_default=True,
+        ),
+        migrations.AddField(
+            model_name='outboxdelivery',
+            name='sink',
+            field=models.ForeignKey(related_name='deliveries', to='outbox.OutboxSink'),
+            preserve_default=True,
+        ),
+        migrations.AlterUniqueTogether(
+            name='outboxdelivery',
+            unique_together=set([('sink', 'event')]),
+        ),
+    ]
@@ -0,0 +1,42 @@
+from django.db import models
+from django.utils.translation import ugettext_lazy as _
+
+
+class OutboxEvent(models.Model):
+    """An order lifecycle event, awaiting publication to downstream systems.
+
+    Events are written in the same transaction as the change they describe, and are
+    never updated by the application. The relay_outbox_events command publishes them,
+    in ID order, to each configured sink, recording each delivery, and deletes them once
+    they have been delivered to every configured sink.
+    """
+    ORDER_PLACED = 'order.placed'
+    ORDER_STATUS_CHANGED = 'order.status_changed'
+    LINE_STATUS_CHANGED = 'line.status_changed'
+
+    event_type = models.CharField(_("Event Type"), max_length=64)
+    order_number = models.CharField(_("Order Number"), max_length=128, db_index=True)
+    # JSON-encoded event data
+    payload = models.TextField()
+    created = models.DateTimeField(auto_now_add=True)
+
+
+class OutboxSink(models.Model):
+    """A sink to which events are published.
+
+    A relay holds a lease on the sink while publishing to it, so that concurrent relays don't
+    publish the same events. The lease expires if the relay stops without releasing it.
+    """
+    name = models.CharField(_("Name"), max_length=64, unique=True)
+    lease_id = models.CharField(max_length=32, blank=True)
+    lease_expires = models.DateTimeField(null=True, blank=True)
+
+
+class OutboxDelivery(models.Model):
+    """The publication of an event to a sink."""
+    event = models.ForeignKey(OutboxEvent, related_name='deliveries')
+    sink = models.ForeignKey(OutboxSink, related_name='deliveries')
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta(object):
+        unique_together = ('sink', 'event')
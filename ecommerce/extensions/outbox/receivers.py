@@ -0,0 +1,10 @@
+from django.dispatch import receiver
+from oscar.apps.order.signals import order_placed
+
+from ecommerce.extensions.outbox import api
+
+
+@receiver(order_placed, dispatch_uid='outbox.order_placed')
+def record_order_placed(sender, order, **kwargs):  # pylint: disable=unused-argument
+    """Record the placement of orders, in the transaction in which they are placed."""
+    api.record_order_placed(order)
@@ -0,0 +1,100 @@
+"""Sinks to which the relay_outbox_events command publishes outbox events."""
+import io
+import json
+import logging
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.module_loading import import_string
+
+from ecommerce import outbound
+
+
+logger = logging.getLogger(__name__)
+
+
+def get_sinks():
+    """Return an instance of each sink class listed in the OUTBOX_SINKS setting."""
+    return [import_string(path)() for path in settings.OUTBOX_SINKS]
+
+
+def serialize_event(event):
+    """Return a JSON-serializable representation of the given outbox event."""
+    return {
+        'id': event.id,
+        'type': event.event_type,
+        'created': event.created,
+        'data': json.loads(event.payload),
+    }
+
+
+class BaseSink(object):  # pragma: no cover
+    """Base class for outbox event sinks.
+
+    The relay_outbox_events command tracks the events published to each sink by its NAME.
+    """
+    NAME = None
+
+    def publish(self, events):
+        """Publish the given events, which are ordered by ID.
+
+        Implementations must raise an exception if any event could not be published. The
+        batch is then retried, so sinks may receive events more than once.
+
+        Arguments:
+            events (list of OutboxEvent): Events to publish.
+        """
+        raise NotImplementedError("Publish method not implemented.")
+
+    @property
+    def configuration(self):
+        """
+        Returns the configuration (set in Django settings) specific to this sink.
+
+        Returns:
+            dict: Sink configuration
+
+        Raises:
+            KeyError: If no settings found for this sink.
+        """
+        return settings.OUTBOX_SINK_CONFIG[self.NAME]
+
+
+class FileSink(BaseSink):
+    """Append events to a file, one JSON object per line."""
+    NAME = 'file'
+
+    def publish(self, events):
+        with io.open(self.configuration['path'], 'a', encoding='utf-8') as f:
+            for event in events:
+                f.write(json.dumps(serialize_event(event), cls=DjangoJSONEncoder, sort_keys=True) + u'\n')
+
+
+class HttpSink(BaseSink):
+    """POST events, in batches, to an HTTP endpoint as a JSON object of the form {"events": [...]}."""
+    NAME = 'http'
+
+    def publish(self, events):
+        data = json.dumps({'events': [serialize_event(event) for event in events]}, cls=DjangoJSONEncoder)
+        headers = dict(self.configuration.get('headers', {}), **{'Content-Type': 'application/json'})
+        response = outbound.post(
+            outbound.OUTBOX,
+            self.configuration['url'],
+            data=data,
+            headers=headers,
+            timeout=self.configuration.get('timeout', 5)
+        )
+        response.raise_for_status()
+
+
+class StubSink(BaseSink):
+    """Log events, and keep them in memory, instead of sending them anywhere. For development and testing."""
+    NAME = 'stub'
+
+    published = []
+
+    def publish(self, events):
+        for event in events:
+            logger.info(u"Published outbox event [%d] of type [%s] for order [%s]",
+                        event.id, event.event_type, event.order_number)
+            self.published.append(serialize_event(event))
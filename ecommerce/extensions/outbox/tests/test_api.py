@@ -0,0 +1,63 @@
+"""Tests of the recording of order lifecycle events."""
+import json
+
+from django.test import TestCase
+from oscar.apps.order.exceptions import InvalidOrderStatus
+from oscar.core.loading import get_model
+from oscar.test import factories
+
+from ecommerce.extensions.fulfillment.status import LINE, ORDER
+
+
+Order = get_model('order', 'Order')
+OutboxEvent = get_model('outbox', 'OutboxEvent')
+
+
+class OutboxRecordingTests(TestCase):
+    def setUp(self):
+        super(OutboxRecordingTests, self).setUp()
+        self.order = Order.objects.get(id=factories.create_order().id)
+        self.line = self.order.lines.get()
+
+    def assert_last_event(self, event_type, **data):
+        """Verify that the most recent event has the given type and includes the given data."""
+        event = OutboxEvent.objects.order_by('-id').first()
+        self.assertEqual(event.event_type, event_type)
+        self.assertEqual(event.order_number, self.order.number)
+
+        payload = json.loads(event.payload)
+        self.assertEqual(payload['order_number'], self.order.number)
+        self.assertDictContainsSubset(data, payload)
+
+    def test_order_placed(self):
+        """Placing an order should record an event describing the order and its lines."""
+        self.assert_last_event(OutboxEvent.ORDER_PLACED, status=ORDER.OPEN, currency=self.order.currency)
+
+        payload = json.loads(OutboxEvent.objects.get().payload)
+        self.assertEqual(payload['lines'], [{
+            'id': self.line.id,
+            'partner_sku': self.line.partner_sku,
+            'quantity': self.line.quantity,
+            'status': LINE.OPEN,
+        }])
+
+    def test_order_status_changed(self):
+        """Changing an order's status should record an event."""
+        self.order.set_status(ORDER.COMPLETE)
+        self.assert_last_event(OutboxEvent.ORDER_STATUS_CHANGED, old_status=ORDER.OPEN, status=ORDER.COMPLETE)
+
+    def test_line_status_changed(self):
+        """Changing a line's status should record an event."""
+        self.line.set_status(LINE.COMPLETE)
+        self.assert_last_event(
+            OutboxEvent.LINE_STATUS_CHANGED, line_id=self.line.id, old_status=LINE.OPEN, status=LINE.COMPLETE
+        )
+
+    def test_status_unchanged(self):
+        """No event should be recorded if a status is set to its current value, or can't be set."""
+        self.order.set_status(ORDER.OPEN)
+        self.line.set_status(LINE.OPEN)
+        with self.assertRaises(InvalidOrderStatus):
+            self.order.set_status('Nonexistent')
+
+        self.assertEqual(OutboxEvent.objects.count(), 1)
@@ -0,0 +1,128 @@
+"""Tests for the outbox's management commands."""
+from datetime import timedelta
+
+from django.core.management import call_command, CommandError
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.utils import timezone
+import mock
+from oscar.core.loading import get_model
+from oscar.test import factories
+
+from ecommerce.extensions.outbox.sinks import StubSink
+
+
+OutboxDelivery = get_model('outbox', 'OutboxDelivery')
+OutboxEvent = get_model('outbox', 'OutboxEvent')
+OutboxSink = get_model('outbox', 'OutboxSink')
+
+
+@override_settings(OUTBOX_SINKS=('ecommerce.extensions.outbox.sinks.StubSink',))
+class RelayOutboxEventsCommandTests(TestCase):
+    def setUp(self):
+        super(RelayOutboxEventsCommandTests, self).setUp()
+        for __ in xrange(3):
+            factories.create_order()
+
+        self.addCleanup(self.clear_stub)
+        self.clear_stub()
+
+    def clear_stub(self):
+        del StubSink.published[:]
+
+    def published_ids(self):
+        return [event['id'] for event in StubSink.published]
+
+    def event_ids(self):
+        return list(OutboxEvent.objects.order_by('id').values_list('id', flat=True))
+
+    def test_relay(self):
+        """All events should be published, in batches, and deleted once delivered to every sink."""
+        event_ids = self.event_ids()
+        with mock.patch.object(StubSink, 'publish', autospec=True, side_effect=StubSink.publish) as mock_publish:
+            call_command('relay_outbox_events', batch_size=2)
+
+        self.assertEqual(mock_publish.call_count, 2)
+        self.assertEqual(self.published_ids(), event_ids)
+        self.assertFalse(OutboxEvent.objects.exists())
+        self.assertFalse(OutboxDelivery.objects.exists())
+        self.assertEqual(OutboxSink.objects.get(name=StubSink.NAME).lease_id, '')
+
+        # Events which have already been published should not be published again.
+        factories.create_order()
+        event_ids += self.event_ids()
+        call_command('relay_outbox_events')
+        self.assertEqual(self.published_ids(), event_ids)
+
+    @override_settings(OUTBOX_SINKS=(
+        'ecommerce.extensions.outbox.sinks.StubSink', 'ecommerce.extensions.outbox.sinks.FileSink'
+    ))
+    def test_partial_delivery(self):
+        """Events should be kept until they have been delivered to every sink."""
+        event_ids = self.event_ids()
+        call_command('relay_outbox_events', sink=StubSink.NAME)
+
+        self.assertEqual(self.published_ids(), event_ids)
+        self.assertEqual(self.event_ids(), event_ids)
+        self.assertEqual(
+            sorted(OutboxDelivery.objects.filter(sink__name=StubSink.NAME).values_list('event_id', flat=True)),
+            event_ids
+        )
+
+    def test_late_commit(self):
+        """An event committed after events with higher IDs have been published should still be published."""
+        event_ids = self.event_ids()
+
+        # Simulate the event's transaction committing late by hiding it until the others are published.
+        event = OutboxEvent.objects.get(id=event_ids[1])
+        event.delete()
+        call_command('relay_outbox_events')
+        self.assertNotIn(event_ids[1], self.published_ids())
+        self.assertGreater(max(self.published_ids()), event_ids[1])
+
+        event.id = event_ids[1]
+        event.save(force_insert=True)
+        call_command('relay_outbox_events')
+        self.assertEqual(self.published_ids()[-1], event_ids[1])
+        self.assertEqual(sorted(self.published_ids()), event_ids)
+
+    def test_publish_failure(self):
+        """The delivery of events which could not be published should not be recorded."""
+        with mock.patch.object(StubSink, 'publish', side_effect=ValueError):
+            with self.assertRaises(ValueError):
+                call_command('relay_outbox_events')
+
+        self.assertFalse(OutboxDelivery.objects.exists())
+        self.assertEqual(OutboxSink.objects.get(name=StubSink.NAME).lease_id, '')
+
+    def test_leased_sink(self):
+        """Events should not be published to a sink leased by another relay, until the lease expires."""
+        lease_expires = timezone.now() + timedelta(minutes=1)
+        OutboxSink.objects.create(name=StubSink.NAME, lease_id='other', lease_expires=lease_expires)
+        call_command('relay_outbox_events')
+        self.assertEqual(self.published_ids(), [])
+
+        OutboxSink.objects.update(lease_expires=timezone.now() - timedelta(seconds=1))
+        event_ids = self.event_ids()
+        call_command('relay_outbox_events')
+        self.assertEqual(self.published_ids(), event_ids)
+
+    def test_lost_lease(self):
+        """Deliveries should not be recorded if another relay took over the lease while events were published."""
+        publish_to_stub = StubSink.publish
+
+        def publish(events):
+            publish_to_stub(StubSink(), events)
+            OutboxSink.objects.update(lease_id='other')
+
+        with mock.patch.object(StubSink, 'publish', side_effect=publish):
+            call_command('relay_outbox_events')
+
+        self.assertEqual(self.published_ids(), self.event_ids())
+        self.assertFalse(OutboxDelivery.objects.exists())
+        self.assertEqual(OutboxSink.objects.get(name=StubSink.NAME).lease_id, 'other')
+
+    def test_unknown_sink(self):
+        """An error should be raised if the named sink is not configured."""
+        with self.assertRaises(CommandError):
+            call_command('relay_outbox_events', sink='nonexistent')
@@ -0,0 +1,71 @@
+"""Tests of outbox event sinks."""
+import json
+import os
+import shutil
+import tempfile
+
+from django.test import TestCase
+from django.test.utils import override_settings
+import httpretty
+from oscar.core.loading import get_model
+from oscar.test import factories
+import requests
+
+from ecommerce.extensions.outbox.sinks import FileSink, HttpSink
+
+
+OutboxEvent = get_model('outbox', 'OutboxEvent')
+
+EVENTS_URL = 'http://events.example.com/orders/'
+
+
+class SinkTestMixin(object):
+    def setUp(self):
+        super(SinkTestMixin, self).setUp()
+        order = factories.create_order()
+        order.lines.get().set_status('Complete')
+        self.events = list(OutboxEvent.objects.order_by('id'))
+
+    def assert_published(self, published):
+        """Verify that the given published events match the recorded events."""
+        self.assertEqual([event['id'] for event in published], [event.id for event in self.events])
+        self.assertEqual([event['type'] for event in published], [event.event_type for event in self.events])
+        self.assertEqual([event['data'] for event in published], [json.loads(event.payload) for event in self.events])
+
+
+class FileSinkTests(SinkTestMixin, TestCase):
+    def setUp(self):
+        super(FileSinkTests, self).setUp()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, 'events.log')
+
+    def test_publish(self):
+        """Events should be appended to the file, one JSON object per line."""
+        with override_settings(OUTBOX_SINK_CONFIG={'file': {'path': self.path}}):
+            FileSink().publish(self.events[:1])
+            FileSink().publish(self.events[1:])
+
+        with open(self.path) as f:
+            self.assert_published([json.loads(line) for line in f])
+
+
+@override_settings(OUTBOX_SINK_CONFIG={'http': {'url': EVENTS_URL, 'headers': {'X-Token': 'secret'}}})
+class HttpSinkTests(SinkTestMixin, TestCase):
+    @httpretty.activate
+    def test_publish(self):
+        """Events should be POSTed to the configured URL in a single request."""
+        httpretty.register_uri(httpretty.POST, EVENTS_URL, status=204)
+        HttpSink().publish(self.events)
+
+        request = httpretty.last_request()
+        self.assertEqual(request.headers['Content-Type'], 'application/json')
+        self.assertEqual(request.headers['X-Token'], 'secret')
+        self.assert_published(json.loads(request.body)['events'])
+
+    @httpretty.activate
+    def test_publish_failure(self):
+        """An exception should be raised if the endpoint responds with an error."""
+        httpretty.register_uri(httpretty.POST, EVENTS_URL, status=500)
+        with self.assertRaises(requests.HTTPError):
+            HttpSink().publish(self.events)
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+from ecommerce.extensions.operations import AddIndex
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('partner', '0003_auto_20150223_1130'),
+    ]
+
+    operations = [
+        # Retrieving products by SKU. The unique index on (partner, partner_sku) can't serve
+        # lookups which don't specify a partner.
+        AddIndex('partner', 'stockrecord', ['partner_sku', 'product'], 'partner_stockrecord_partner_sku_product_id'),
+    ]
@@ -8,6 +8,7 @@ from collections import OrderedDict
 
 from django.conf import settings
 
+from ecommerce import metrics, timing
 from ecommerce.extensions.payment.helpers import sign
 from ecommerce.extensions.payment.errors import (
     ExcessiveMerchantDefinedData, UnsupportedProductError
@@ -17,6 +18,11 @@ from ecommerce.extensions.payment.constants import CybersourceConstants as CS
 
 logger = logging.getLogger(__name__)
 
+TRANSACTIONS = metrics.Counter(
+    'ecommerce_payment_transactions_total', 'Transactions prepared for payment processors, by processor.',
+    ('processor',)
+)
+
 
 class BasePaymentProcessor(object):  # pragma no cover
     """Base payment processor class."""
@@ -108,6 +114,7 @@ class Cybersource(BasePaymentProcessor):
         )
 
         transaction_parameters[CS.FIELD_NAMES.SIGNATURE] = self._generate_signature(transaction_parameters)
+        TRANSACTIONS.inc(processor=self.NAME)
 
         logger.info(
             u"Signed CyberSource transaction parameters for order [%s]",
@@ -225,6 +232,7 @@ class Cybersource(BasePaymentProcessor):
             base_url=self.receipt_page_url, order_number=order.id
         )
 
+    @timing.timed(timing.SIGNING)
     def _generate_signature(self, parameters):
         """Sign the contents of the provided transaction parameters dictionary.
 
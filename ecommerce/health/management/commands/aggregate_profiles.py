@@ -0,0 +1,74 @@
+"""Print the functions in which sampled requests spent the most time, aggregated across their profiles."""
+from optparse import make_option
+import pstats
+from StringIO import StringIO
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ecommerce import profiling
+
+
+class Command(BaseCommand):
+    help = 'Aggregate the profiles of sampled requests written to PROFILING_DIRECTORY.'
+
+    option_list = BaseCommand.option_list + (
+        make_option(
+            '--endpoint',
+            action='store',
+            dest='endpoint',
+            default=None,
+            help='Only aggregate profiles of requests handled by this endpoint (i.e., view name).'
+        ),
+        make_option(
+            '--sort',
+            action='store',
+            dest='sort',
+            default='cumulative',
+            help='Key by which functions are sorted, as accepted by pstats (e.g., cumulative, tottime, calls).'
+        ),
+        make_option(
+            '--limit',
+            action='store',
+            dest='limit',
+            type='int',
+            default=40,
+            help='Maximum number of functions to print.'
+        ),
+        make_option(
+            '--output',
+            action='store',
+            dest='output',
+            default=None,
+            help='Path to which the aggregated profile is written, for inspection with other tools.'
+        ),
+    )
+
+    def handle(self, *args, **options):
+        if not getattr(settings, 'PROFILING_DIRECTORY', None):
+            raise CommandError(u"PROFILING_DIRECTORY is not set, so no requests are profiled.")
+
+        # pstats writes fragments of lines, to which the command's stdout would append newlines.
+        report = StringIO()
+        stats = None
+        count = 0
+        for path in profiling.list_profiles(options['endpoint']):
+            try:
+                if stats is None:
+                    stats = pstats.Stats(path, stream=report)
+                else:
+                    stats.add(path)
+            except (EOFError, IOError, ValueError):
+                # The profile may have been deleted, or still be being written.
+                continue
+            count += 1
+
+        if stats is None:
+            raise CommandError(u"No profiles found.")
+
+        if options['output']:
+            stats.dump_stats(options['output'])
+
+        stats.strip_dirs().sort_stats(options['sort']).print_stats(options['limit'])
+        self.stdout.write(u"Aggregated {} profiles.".format(count))
+        self.stdout.write(report.getvalue())
@@ -0,0 +1,55 @@
+"""Print statistics about the queries executed by each endpoint, aggregated by SQL fingerprint."""
+import json
+from optparse import make_option
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ecommerce import querylog
+
+
+class Command(BaseCommand):
+    help = 'Print the statistics recorded in SQL_STATS_DIRECTORY, by endpoint and SQL fingerprint.'
+
+    option_list = BaseCommand.option_list + (
+        make_option(
+            '--endpoint',
+            action='store',
+            dest='endpoint',
+            default=None,
+            help='Only print statistics for queries executed by this endpoint (i.e., view name).'
+        ),
+        make_option(
+            '--limit',
+            action='store',
+            dest='limit',
+            type='int',
+            default=50,
+            help='Maximum number of fingerprints to print, in descending order of total time.'
+        ),
+        make_option(
+            '--json',
+            action='store_true',
+            dest='json',
+            default=False,
+            help='Print statistics as JSON.'
+        ),
+    )
+
+    def handle(self, *args, **options):
+        if not getattr(settings, 'SQL_STATS_DIRECTORY', None):
+            raise CommandError(u"SQL_STATS_DIRECTORY is not set, so no query statistics are recorded.")
+
+        rows = querylog.collect()
+        if options['endpoint'] is not None:
+            rows = [row for row in rows if row['endpoint'] == options['endpoint']]
+        rows = rows[:options['limit']]
+
+        if options['json']:
+            self.stdout.write(json.dumps(rows, indent=2, sort_keys=True))
+            return
+
+        for row in rows:
+            self.stdout.write(
+                u"{total:10.3f}s total {count:8d} queries {max:8.3f}s max  {endpoint}\n    {fingerprint}".format(**row)
+            )
@@ -0,0 +1,55 @@
+"""Print the modules which take longest to import while a worker boots."""
+from optparse import make_option
+import subprocess
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ecommerce import importtime
+
+
+class Command(BaseCommand):
+    help = 'Boot a fresh interpreter under the current settings, and print the slowest imports.'
+
+    option_list = BaseCommand.option_list + (
+        make_option(
+            '--sort',
+            action='store',
+            dest='sort',
+            type='choice',
+            choices=('cumulative', 'self'),
+            default='cumulative',
+            help='Sort imports by the time spent loading them with (cumulative) or without (self) their own imports.'
+        ),
+        make_option(
+            '--limit',
+            action='store',
+            dest='limit',
+            type='int',
+            default=40,
+            help='Maximum number of imports to print.'
+        ),
+        make_option(
+            '--urls',
+            action='store_true',
+            dest='urls',
+            default=False,
+            help='Also load the URLconf, as the first request (or warm-up) does.'
+        ),
+    )
+
+    def handle(self, *args, **options):
+        try:
+            report = importtime.profile_boot(settings.SETTINGS_MODULE, urls=options['urls'])
+        except subprocess.CalledProcessError as e:
+            raise CommandError(u"Booting failed:\n{}".format(e.output))
+
+        self.stdout.write(u"Booted in {total:.1f} ms, loading {modules} modules.".format(
+            total=report['total'] * 1000, modules=report['modules']
+        ))
+        self.stdout.write(u"{:>12} {:>12}  {}".format('cumulative', 'self', 'module'))
+        imports = sorted(report['imports'], key=lambda record: record[options['sort']], reverse=True)
+        for record in imports[:options['limit']]:
+            self.stdout.write(u"{cumulative:>9.1f} ms {own:>9.1f} ms  {module}".format(
+                cumulative=record['cumulative'] * 1000, own=record['self'] * 1000, module=record['module']
+            ))
@@ -11,6 +11,7 @@ from django.db import DatabaseError
 from django.core.urlresolvers import reverse
 
 from ecommerce.health.constants import Status
+from ecommerce.tests.mixins import UserMixin
 
 
 @mock.patch('requests.get')
@@ -82,3 +83,24 @@ class HealthTests(TestCase):
             }
         }
         self.assertDictEqual(json.loads(response.content), expected_data)
+
+
+class MetricsTests(UserMixin, TestCase):
+    """Tests of the metrics endpoint."""
+    def test_staff_only(self):
+        """Test that only staff can view metrics."""
+        user = self.create_user()
+        self.client.login(username=user.username, password=self.password)
+
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, status.HTTP_302_FOUND)
+
+    def test_metrics(self):
+        """Test that metrics are exposed in the Prometheus text format."""
+        user = self.create_user(is_staff=True)
+        self.client.login(username=user.username, password=self.password)
+
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['content-type'], 'text/plain; version=0.0.4; charset=utf-8')
+        self.assertIn('# TYPE ecommerce_checkouts_total counter', response.content)
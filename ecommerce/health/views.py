@@ -1,13 +1,14 @@
 """HTTP endpoint for verifying the health of the ecommerce front-end."""
 import logging
 
-import requests
 from requests.exceptions import RequestException
 from rest_framework import status
 from django.conf import settings
+from django.contrib.auth.decorators import user_passes_test
 from django.db import transaction, connection, DatabaseError
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
 
+from ecommerce import metrics as ecommerce_metrics, outbound
 from ecommerce.health.constants import Status, UnavailabilityMessage
 
 
@@ -48,7 +49,7 @@ def health(_):
         database_status = Status.UNAVAILABLE
 
     try:
-        response = requests.get(LMS_HEALTH_PAGE)
+        response = outbound.get(outbound.LMS_HEALTH, LMS_HEALTH_PAGE)
 
         if response.status_code == status.HTTP_200_OK:
             lms_status = Status.OK
@@ -73,3 +74,14 @@ def health(_):
         return JsonResponse(data)
     else:
         return JsonResponse(data, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+
+@transaction.non_atomic_requests
+@user_passes_test(lambda user: user.is_staff)
+def metrics(_):
+    """Exposes the service's metrics, aggregated across processes, to staff.
+
+    Returns:
+        HttpResponse: 200, with metrics in the Prometheus text exposition format
+    """
+    return HttpResponse(ecommerce_metrics.generate_latest(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,170 @@
+"""Measurement of the time taken to import the modules loaded while a worker boots.
+
+Run as a script, in a fresh interpreter, to time a boot under the settings named by
+DJANGO_SETTINGS_MODULE and write the timings as JSON to the given path (or standard
+output, to which logging may also be written):
+
+    $ python -m ecommerce.importtime /tmp/imports.json [--urls]
+
+The profile_imports management command runs this script, with `profile_boot`, and
+reports the slowest imports.
+"""
+from __future__ import absolute_import
+
+import imp
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+
+class _TimedLoader(object):
+    def __init__(self, timer, found):
+        self.timer = timer
+        self.found = found
+
+    def load_module(self, fullname):
+        if fullname in sys.modules:
+            return sys.modules[fullname]
+
+        module_file, pathname, description = self.found
+        self.timer.start()
+        try:
+            return imp.load_module(fullname, module_file, pathname, description)
+        finally:
+            if module_file:
+                module_file.close()
+            self.timer.stop(fullname)
+
+
+class ImportTimer(object):
+    """Records the time taken to load each module, while installed.
+
+    Each module is attributed the time spent executing it (self time) and the time spent
+    executing it together with the modules it imports in turn (cumulative time). Modules
+    are found as the default import machinery finds them, from the meta path, so that
+    failed imports raise exactly the errors they otherwise would. Modules which other
+    importers (e.g., zipimport) load are loaded by them, untimed.
+    """
+
+    def __init__(self):
+        self.records = {}
+        # Time spent loading nested modules, for each module being loaded
+        self._stack = []
+
+    def install(self):
+        sys.meta_path.insert(0, self)
+
+    def uninstall(self):
+        sys.meta_path.remove(self)
+
+    def __enter__(self):
+        self.install()
+        return self
+
+    def __exit__(self, *args):
+        self.uninstall()
+
+    def find_module(self, fullname, path=None):
+        # Leave the module to any other importer on the meta path (e.g., of vendored packages) which can load it.
+        for importer in sys.meta_path:
+            if importer is not self and importer.find_module(fullname, path):
+                return None
+
+        try:
+            found = imp.find_module(fullname.rpartition('.')[2], path)
+        except ImportError:
+            return None
+        return _TimedLoader(self, found)
+
+    def start(self):
+        self._stack.append((time.time(), 0.0))
+
+    def stop(self, fullname):
+        start, nested = self._stack.pop()
+        cumulative = time.time() - start
+        if self._stack:
+            parent_start, parent_nested = self._stack[-1]
+            self._stack[-1] = (parent_start, parent_nested + cumulative)
+
+        self.records[fullname] = {
+            'module': fullname,
+            'self': cumulative - nested,
+            'cumulative': cumulative,
+        }
+
+    def slowest(self, key='cumulative', limit=None):
+        """Return the records of the slowest imports, sorted in descending order of the given key."""
+        records = sorted(self.records.values(), key=lambda record: record[key], reverse=True)
+        return records[:limit] if limit else records
+
+
+def boot(urls=False):
+    """Load the settings, applications and middleware, as a WSGI worker does before serving its first request.
+
+    Arguments:
+        urls (bool): Whether to also load the URLconf, which is otherwise loaded by the first request.
+    """
+    from django.core.wsgi import get_wsgi_application
+    application = get_wsgi_application()
+
+    if urls:
+        from django.core.urlresolvers import get_resolver
+        get_resolver(None).reverse_dict  # pylint: disable=expression-not-assigned
+
+    return application
+
+
+def main(path=None, *args):
+    timer = ImportTimer()
+    start = time.time()
+    with timer:
+        boot(urls='--urls' in args)
+    total = time.time() - start
+
+    report = {
+        'total': total,
+        'modules': len(sys.modules),
+        'imports': timer.slowest(),
+    }
+    if path:
+        with open(path, 'w') as f:
+            json.dump(report, f)
+    else:
+        json.dump(report, sys.stdout)
+
+
+def profile_boot(settings_module, urls=False):
+    """Boot a fresh interpreter under the given settings, timing the modules it imports.
+
+    Arguments:
+        settings_module (str): Dotted path of the settings module with which to boot.
+        urls (bool): Whether to also load the URLconf.
+
+    Returns:
+        dict: Total number of seconds taken to boot, number of modules loaded, and the
+            records of each import, as returned by `ImportTimer.slowest`.
+
+    Raises:
+        subprocess.CalledProcessError: If the interpreter fails to boot.
+    """
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings_module)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [project_root, env.get('PYTHONPATH')]))
+
+    handle, path = tempfile.mkstemp(suffix='.json')
+    os.close(handle)
+    try:
+        command = [sys.executable, '-m', 'ecommerce.importtime', path] + (['--urls'] if urls else [])
+        # Output, such as logging, is discarded; it's included in the error raised if booting fails.
+        subprocess.check_output(command, env=env, cwd=project_root, stderr=subprocess.STDOUT)
+        with open(path) as f:
+            return json.load(f)
+    finally:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
@@ -0,0 +1,365 @@
+"""Counters, gauges and histograms, aggregated across processes and exposed in the Prometheus text format.
+
+Metrics are declared once, at module level, and updated by any process:
+
+    CHECKOUTS = metrics.Counter('ecommerce_checkouts_total', 'Checkouts performed.', ('outcome',))
+    CHECKOUTS.inc(outcome='free_order')
+
+If METRICS_DIRECTORY is set, each process records its samples in a memory-mapped file in
+that directory, which is read by whichever process renders the metrics. Counters and
+histograms are summed across the files of all processes, including those which have
+exited, so the directory should be emptied when the service is deployed. Gauges are summed
+across the processes which are still running. If METRICS_DIRECTORY is not set, samples are
+kept in memory, and only those recorded by the rendering process are exposed.
+"""
+from collections import defaultdict, OrderedDict
+from contextlib import contextmanager
+import errno
+import glob
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+
+from django.conf import settings
+
+
+FILENAME_TEMPLATE = 'metrics_{pid}.db'
+
+# Each file begins with the number of bytes used, padded to 8 bytes. Each entry then consists
+# of the length of its key, the key, padded so that the value is aligned to 8 bytes, and the value.
+_HEADER = struct.Struct(b'i')
+_KEY_LENGTH = struct.Struct(b'i')
+_VALUE = struct.Struct(b'd')
+_INITIAL_FILE_SIZE = 64 * 1024
+
+
+class MmapValues(object):
+    """Sample values recorded by a single process, stored in a memory-mapped file.
+
+    Arguments:
+        path (str): Path of the file, which is created if it doesn't exist.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'a+b')
+        if os.fstat(self._file.fileno()).st_size == 0:
+            self._file.truncate(_INITIAL_FILE_SIZE)
+        self._capacity = os.fstat(self._file.fileno()).st_size
+        self._map = mmap.mmap(self._file.fileno(), self._capacity)
+
+        self._used = _HEADER.unpack_from(self._map, 0)[0] or 8
+        self._positions = {key: position for key, __, position in _read_entries(self._map, self._used)}
+
+    def get(self, key):
+        position = self._positions.get(key)
+        return 0.0 if position is None else _VALUE.unpack_from(self._map, position)[0]
+
+    def set(self, key, value):
+        position = self._positions.get(key)
+        if position is None:
+            position = self._add(key)
+        _VALUE.pack_into(self._map, position, value)
+
+    def keys(self):
+        return self._positions.keys()
+
+    def _add(self, key):
+        encoded = key.encode('utf-8')
+        padding = 8 - (_KEY_LENGTH.size + len(encoded)) % 8
+        entry = _KEY_LENGTH.pack(len(encoded)) + encoded + b' ' * padding + _VALUE.pack(0.0)
+
+        while self._used + len(entry) > self._capacity:
+            self._capacity *= 2
+            self._file.truncate(self._capacity)
+            self._map.close()
+            self._map = mmap.mmap(self._file.fileno(), self._capacity)
+
+        self._map[self._used:self._used + len(entry)] = entry
+        position = self._used + len(entry) - _VALUE.size
+        self._used += len(entry)
+        _HEADER.pack_into(self._map, 0, self._used)
+
+        self._positions[key] = position
+        return position
+
+
+class DictValues(object):
+    """Sample values recorded by a single process, stored in memory."""
+
+    def __init__(self):
+        self._values = {}
+
+    def get(self, key):
+        return self._values.get(key, 0.0)
+
+    def set(self, key, value):
+        self._values[key] = value
+
+    def items(self):
+        return self._values.items()
+
+
+def _read_entries(buf, used):
+    """Yield the key, value and value position of each entry in a file's contents."""
+    position = 8
+    while position < used:
+        length = _KEY_LENGTH.unpack_from(buf, position)[0]
+        key_end = position + _KEY_LENGTH.size + length
+        key = buf[position + _KEY_LENGTH.size:key_end].decode('utf-8')
+        value_position = key_end + 8 - (_KEY_LENGTH.size + length) % 8
+        yield key, _VALUE.unpack_from(buf, value_position)[0], value_position
+        position = value_position + _VALUE.size
+
+
+def read_values_file(path):
+    """Read the sample values recorded in a file written by MmapValues.
+
+    The file is read without being mapped, so that files which other processes are still
+    creating or updating are not modified.
+
+    Arguments:
+        path (str): Path of the file.
+
+    Returns:
+        list: (key, value) tuples, one for each entry in the file.
+    """
+    with open(path, 'rb') as f:
+        buf = f.read()
+    if len(buf) < _HEADER.size:
+        return []
+    return [(key, value) for key, value, __ in _read_entries(buf, _HEADER.unpack_from(buf, 0)[0])]
+
+
+def _is_running(pid):
+    try:
+        os.kill(pid, 0)
+    except OSError as error:
+        return error.errno == errno.EPERM
+    return True
+
+
+def _encode_key(sample_name, labels):
+    return json.dumps([sample_name, sorted(labels.items())])
+
+
+def _decode_key(key):
+    sample_name, labels = json.loads(key)
+    return sample_name, tuple(tuple(pair) for pair in labels)
+
+
+class Registry(object):
+    """Metrics declared by the project, and the samples recorded for them by this process."""
+
+    def __init__(self):
+        self._metrics = OrderedDict()
+        self._lock = threading.Lock()
+        self._values = None
+        self._owner = None
+
+    def register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(u"A metric named [{}] is already registered.".format(metric.name))
+        self._metrics[metric.name] = metric
+
+    def get_metrics(self):
+        return self._metrics.values()
+
+    def update(self, key, func):
+        """Replace the value of a sample with the result of calling `func` with its current value."""
+        with self._lock:
+            values = self._get_values()
+            values.set(key, func(values.get(key)))
+
+    def _get_values(self):
+        # Servers which fork workers after loading the project must not share the file opened by the parent.
+        pid = os.getpid()
+        directory = getattr(settings, 'METRICS_DIRECTORY', None)
+        if self._owner != (pid, directory):
+            if directory:
+                self._values = MmapValues(os.path.join(directory, FILENAME_TEMPLATE.format(pid=pid)))
+            else:
+                self._values = DictValues()
+            self._owner = (pid, directory)
+
+        return self._values
+
+    def collect(self):
+        """Return the values of all samples, summed across processes.
+
+        Returns:
+            dict: Mapping of (sample name, labels) tuples to values.
+        """
+        gauge_names = {metric.name for metric in self._metrics.values() if isinstance(metric, Gauge)}
+        samples = defaultdict(float)
+
+        directory = getattr(settings, 'METRICS_DIRECTORY', None)
+        if directory:
+            for path in glob.glob(os.path.join(directory, FILENAME_TEMPLATE.format(pid='*'))):
+                pid = int(os.path.basename(path)[len('metrics_'):-len('.db')])
+                running = _is_running(pid)
+                for key, value in read_values_file(path):
+                    sample = _decode_key(key)
+                    if running or sample[0] not in gauge_names:
+                        samples[sample] += value
+        else:
+            with self._lock:
+                for key, value in self._get_values().items():
+                    samples[_decode_key(key)] += value
+
+        return samples
+
+
+REGISTRY = Registry()
+
+
+class Metric(object):
+    """Base class for metrics.
+
+    Arguments:
+        name (str): Name of the metric.
+        documentation (str): Description of the metric.
+        labelnames (tuple): Names of the labels whose values must be provided for each sample.
+        registry (Registry): Registry in which to record samples. Defaults to the project's registry.
+    """
+    TYPE = None
+
+    def __init__(self, name, documentation, labelnames=(), registry=REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.registry = registry
+        registry.register(self)
+
+    def _key(self, labels, suffix='', **extra_labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                u"Metric [{name}] requires labels [{expected}], not [{actual}].".format(
+                    name=self.name, expected=u', '.join(self.labelnames), actual=u', '.join(labels)
+                )
+            )
+
+        labels = {name: unicode(value) for name, value in labels.items()}
+        labels.update(extra_labels)
+        return _encode_key(self.name + suffix, labels)
+
+    def render(self, samples):
+        """Return the lines exposing this metric's samples in the Prometheus text format."""
+        lines = [
+            u'# HELP {name} {documentation}'.format(name=self.name, documentation=self.documentation),
+            u'# TYPE {name} {type}'.format(name=self.name, type=self.TYPE),
+        ]
+        for (sample_name, labels), value in sorted(samples.items()):
+            if sample_name == self.name:
+                lines.append(_format_sample(sample_name, labels, value))
+        return lines
+
+
+class Counter(Metric):
+    """A value which only increases, such as the number of checkouts performed."""
+    TYPE = 'counter'
+
+    def inc(self, amount=1, **labels):
+        if amount < 0:
+            raise ValueError(u"Counters can only be incremented by non-negative amounts.")
+        self.registry.update(self._key(labels), lambda value: value + amount)
+
+
+class Gauge(Metric):
+    """A value which may increase or decrease, such as the depth of a queue."""
+    TYPE = 'gauge'
+
+    def set(self, value, **labels):
+        self.registry.update(self._key(labels), lambda __: value)
+
+    def inc(self, amount=1, **labels):
+        self.registry.update(self._key(labels), lambda value: value + amount)
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    """A distribution of observed values, such as durations, counted in fixed buckets.
+
+    Arguments:
+        buckets (tuple): Upper bounds of the buckets, in ascending order.
+    """
+    TYPE = 'histogram'
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, name, documentation, labelnames=(), registry=REGISTRY, buckets=DEFAULT_BUCKETS):
+        super(Histogram, self).__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(buckets) + (float('inf'),)
+
+    def observe(self, value, **labels):
+        # Each observation is counted in the first bucket containing it. Buckets are made
+        # cumulative when rendered.
+        bucket = next(bound for bound in self.buckets if value <= bound)
+        self.registry.update(self._key(labels, '_bucket', le=_format_bound(bucket)), lambda count: count + 1)
+        self.registry.update(self._key(labels, '_sum'), lambda total: total + value)
+        self.registry.update(self._key(labels, '_count'), lambda count: count + 1)
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the number of seconds spent within the block."""
+        started = time.time()
+        try:
+            yield
+        finally:
+            self.observe(time.time() - started, **labels)
+
+    def render(self, samples):
+        lines = [
+            u'# HELP {name} {documentation}'.format(name=self.name, documentation=self.documentation),
+            u'# TYPE {name} {type}'.format(name=self.name, type=self.TYPE),
+        ]
+
+        # Group bucket counts by the labels of the observations.
+        buckets = defaultdict(dict)
+        for (sample_name, labels), value in samples.items():
+            if sample_name == self.name + '_bucket':
+                labels = dict(labels)
+                le = labels.pop('le')
+                buckets[tuple(sorted(labels.items()))][le] = value
+
+        for labels in sorted(buckets):
+            cumulative = 0.0
+            for bound in self.buckets:
+                le = _format_bound(bound)
+                cumulative += buckets[labels].get(le, 0.0)
+                lines.append(_format_sample(self.name + '_bucket', labels + (('le', le),), cumulative))
+            for suffix in ('_sum', '_count'):
+                lines.append(_format_sample(self.name + suffix, labels, samples.get((self.name + suffix, labels), 0.0)))
+
+        return lines
+
+
+def _format_bound(bound):
+    return '+Inf' if bound == float('inf') else repr(float(bound))
+
+
+def _escape(value):
+    return value.replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _format_sample(sample_name, labels, value):
+    if labels:
+        sample_name += u'{{{}}}'.format(u','.join(u'{}="{}"'.format(name, _escape(v)) for name, v in labels))
+    return u'{} {}'.format(sample_name, repr(float(value)))
+
+
+def generate_latest(registry=REGISTRY):
+    """Render all metrics in the given registry in the Prometheus text format.
+
+    Returns:
+        unicode
+    """
+    samples = registry.collect()
+    lines = []
+    for metric in registry.get_metrics():
+        lines.extend(metric.render(samples))
+    return u'\n'.join(lines) + u'\n'
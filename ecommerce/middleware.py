@@ -0,0 +1,168 @@
+"""Middleware used across the project."""
+import json
+import logging
+import re
+import time
+import uuid
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from ecommerce import outbound, profiling, querylog, routers, timing
+
+
+logger = logging.getLogger(__name__)
+
+
+class ReadReplicaMiddleware(object):
+    """Stick users to the primary database for a short time after they make requests which may write.
+
+    Reads routed to the read replica may otherwise fail to reflect what a user has just written.
+    Routing state left active by an earlier request handled by the same thread is also discarded.
+    """
+
+    def process_request(self, request):  # pylint: disable=unused-argument
+        routers.reset()
+
+    def process_response(self, request, response):
+        if routers.get_replica_alias() is None or request.method in routers.SAFE_METHODS:
+            return response
+
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated():
+            routers.stick_to_primary(user)
+
+        return response
+
+
+class ServerTimingMiddleware(object):
+    """Break down the wall time spent handling each request into database queries, outbound HTTP calls,
+    fulfillment, payment signing and rendering.
+
+    The breakdown is logged, and returned in a Server-Timing header if SERVER_TIMING_HEADER_ENABLED
+    is True. This middleware should be listed first, so that the time spent by other middleware is
+    included in the total.
+    """
+
+    def __init__(self):
+        timing.install()
+
+    def process_request(self, request):  # pylint: disable=unused-argument
+        timing.start()
+
+    def process_template_response(self, request, response):  # pylint: disable=unused-argument
+        # Template responses, including those of DRF views, are rendered after this method returns.
+        timings = timing.get_current()
+        if timings is not None:
+            started = time.time()
+            response.add_post_render_callback(lambda __: timings.add(timing.RENDER, time.time() - started))
+
+        return response
+
+    def process_response(self, request, response):
+        timings = timing.stop()
+        if timings is None:
+            return response
+
+        if getattr(settings, 'SERVER_TIMING_HEADER_ENABLED', True):
+            response['Server-Timing'] = timings.as_header()
+
+        resolver_match = getattr(request, 'resolver_match', None)
+        record = dict(
+            timings.as_dict(),
+            method=request.method,
+            path=request.path,
+            view=resolver_match.view_name if resolver_match else None,
+            status=response.status_code,
+            correlation_id=getattr(request, 'correlation_id', None),
+        )
+        logger.info(u"Request timing %s", json.dumps(record, sort_keys=True))
+
+        return response
+
+
+class QueryLogMiddleware(object):
+    """Attribute the queries executed while handling each request to the view handling it, by name,
+    and enforce the view's query budget.
+
+    See `ecommerce.querylog`.
+    """
+
+    def __init__(self):
+        querylog.install()
+
+    def process_request(self, request):  # pylint: disable=unused-argument
+        querylog.set_endpoint(None)
+        querylog.reset_query_count()
+
+    def process_view(self, request, view_func, view_args, view_kwargs):  # pylint: disable=unused-argument
+        resolver_match = getattr(request, 'resolver_match', None)
+        querylog.set_endpoint(resolver_match.view_name if resolver_match else None)
+
+    def process_response(self, request, response):  # pylint: disable=unused-argument
+        endpoint = querylog.get_endpoint()
+        querylog.set_endpoint(None)
+        querylog.check_budget(endpoint, querylog.get_query_count())
+        return response
+
+
+class CorrelationIdMiddleware(object):
+    """Identify each request by a correlation ID, which is propagated to the LMS by calls made while handling it.
+
+    The ID is taken from the CORRELATION_ID_HEADER of the request, if it contains a valid ID, or
+    generated. It is made available as `request.correlation_id` and returned in the same header.
+    See `ecommerce.outbound`.
+    """
+    VALID_ID = re.compile(r'^[\w.-]{1,128}$')
+
+    def process_request(self, request):
+        header = 'HTTP_' + settings.CORRELATION_ID_HEADER.upper().replace('-', '_')
+        correlation_id = request.META.get(header)
+        if not correlation_id or not self.VALID_ID.match(correlation_id):
+            correlation_id = uuid.uuid4().hex
+
+        request.correlation_id = correlation_id
+        outbound.set_correlation_id(correlation_id)
+
+    def process_response(self, request, response):
+        outbound.set_correlation_id(None)
+
+        correlation_id = getattr(request, 'correlation_id', None)
+        if correlation_id:
+            response[settings.CORRELATION_ID_HEADER] = correlation_id
+
+        return response
+
+
+class ProfilingMiddleware(object):
+    """Profile a sample of requests, writing their profiles to PROFILING_DIRECTORY.
+
+    See `ecommerce.profiling`. If PROFILING_DIRECTORY is not set, this middleware is removed
+    from the stack when it is loaded, so that it imposes no overhead.
+    """
+
+    def __init__(self):
+        if not getattr(settings, 'PROFILING_DIRECTORY', None):
+            raise MiddlewareNotUsed
+
+    def process_request(self, request):
+        if profiling.should_profile(request):
+            profiler = profiling.start()
+            if profiler is not None:
+                request.profiler = profiler
+
+    def process_response(self, request, response):
+        profiler = getattr(request, 'profiler', None)
+        if profiler is None:
+            return response
+
+        profiling.stop(profiler)
+        del request.profiler
+
+        resolver_match = getattr(request, 'resolver_match', None)
+        try:
+            profiling.save(profiler, resolver_match.view_name if resolver_match else None)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception(u"Failed to save the profile of request to [%s].", request.path)
+
+        return response
@@ -0,0 +1,157 @@
+"""Client for outbound HTTP calls to the services on which the project depends.
+
+Calls made with `get` and `post` are attributed to a named dependency, such as the
+enrollment API. The latency and outcome of each call, which is the status code of the
+response, 'timeout', 'connection_error' or 'error', are recorded in metrics labeled with
+the dependency.
+
+Calls to the LMS carry the correlation ID of the request being handled, in the header named
+by CORRELATION_ID_HEADER, so that the LMS's logs can be joined with ours. Correlation IDs
+are set by `CorrelationIdMiddleware`.
+
+If OUTBOUND_RECORD_PATH is set, each call and its response are appended to that file, one
+JSON object per line. If OUTBOUND_REPLAY_PATH is set, no calls are made; responses are
+instead read from a file so recorded, so that benchmarks can run without the dependencies.
+Calls for which no response was recorded fail with a ConnectionError.
+"""
+from collections import defaultdict
+import io
+import json
+import threading
+import time
+
+from django.conf import settings
+import requests
+from requests.exceptions import ConnectionError, Timeout
+from requests.structures import CaseInsensitiveDict
+
+from ecommerce import metrics
+
+
+ENROLLMENT = 'enrollment'
+LMS_HEALTH = 'lms_health'
+OAUTH2 = 'oauth2'
+OUTBOX = 'outbox'
+
+# Dependencies served by the LMS, to which correlation IDs are propagated
+LMS_DEPENDENCIES = (ENROLLMENT, LMS_HEALTH, OAUTH2)
+
+TIMEOUT = 'timeout'
+CONNECTION_ERROR = 'connection_error'
+ERROR = 'error'
+
+REQUESTS = metrics.Counter(
+    'ecommerce_outbound_requests_total',
+    'Outbound HTTP calls, by dependency and outcome: the status code, timeout, connection_error or error.',
+    ('dependency', 'outcome')
+)
+DURATION = metrics.Histogram(
+    'ecommerce_outbound_request_duration_seconds', 'Latency of outbound HTTP calls.', ('dependency',)
+)
+
+_state = threading.local()
+_record_lock = threading.Lock()
+_replay_lock = threading.Lock()
+_replays = {}
+
+
+def set_correlation_id(correlation_id):
+    """Attach the given correlation ID to calls subsequently made by the current thread."""
+    _state.correlation_id = correlation_id
+
+
+def get_correlation_id():
+    return getattr(_state, 'correlation_id', None)
+
+
+def get(dependency, url, **kwargs):
+    """Make a GET request to a dependency. Accepts the same keyword arguments as `requests.get`.
+
+    Returns:
+        requests.Response
+    """
+    return _call(dependency, 'GET', requests.get, url, **kwargs)
+
+
+def post(dependency, url, data=None, **kwargs):
+    """Make a POST request to a dependency. Accepts the same keyword arguments as `requests.post`.
+
+    Returns:
+        requests.Response
+    """
+    return _call(dependency, 'POST', requests.post, url, data=data, **kwargs)
+
+
+def _call(dependency, method, send, url, **kwargs):
+    correlation_id = get_correlation_id()
+    if correlation_id and dependency in LMS_DEPENDENCIES:
+        kwargs['headers'] = dict(kwargs.get('headers') or {}, **{settings.CORRELATION_ID_HEADER: correlation_id})
+
+    replay_path = getattr(settings, 'OUTBOUND_REPLAY_PATH', None)
+    started = time.time()
+    outcome = ERROR
+    try:
+        if replay_path:
+            response = _replay(replay_path, dependency, method, url)
+        else:
+            response = send(url, **kwargs)
+        outcome = unicode(response.status_code)
+    except Timeout:
+        outcome = TIMEOUT
+        raise
+    except ConnectionError:
+        outcome = CONNECTION_ERROR
+        raise
+    finally:
+        duration = time.time() - started
+        DURATION.observe(duration, dependency=dependency)
+        REQUESTS.inc(dependency=dependency, outcome=outcome)
+
+    record_path = getattr(settings, 'OUTBOUND_RECORD_PATH', None)
+    if record_path:
+        _record(record_path, dependency, method, url, response, duration)
+
+    return response
+
+
+def _record(path, dependency, method, url, response, duration):
+    entry = {
+        'dependency': dependency,
+        'method': method,
+        'url': url,
+        'status_code': response.status_code,
+        'headers': {'Content-Type': response.headers.get('Content-Type', '')},
+        'content': response.content.decode(response.encoding or 'utf-8', 'replace'),
+        'duration': duration,
+    }
+    line = json.dumps(entry, sort_keys=True) + u'\n'
+    with _record_lock:
+        with io.open(path, 'a', encoding='utf-8') as f:
+            f.write(line)
+
+
+def _replay(path, dependency, method, url):
+    """Return a response recorded for the given call. Responses recorded for the same call are returned in turn."""
+    with _replay_lock:
+        if path not in _replays:
+            entries = defaultdict(list)
+            with io.open(path, encoding='utf-8') as f:
+                for line in f:
+                    entry = json.loads(line)
+                    entries[(entry['dependency'], entry['method'], entry['url'])].append(entry)
+            _replays[path] = {key: [0, recorded] for key, recorded in entries.items()}
+
+        replay = _replays[path].get((dependency, method, url))
+        if replay is None:
+            raise ConnectionError(u"No response to [{} {}] was recorded in [{}].".format(method, url, path))
+
+        entry = replay[1][replay[0] % len(replay[1])]
+        replay[0] += 1
+
+    response = requests.Response()
+    response.status_code = entry['status_code']
+    response.headers = CaseInsensitiveDict(entry['headers'])
+    response._content = entry['content'].encode('utf-8')  # pylint: disable=protected-access
+    response.encoding = 'utf-8'
+    response.url = url
+    return response
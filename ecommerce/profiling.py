@@ -0,0 +1,143 @@
+"""Sampled profiling of requests in production.
+
+`ProfilingMiddleware` profiles a request with cProfile if any of the following holds:
+
+- a random sample of PROFILING_SAMPLE_RATE of requests includes it;
+- the waffle flag named by PROFILING_WAFFLE_FLAG is active for it;
+- it carries the header named by PROFILING_HEADER, with the value PROFILING_HEADER_TOKEN;
+- it is made by a user whose username is listed in PROFILING_USERNAMES.
+
+Profiles are written to PROFILING_DIRECTORY, which holds at most PROFILING_MAX_FILES of them;
+the oldest are deleted as new ones are written. They are read by the aggregate_profiles
+management command. If PROFILING_DIRECTORY is not set, the middleware is disabled entirely.
+
+A profiler records everything run by the thread in which it's enabled, so only one request is
+profiled at a time in each process; requests which begin while another is being profiled are
+not sampled. Under gevent workers, the greenlets serving other requests run in the same thread,
+so the time they spend while a request is profiled is included in its profile. Such profiles
+describe the process, rather than the request alone.
+"""
+import cProfile
+import errno
+import glob
+import logging
+import os
+import random
+import re
+import threading
+import time
+
+from django.conf import settings
+import waffle
+
+
+logger = logging.getLogger(__name__)
+
+FILENAME_TEMPLATE = '{timestamp}_{pid}_{endpoint}.prof'
+UNKNOWN_ENDPOINT = 'unknown'
+
+_UNSAFE_CHARACTERS = re.compile(r'[^\w.:-]')
+
+# Held while a request is being profiled. Under gevent, `threading` is monkey-patched, so
+# this also excludes other greenlets.
+_active = threading.Lock()
+
+
+def should_profile(request):
+    """Return True if the given request should be profiled.
+
+    Checks are ordered by cost, so that unsampled requests are rejected cheaply. Requests
+    are never profiled while another request is being profiled.
+    """
+    if _active.locked():
+        return False
+
+    sample_rate = getattr(settings, 'PROFILING_SAMPLE_RATE', 0)
+    if sample_rate and random.random() < sample_rate:
+        return True
+
+    header = getattr(settings, 'PROFILING_HEADER', None)
+    token = getattr(settings, 'PROFILING_HEADER_TOKEN', None)
+    if header and token and request.META.get('HTTP_' + header.upper().replace('-', '_')) == token:
+        return True
+
+    usernames = getattr(settings, 'PROFILING_USERNAMES', ())
+    user = getattr(request, 'user', None)
+    if usernames and user is not None and user.is_authenticated() and user.username in usernames:
+        return True
+
+    flag = getattr(settings, 'PROFILING_WAFFLE_FLAG', None)
+    return bool(flag) and waffle.flag_is_active(request, flag)
+
+
+def start():
+    """Enable a new profiler, unless another request is being profiled.
+
+    Returns:
+        cProfile.Profile: Enabled profiler, to be passed to `stop`, or None if another profile is running.
+    """
+    if not _active.acquire(False):
+        return None
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+def stop(profiler):
+    """Disable a profiler returned by `start`, allowing other requests to be profiled."""
+    profiler.disable()
+    _active.release()
+
+
+def save(profiler, endpoint):
+    """Write a profile to PROFILING_DIRECTORY, deleting the oldest profiles beyond PROFILING_MAX_FILES.
+
+    Arguments:
+        profiler (cProfile.Profile): Disabled profiler.
+        endpoint (unicode): Name of the view which handled the profiled request, if known.
+
+    Returns:
+        str: Path of the profile.
+    """
+    directory = settings.PROFILING_DIRECTORY
+    filename = FILENAME_TEMPLATE.format(
+        timestamp='{:.6f}'.format(time.time()),
+        pid=os.getpid(),
+        endpoint=_UNSAFE_CHARACTERS.sub('-', endpoint or UNKNOWN_ENDPOINT),
+    )
+    path = os.path.join(directory, filename)
+    profiler.dump_stats(path)
+
+    for stale in list_profiles()[:-settings.PROFILING_MAX_FILES]:
+        try:
+            os.remove(stale)
+        except OSError as error:
+            # Another process may have deleted the profile first.
+            if error.errno != errno.ENOENT:
+                raise
+
+    return path
+
+
+def list_profiles(endpoint=None):
+    """Return the paths of the profiles in PROFILING_DIRECTORY, oldest first.
+
+    Arguments:
+        endpoint (unicode): If given, only profiles of requests handled by this view are returned.
+
+    Returns:
+        list of str
+    """
+    paths = glob.glob(os.path.join(settings.PROFILING_DIRECTORY, FILENAME_TEMPLATE.format(
+        timestamp='*', pid='*', endpoint='*'
+    )))
+    if endpoint is not None:
+        filename_endpoint = _UNSAFE_CHARACTERS.sub('-', endpoint)
+        paths = [path for path in paths if _parse_endpoint(path) == filename_endpoint]
+
+    return sorted(paths, key=os.path.basename)
+
+
+def _parse_endpoint(path):
+    return os.path.splitext(os.path.basename(path))[0].split('_', 2)[2]
@@ -0,0 +1,270 @@
+"""Aggregation of database query statistics by SQL fingerprint and endpoint, and logging of slow queries.
+
+Once `install` has been called, every query executed is reduced to a fingerprint, with
+literals replaced by placeholders and repeated placeholders collapsed, so that queries
+differing only in their parameters are aggregated together. The number of executions and
+the total and maximum durations of each fingerprint are recorded per endpoint, which is
+the name of the view handling the current request, as set by `QueryLogMiddleware`.
+
+Statistics are recorded in a memory-mapped file per process, in SQL_STATS_DIRECTORY, and
+read by the dump_query_stats management command. If SQL_STATS_DIRECTORY is not set, only
+slow queries are logged. Queries taking longer than SLOW_QUERY_THRESHOLD_SECONDS are logged
+with the endpoint and a summary of the project code which executed them.
+
+The number of queries executed by each request is compared to the endpoint's budget, from
+the QUERY_BUDGETS setting. Exceeding a budget is logged, or raises `QueryBudgetExceeded` if
+QUERY_BUDGET_ENFORCEMENT is 'raise', as it is in tests. Savepoint statements are not counted,
+since the number executed depends on whether the request is handled within a transaction.
+"""
+from functools import wraps
+import glob
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import traceback
+
+from django.conf import settings
+from django.db.backends import utils
+
+from ecommerce import metrics
+from ecommerce.metrics import MmapValues, read_values_file
+
+
+logger = logging.getLogger(__name__)
+
+FILENAME_TEMPLATE = 'sql_stats_{pid}.db'
+NO_ENDPOINT = u'-'
+STATS = ('count', 'total', 'max')
+# Maximum number of statements whose fingerprints are cached
+FINGERPRINT_CACHE_SIZE = 1000
+# Number of frames of project code included in the stack summaries of slow queries
+STACK_SUMMARY_DEPTH = 5
+# Modules whose frames are omitted from stack summaries, since they wrap every query
+INSTRUMENTATION_MODULES = ('ecommerce/querylog', 'ecommerce/timing')
+
+_FINGERPRINT_PATTERNS = (
+    # String literals
+    (re.compile(r"'(?:[^'\\]|\\.|'')*'"), '?'),
+    # Numeric literals, which aren't part of identifiers
+    (re.compile(r'(?<![\w".])-?\d+(?:\.\d+)?\b'), '?'),
+    # Placeholders
+    (re.compile(r'%s'), '?'),
+    # Lists of placeholders, such as those of IN clauses
+    (re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)'), '(...)'),
+    # Rows inserted by bulk inserts
+    (re.compile(r'\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+'), '(...)'),
+    # Savepoint names
+    (re.compile(r'"s\d+_x\d+"'), '?'),
+    (re.compile(r'\s+'), ' '),
+)
+
+_SAVEPOINT_PREFIXES = ('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT')
+
+BUDGETS_EXCEEDED = metrics.Counter(
+    'ecommerce_query_budgets_exceeded_total', 'Requests which exceeded the query budgets of their endpoints.',
+    ('endpoint',)
+)
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised when a request executes more queries than its endpoint's budget allows."""
+    pass
+
+
+_state = threading.local()
+_lock = threading.Lock()
+_install_lock = threading.Lock()
+_fingerprints = {}
+_store = {}
+
+
+def fingerprint(sql):
+    """Return the fingerprint of a SQL statement, with literals and placeholders replaced by '?'.
+
+    Arguments:
+        sql (unicode): Statement, possibly containing placeholders.
+
+    Returns:
+        unicode
+    """
+    result = _fingerprints.get(sql)
+    if result is None:
+        result = sql
+        for pattern, replacement in _FINGERPRINT_PATTERNS:
+            result = pattern.sub(replacement, result)
+        result = result.strip()
+
+        if len(_fingerprints) >= FINGERPRINT_CACHE_SIZE:
+            _fingerprints.clear()
+        _fingerprints[sql] = result
+
+    return result
+
+
+def set_endpoint(endpoint):
+    """Attribute queries subsequently executed by the current thread to the given endpoint."""
+    _state.endpoint = endpoint
+
+
+def get_endpoint():
+    return getattr(_state, 'endpoint', None) or NO_ENDPOINT
+
+
+def reset_query_count():
+    """Begin counting the queries executed by the current thread from zero."""
+    _state.query_count = 0
+
+
+def get_query_count():
+    """Return the number of queries, other than savepoint statements, executed by the current thread since the count
+    was last reset."""
+    return getattr(_state, 'query_count', 0)
+
+
+def check_budget(endpoint, count):
+    """Compare the number of queries executed by a request to its endpoint's budget.
+
+    Arguments:
+        endpoint (unicode): Name of the view which handled the request.
+        count (int): Number of queries executed.
+
+    Raises:
+        QueryBudgetExceeded: If the budget was exceeded and QUERY_BUDGET_ENFORCEMENT is 'raise'.
+    """
+    budget = getattr(settings, 'QUERY_BUDGETS', {}).get(endpoint)
+    if budget is None or count <= budget:
+        return
+
+    BUDGETS_EXCEEDED.inc(endpoint=endpoint)
+    message = u"Endpoint [{endpoint}] executed [{count}] queries, exceeding its budget of [{budget}].".format(
+        endpoint=endpoint, count=count, budget=budget
+    )
+    if getattr(settings, 'QUERY_BUDGET_ENFORCEMENT', 'log') == 'raise':
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+def _key(*parts):
+    return json.dumps(parts)
+
+
+def _get_store():
+    """Return the current process's statistics file, or None if SQL_STATS_DIRECTORY is not set."""
+    directory = getattr(settings, 'SQL_STATS_DIRECTORY', None)
+    if not directory:
+        return None
+
+    # Servers which fork workers after loading the project must not share the file opened by the parent.
+    owner = (os.getpid(), directory)
+    if _store.get('owner') != owner:
+        _store['values'] = MmapValues(os.path.join(directory, FILENAME_TEMPLATE.format(pid=owner[0])))
+        _store['owner'] = owner
+    return _store['values']
+
+
+def record(sql, duration):
+    """Record the execution of a statement, logging it if it was slow.
+
+    Arguments:
+        sql (unicode): Statement executed.
+        duration (float): Number of seconds taken to execute the statement.
+    """
+    endpoint = get_endpoint()
+    statement = fingerprint(sql)
+    if not statement.startswith(_SAVEPOINT_PREFIXES):
+        _state.query_count = get_query_count() + 1
+
+    with _lock:
+        values = _get_store()
+        if values is not None:
+            digest = hashlib.md5(statement.encode('utf-8')).hexdigest()
+            text_key = _key('sql', digest, statement)
+            if values.get(text_key) == 0:
+                values.set(text_key, 1)
+
+            count_key, total_key, max_key = [_key(stat, endpoint, digest) for stat in STATS]
+            values.set(count_key, values.get(count_key) + 1)
+            values.set(total_key, values.get(total_key) + duration)
+            values.set(max_key, max(values.get(max_key), duration))
+
+    threshold = getattr(settings, 'SLOW_QUERY_THRESHOLD_SECONDS', None)
+    if threshold is not None and duration >= threshold:
+        logger.warning(
+            u"Slow query took [%.3f] seconds at endpoint [%s]: [%s]. Executed by: %s",
+            duration, endpoint, statement, summarize_stack()
+        )
+
+
+def summarize_stack():
+    """Return a one-line summary of the innermost frames of project code on the current thread's stack."""
+    frames = [
+        frame for frame in traceback.extract_stack()[:-1]
+        if '/ecommerce/' in frame[0] and not os.path.splitext(frame[0])[0].endswith(INSTRUMENTATION_MODULES)
+    ]
+    return u' <- '.join(
+        u'{path}:{line} in {function}'.format(path=path, line=line, function=function)
+        for path, line, function, __ in reversed(frames[-STACK_SUMMARY_DEPTH:])
+    )
+
+
+def collect():
+    """Return the statistics recorded by all processes, aggregated by endpoint and fingerprint.
+
+    Returns:
+        list: Dicts with the keys endpoint, fingerprint, count, total and max, sorted by
+            descending total duration.
+    """
+    directory = getattr(settings, 'SQL_STATS_DIRECTORY', None)
+    if not directory:
+        return []
+
+    statements = {}
+    stats = {}
+
+    for path in glob.glob(os.path.join(directory, FILENAME_TEMPLATE.format(pid='*'))):
+        for key, value in read_values_file(path):
+            parts = json.loads(key)
+            if parts[0] == 'sql':
+                statements[parts[1]] = parts[2]
+                continue
+
+            stat, endpoint, digest = parts
+            aggregate = stats.setdefault((endpoint, digest), dict.fromkeys(STATS, 0))
+            aggregate[stat] = max(aggregate[stat], value) if stat == 'max' else aggregate[stat] + value
+
+    rows = [
+        dict(aggregate, endpoint=endpoint, fingerprint=statements.get(digest, digest), count=int(aggregate['count']))
+        for (endpoint, digest), aggregate in stats.items()
+    ]
+    return sorted(rows, key=lambda row: row['total'], reverse=True)
+
+
+def _logged(execute):
+    @wraps(execute)
+    def wrapper(self, sql, *args, **kwargs):
+        started = time.time()
+        try:
+            return execute(self, sql, *args, **kwargs)
+        finally:
+            record(sql, time.time() - started)
+
+    return wrapper
+
+
+def install():
+    """Record statistics about all queries executed. Safe to call more than once.
+
+    Django 1.7 provides no hook around query execution, so the methods through which all
+    queries pass are wrapped.
+    """
+    with _install_lock:
+        if getattr(utils.CursorWrapper, '_query_logged', False):
+            return
+
+        utils.CursorWrapper.execute = _logged(utils.CursorWrapper.execute)
+        utils.CursorWrapper.executemany = _logged(utils.CursorWrapper.executemany)
+        utils.CursorWrapper._query_logged = True  # pylint: disable=protected-access
@@ -0,0 +1,130 @@
+"""Database routing, including the routing of safe reads to a read replica.
+
+Reads are sent to the database alias named by the READ_REPLICA_ALIAS setting only while
+routing to the replica is active, which views opt into (e.g., by using `use_read_replica`).
+Writes always go to the primary database. Once anything is written while routing to the
+replica is active, subsequent reads go to the primary, since the replica may not yet have
+received the write.
+
+Replicas lag behind the primary, so users who have just written something could read stale
+data from the replica. `ReadReplicaMiddleware` sticks users to the primary for
+READ_REPLICA_STICKY_SECONDS after any request made with an unsafe HTTP method.
+"""
+from contextlib import contextmanager
+from functools import wraps
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+STICKY_CACHE_KEY = u'read_replica.sticky.{user_id}'
+
+_state = threading.local()
+
+
+def get_replica_alias():
+    """Return the alias of the read replica, or None if no replica is configured."""
+    return getattr(settings, 'READ_REPLICA_ALIAS', None)
+
+
+def stick_to_primary(user):
+    """Route the given user's reads to the primary for the next READ_REPLICA_STICKY_SECONDS.
+
+    Arguments:
+        user (User): User who has written to the primary.
+    """
+    timeout = getattr(settings, 'READ_REPLICA_STICKY_SECONDS', 5)
+    cache.set(STICKY_CACHE_KEY.format(user_id=user.id), True, timeout)
+
+
+def is_stuck_to_primary(user):
+    """Return True if the given user's reads must be routed to the primary."""
+    return user.is_authenticated() and bool(cache.get(STICKY_CACHE_KEY.format(user_id=user.id)))
+
+
+def activate(user=None):
+    """Begin routing reads to the read replica, if one is configured.
+
+    Reads are not routed to the replica if the given user is stuck to the primary.
+
+    Arguments:
+        user (User): User on whose behalf reads are made. May be None for reads not made
+            on behalf of a particular user.
+
+    Returns:
+        tuple: The previous routing state, which should be passed to `restore` once
+            routing to the replica should end.
+    """
+    previous = (getattr(_state, 'alias', None), getattr(_state, 'wrote', False))
+
+    alias = get_replica_alias()
+    if alias is not None and not (user is not None and is_stuck_to_primary(user)):
+        _state.alias = alias
+        _state.wrote = False
+
+    return previous
+
+
+def restore(previous):
+    """Restore the routing state returned by `activate`."""
+    _state.alias, _state.wrote = previous
+
+
+def reset():
+    """Route all reads to the primary, discarding any routing state left active in this thread."""
+    restore((None, False))
+
+
+@contextmanager
+def read_replica(user=None):
+    """Route reads made within the block to the read replica, if one is configured.
+
+    Arguments:
+        user (User): User on whose behalf reads are made. Reads go to the primary if the user
+            is stuck to the primary.
+    """
+    previous = activate(user)
+    try:
+        yield
+    finally:
+        restore(previous)
+
+
+def use_read_replica(view):
+    """Decorator which routes reads made by safe requests to the given view to the read replica."""
+    @wraps(view)
+    def wrapped_view(request, *args, **kwargs):
+        if request.method not in SAFE_METHODS:
+            return view(request, *args, **kwargs)
+
+        with read_replica(request.user):
+            return view(request, *args, **kwargs)
+
+    return wrapped_view
+
+
+class ReadReplicaRouter(object):
+    """Route reads to the read replica while routing to it is active; route everything else to the primary."""
+
+    def db_for_read(self, model, **hints):  # pylint: disable=unused-argument
+        alias = getattr(_state, 'alias', None)
+        if alias is not None and not getattr(_state, 'wrote', False):
+            return alias
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):  # pylint: disable=unused-argument
+        _state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):  # pylint: disable=unused-argument
+        # The replica holds the same data as the primary.
+        return True
+
+    def allow_migrate(self, db, model):  # pylint: disable=unused-argument
+        # The replica receives its schema from the primary.
+        if db == get_replica_alias():
+            return False
+        return None
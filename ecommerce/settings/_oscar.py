@@ -19,6 +19,7 @@ OSCAR_HOMEPAGE = reverse_lazy('dashboard:index')
 OSCAR_APPS = [
     'ecommerce.extensions.api',
     'ecommerce.extensions.fulfillment',
+    'ecommerce.extensions.outbox',
 ] + get_core_apps([
     'ecommerce.extensions.analytics',
     'ecommerce.extensions.catalogue',
@@ -86,6 +87,24 @@ OSCAR_DEFAULT_CURRENCY = 'USD'
 # END ORDER PROCESSING
 
 
+# ORDER EVENT OUTBOX
+# Sinks to which the relay_outbox_events command publishes order lifecycle events. Events are deleted once
+# they have been delivered to every sink listed, so sinks added later do not receive earlier events.
+OUTBOX_SINKS = ()
+
+# Configuration for each sink, keyed by sink name. For example:
+# OUTBOX_SINK_CONFIG = {
+#     'file': {'path': '/var/log/ecommerce/order_events.log'},
+#     'http': {'url': 'https://events.example.com/orders/', 'timeout': 5, 'headers': {}},
+# }
+OUTBOX_SINK_CONFIG = {}
+
+# Number of seconds for which a relay leases a sink. Publishing a batch of events to a sink should
+# take much less time than this, or the batch may be published again by another relay.
+OUTBOX_RELAY_LEASE_SECONDS = 60
+# END ORDER EVENT OUTBOX
+
+
 # PAYMENT PROCESSING
 PAYMENT_PROCESSORS = (
     'ecommerce.extensions.payment.processors.SingleSeatCybersource',
@@ -112,4 +131,9 @@ PAYMENT_PROCESSOR_CONFIG = {
 # such as the receiver responsible for tallying product orders, make row-locking
 # queries which significantly degrade performance at scale.
 INSTALL_DEFAULT_ANALYTICS_RECEIVERS = False
+
+# When Oscar's receivers are not installed, record raw analytics events instead. These
+# are periodically folded into product and user records by the rollup_analytics_events
+# management command, without locking records on the checkout path.
+RECORD_ANALYTICS_EVENTS = True
 # END ANALYTICS
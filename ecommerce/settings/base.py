@@ -59,6 +59,16 @@ DATABASES = {
         'ATOMIC_REQUESTS': True,
     }
 }
+
+# See: https://docs.djangoproject.com/en/dev/topics/db/multi-db/#automatic-database-routing
+DATABASE_ROUTERS = ['ecommerce.routers.ReadReplicaRouter']
+
+# Alias of a database replicating the default database, to which safe reads made by some views
+# are routed. `None` routes all reads to the default database.
+READ_REPLICA_ALIAS = None
+
+# Seconds for which a user's reads are routed to the default database after a request which may write
+READ_REPLICA_STICKY_SECONDS = 5
 # END DATABASE CONFIGURATION
 
 
@@ -182,18 +192,34 @@ ALLOWED_INCLUDE_ROOTS = (
 # MIDDLEWARE CONFIGURATION
 # See: https://docs.djangoproject.com/en/dev/ref/settings/#middleware-classes
 MIDDLEWARE_CLASSES = (
+    # Listed first, so that the time spent by other middleware is included in requests' timings.
+    'ecommerce.middleware.ServerTimingMiddleware',
+    'ecommerce.middleware.QueryLogMiddleware',
+    'ecommerce.middleware.CorrelationIdMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.locale.LocaleMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # Listed after authentication, so that requests can be profiled by user.
+    'ecommerce.middleware.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'waffle.middleware.WaffleMiddleware',
     'oscar.apps.basket.middleware.BasketMiddleware',
     'django.contrib.flatpages.middleware.FlatpageFallbackMiddleware',
     'social.apps.django_app.middleware.SocialAuthExceptionMiddleware',
+    'ecommerce.middleware.ReadReplicaMiddleware',
 )
+
+# Whether to return the breakdown of the time spent handling each request, which is always
+# logged, to clients in a Server-Timing header.
+SERVER_TIMING_HEADER_ENABLED = True
+
+# Header carrying the ID by which a request, and the calls made to the LMS while handling it,
+# are correlated. IDs received in this header are reused; otherwise, one is generated. The ID
+# is returned to clients in the same header.
+CORRELATION_ID_HEADER = 'X-Request-ID'
 # END MIDDLEWARE CONFIGURATION
 
 
@@ -221,6 +247,17 @@ OAUTH2_PROVIDER_URL = None
 # END URL CONFIGURATION
 
 
+# OUTBOUND HTTP CALLS
+# File to which outbound calls and their responses are appended, one JSON object per line. If
+# None, calls are not recorded.
+OUTBOUND_RECORD_PATH = None
+
+# File, written as OUTBOUND_RECORD_PATH is, from which responses to outbound calls are read,
+# instead of making the calls. For running benchmarks offline. If None, calls are made.
+OUTBOUND_REPLAY_PATH = None
+# END OUTBOUND HTTP CALLS
+
+
 # APP CONFIGURATION
 DJANGO_APPS = [
     # Default Django apps
@@ -238,8 +275,9 @@ DJANGO_APPS = [
     # Django REST framework
     'rest_framework',
 
-    # Admin panel and documentation
-    'django.contrib.admin',
+    # Admin panel and documentation. The admin site isn't routed (see urls.py), so every app's
+    # admin module (e.g., those of haystack and social auth) isn't imported as workers boot.
+    'django.contrib.admin.apps.SimpleAdminConfig',
 
     # Feature gating
     'waffle',
@@ -377,6 +415,14 @@ EXTRA_SCOPE = ['permissions']
 # Specify a key to emit events to the corresponding Segment project. `None` disables tracking.
 # See: https://segment.com/docs/libraries/python/
 SEGMENT_KEY = None
+
+# Events are sent to Segment from a background thread. Events emitted while this many are
+# awaiting sending are dropped, so that a slow Segment never delays requests.
+SEGMENT_MAX_QUEUE_SIZE = 10000
+# Maximum number of events sent to Segment by a single request
+SEGMENT_BATCH_SIZE = 100
+# Number of seconds for which a process exiting waits for its queued events to be sent
+SEGMENT_SHUTDOWN_TIMEOUT = 5
 # END ANALYTICS
 
 
@@ -390,7 +436,7 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_THROTTLE_CLASSES': (
-        'rest_framework.throttling.UserRateThrottle',
+        'ecommerce.extensions.api.throttles.UserRateThrottle',
     ),
     'DEFAULT_THROTTLE_RATES': {
         'user': '40/minute',
@@ -398,5 +444,103 @@ REST_FRAMEWORK = {
 }
 # END DJANGO REST FRAMEWORK
 
+
+# METRICS
+# Directory in which each process records its metrics, so that metrics can be aggregated across
+# processes (e.g., gunicorn workers). The directory should be emptied whenever the service is
+# deployed. If None, each process exposes only the metrics it has recorded itself.
+METRICS_DIRECTORY = None
+# END METRICS
+
+
+# SQL QUERY LOG
+# Directory in which each process records statistics about the queries it executes, aggregated
+# by SQL fingerprint and endpoint. See the dump_query_stats management command. If None, no
+# statistics are recorded.
+SQL_STATS_DIRECTORY = None
+
+# Queries taking at least this many seconds are logged, with the endpoint and a summary of the
+# code which executed them. If None, no queries are logged.
+SLOW_QUERY_THRESHOLD_SECONDS = 0.5
+# END SQL QUERY LOG
+
+
+# QUERY BUDGETS
+# Maximum number of queries, excluding savepoint statements, which a single request to each
+# endpoint may execute. Endpoints are named by their URL namespaces and names. Endpoints
+# without budgets are unrestricted. Budgets allow a little headroom above the queries executed
+# for an order of a single seat, with Segment tracking installed and Oscar's analytics receivers
+# uninstalled, as measured by ecommerce/extensions/api/tests/test_query_budgets.py.
+# Fulfillment executes queries for each line, so requests which place or fulfill orders of
+# several products may exceed their budgets.
+QUERY_BUDGETS = {
+    'api:v1:orders:create_list': 56,
+    'api:v1:orders:retrieve': 9,
+    'api:v1:orders:fulfill': 27,
+    'api:v2:baskets:create': 52,
+    'api:v2:baskets:retrieve_order': 8,
+    'api:v2:baskets:wait_for_order': 13,
+    'api:v2:orders:list': 8,
+    'api:v2:orders:statuses': 4,
+    'api:v2:orders:retrieve': 8,
+    'api:v2:orders:fulfill': 27,
+    'api:v2:payment:list_processors': 2,
+}
+
+# How requests exceeding their budgets are handled. If 'log', a warning is logged and the
+# ecommerce_query_budgets_exceeded_total metric is incremented. If 'raise', QueryBudgetExceeded
+# is also raised, failing the request; tests use this to catch regressions.
+QUERY_BUDGET_ENFORCEMENT = 'log'
+# END QUERY BUDGETS
+
+
+# PROFILING
+# Directory to which the profiles of sampled requests are written. If None, requests are never
+# profiled, and the profiling middleware is disabled. See the aggregate_profiles command.
+PROFILING_DIRECTORY = None
+
+# Maximum number of profiles kept in PROFILING_DIRECTORY. The oldest are deleted first.
+PROFILING_MAX_FILES = 500
+
+# Fraction, between 0 and 1, of requests which are profiled at random
+PROFILING_SAMPLE_RATE = 0
+
+# Name of a waffle flag. Requests for which the flag is active are profiled.
+PROFILING_WAFFLE_FLAG = None
+
+# Requests carrying this header, with the value PROFILING_HEADER_TOKEN, are profiled. The token
+# must be kept secret, since profiling slows requests down.
+PROFILING_HEADER = 'X-Profile'
+PROFILING_HEADER_TOKEN = None
+
+# Usernames of users whose requests are profiled. Only users authenticated by session, rather
+# than by JWT or OAuth2 tokens, are known when deciding whether to profile a request.
+PROFILING_USERNAMES = ()
+# END PROFILING
+
+
+# IDEMPOTENCY
+# Number of seconds for which responses to requests made with an Idempotency-Key header are
+# stored, and replayed in response to retries of those requests.
+IDEMPOTENCY_KEY_TTL = 24 * 60 * 60
+# END IDEMPOTENCY
+
+
+# REFERENCE DATA
+# Whether rows of lookup models, such as shipping event types and payment source types, are
+# cached in each process. Caches are loaded as workers warm up, and cleared when a row is saved
+# or deleted.
+REFERENCE_DATA_CACHE_ENABLED = True
+# END REFERENCE DATA
+
+
+# WARM-UP
+# Whether workers warm up (see ecommerce/warmup.py) as the WSGI application is loaded, before
+# serving their first requests. Warming up from gunicorn's post_fork hook is recommended instead.
+# Only set this to True if the application isn't preloaded by a process which forks workers,
+# since they would share the database connections it opens.
+WARM_UP_ON_STARTUP = False
+# END WARM-UP
+
 # Resolving deprecation warning
 TEST_RUNNER = 'django.test.runner.DiscoverRunner'
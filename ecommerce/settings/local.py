@@ -49,6 +49,14 @@ CACHES = {
 # END CACHE CONFIGURATION
 
 
+# APP CONFIGURATION
+# Benchmarks are only run during development; see the run_benchmarks management command.
+INSTALLED_APPS += (
+    'ecommerce.benchmarks',
+)
+# END APP CONFIGURATION
+
+
 # TOOLBAR CONFIGURATION
 # See: http://django-debug-toolbar.readthedocs.org/en/latest/installation.html#explicit-setup
 if os.environ.get('ENABLE_DJANGO_TOOLBAR', False):
@@ -39,8 +39,9 @@ ALLOWED_HOSTS = ['*']
 
 CONFIG_FILE = get_env_setting('ECOMMERCE_CFG')
 
+# Parsed with libyaml, if available, which is much faster than the pure-Python parser.
 with open(CONFIG_FILE) as f:
-    config_from_yaml = yaml.load(f)
+    config_from_yaml = yaml.load(f, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
 
 vars().update(config_from_yaml)
 
@@ -8,6 +8,7 @@ from ecommerce.settings.base import *
 # TEST SETTINGS
 INSTALLED_APPS += (
     'django_nose',
+    'ecommerce.benchmarks',
 )
 
 TEST_RUNNER = 'django_nose.NoseTestSuiteRunner'
@@ -37,6 +38,12 @@ class DisableMigrations(object):
 
 if str(os.environ.get('DISABLE_MIGRATIONS')) == 'True':
     MIGRATION_MODULES = DisableMigrations()
+
+# Rows cached by one test would outlive the transaction in which they were created
+REFERENCE_DATA_CACHE_ENABLED = False
+
+# Fail tests whose requests exceed their endpoints' query budgets
+QUERY_BUDGET_ENFORCEMENT = 'raise'
 # END TEST SETTINGS
 
 
@@ -51,6 +58,15 @@ DATABASES = {
         'PORT': '',
         'ATOMIC_REQUESTS': True,
     },
+    # Used to test routing to a read replica. Routing is disabled unless READ_REPLICA_ALIAS is set.
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+        'USER': '',
+        'PASSWORD': '',
+        'HOST': '',
+        'PORT': '',
+    },
 }
 # END IN-MEMORY TEST DATABASE
 
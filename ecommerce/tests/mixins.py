@@ -1,17 +1,22 @@
 # -*- coding: utf-8 -*-
 """Broadly-useful mixins for use in automated tests."""
+from importlib import import_module
 import json
 from decimal import Decimal as D
+from unittest import SkipTest
 
 import jwt
+from django.apps import apps
 from django.conf import settings
 from django.core.cache import cache
+from django.db import connection
 from django.core.urlresolvers import reverse
 from oscar.test import factories
 from oscar.core.loading import get_model
 
 from ecommerce.extensions.api.constants import APIConstants as AC
 from ecommerce.extensions.fulfillment.mixins import FulfillmentMixin
+from ecommerce.extensions.operations import AddIndex
 
 
 Basket = get_model('basket', 'Basket')
@@ -85,7 +90,9 @@ class BasketCreationMixin(object):
         token = jwt.encode(payload, secret)
         return token
 
-    def create_basket(self, skus=None, checkout=None, payment_processor_name=None, auth=True, token=None):
+    def create_basket(
+            self, skus=None, checkout=None, payment_processor_name=None, auth=True, token=None, idempotency_key=None
+    ):
         """Issue a POST request to the basket creation endpoint."""
         request_data = {}
         if skus:
@@ -99,19 +106,25 @@ class BasketCreationMixin(object):
         if payment_processor_name:
             request_data[AC.KEYS.PAYMENT_PROCESSOR_NAME] = payment_processor_name
 
+        headers = {}
+        if idempotency_key:
+            headers['HTTP_IDEMPOTENCY_KEY'] = idempotency_key
+
         if auth:
             token = token or self.generate_token(self.USER_DATA)
             response = self.client.post(
                 self.PATH,
                 data=json.dumps(request_data),
                 content_type='application/json',
-                HTTP_AUTHORIZATION='JWT ' + token
+                HTTP_AUTHORIZATION='JWT ' + token,
+                **headers
             )
         else:
             response = self.client.post(
                 self.PATH,
                 data=json.dumps(request_data),
-                content_type='application/json'
+                content_type='application/json',
+                **headers
             )
 
         return response
@@ -140,3 +153,88 @@ class BasketCreationMixin(object):
         else:
             self.assertIsNone(response.data[AC.KEYS.ORDER])
             self.assertIsNone(response.data[AC.KEYS.PAYMENT_DATA])
+
+
+class QueryPlanMixin(object):
+    """Provides assertions about the query plans chosen by the database, on SQLite and MySQL.
+
+    Test databases are usually created without running migrations, so indexes created by
+    the migration modules named in `index_migrations` are created for the duration of the
+    test case if they don't already exist.
+    """
+    index_migrations = ()
+
+    SUPPORTED_VENDORS = ('sqlite', 'mysql')
+
+    @classmethod
+    def setUpClass(cls):
+        if connection.vendor not in cls.SUPPORTED_VENDORS:
+            raise SkipTest(u"Query plans can't be inspected on {vendor}".format(vendor=connection.vendor))
+
+        super(QueryPlanMixin, cls).setUpClass()
+
+        cls.created_indexes = []
+        with connection.schema_editor() as schema_editor:
+            for module in cls.index_migrations:
+                for operation in import_module(module).Migration.operations:
+                    if not isinstance(operation, AddIndex):
+                        continue
+
+                    model = apps.get_model(operation.app_label, operation.model_name)
+                    if not cls._index_exists(model._meta.db_table, operation.name):  # pylint: disable=protected-access
+                        operation.create(schema_editor, model)
+                        cls.created_indexes.append((operation, model))
+
+    @classmethod
+    def tearDownClass(cls):
+        with connection.schema_editor() as schema_editor:
+            for operation, model in cls.created_indexes:
+                operation.drop(schema_editor, model)
+
+        super(QueryPlanMixin, cls).tearDownClass()
+
+    @classmethod
+    def _index_exists(cls, table, name):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = %s", [name])
+            else:
+                cursor.execute(
+                    'SHOW INDEX FROM {table} WHERE Key_name = %s'.format(table=connection.ops.quote_name(table)),
+                    [name]
+                )
+            return cursor.fetchone() is not None
+
+    def get_used_indexes(self, queryset):
+        """Return the names of the indexes the database plans to use when evaluating the given queryset."""
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+                # The last column of each row describes a step of the plan, such as
+                # "SEARCH TABLE order_order USING INDEX order_order_user_id_date_placed (user_id=?)".
+                details = [row[-1] for row in cursor.fetchall()]
+                return set(
+                    detail.split(' INDEX ', 1)[1].split(' ', 1)[0] for detail in details if ' INDEX ' in detail
+                )
+
+            cursor.execute('EXPLAIN ' + sql, params)
+            key_index = [column[0] for column in cursor.description].index('key')
+            return set(row[key_index] for row in cursor.fetchall() if row[key_index])
+
+    def assert_uses_index(self, queryset, index_name=None):
+        """Verify that the database plans to use the named index, or any index if no name is given,
+        when evaluating the given queryset.
+        """
+        used_indexes = self.get_used_indexes(queryset)
+        if index_name is None:
+            self.assertTrue(used_indexes, u"Expected query to use an index: {sql}".format(sql=queryset.query))
+            return
+
+        self.assertIn(
+            index_name,
+            used_indexes,
+            u"Expected query to use index [{index}], but it uses {used}: {sql}".format(
+                index=index_name, used=sorted(used_indexes), sql=queryset.query
+            )
+        )
@@ -0,0 +1,66 @@
+"""Tests of the measurement of import times."""
+import os
+import shutil
+from StringIO import StringIO
+import sys
+import tempfile
+import traceback
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from ecommerce.importtime import ImportTimer
+
+
+class ImportTimerTests(TestCase):
+    def setUp(self):
+        super(ImportTimerTests, self).setUp()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        sys.path.insert(0, directory)
+        self.addCleanup(sys.path.remove, directory)
+
+        package = os.path.join(directory, 'timed_package')
+        os.mkdir(package)
+        with open(os.path.join(package, '__init__.py'), 'w') as f:
+            f.write('from timed_package import child\n')
+        with open(os.path.join(package, 'child.py'), 'w') as f:
+            f.write('import time\ntime.sleep(0.01)\n')
+
+        for module in ('timed_package', 'timed_package.child'):
+            self.addCleanup(sys.modules.pop, module, None)
+
+    def test_records(self):
+        """Verify that the modules loaded are timed, with and without the modules they import."""
+        with ImportTimer() as timer:
+            import timed_package  # pylint: disable=import-error,unused-variable
+
+        package = timer.records['timed_package']
+        child = timer.records['timed_package.child']
+        self.assertGreaterEqual(child['self'], 0.01)
+        self.assertGreaterEqual(package['cumulative'], child['cumulative'])
+        self.assertLess(package['self'], child['self'])
+        self.assertEqual(timer.slowest('self', limit=1), [child])
+        self.assertNotIn(timer, sys.meta_path)
+
+    def test_missing_module(self):
+        """Verify that failing to find a module raises the same error as when untimed.
+
+        Oscar distinguishes missing modules from modules which fail to import by the length of the traceback.
+        """
+        with ImportTimer():
+            try:
+                __import__('timed_package.missing')
+            except ImportError:
+                self.assertEqual(len(traceback.extract_tb(sys.exc_info()[2])), 1)
+            else:
+                self.fail('ImportError not raised.')
+
+    def test_profile_imports(self):
+        """Verify that the command boots a new interpreter, and prints the slowest imports."""
+        out = StringIO()
+        call_command('profile_imports', limit=5, stdout=out)
+
+        lines = out.getvalue().splitlines()
+        self.assertTrue(lines[0].startswith('Booted in'))
+        self.assertEqual(len(lines), 7)
@@ -0,0 +1,99 @@
+"""Tests of the metrics library."""
+import os
+import shutil
+import tempfile
+
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from ecommerce import metrics
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        super(MetricsTests, self).setUp()
+        self.registry = metrics.Registry()
+        self.counter = metrics.Counter('test_events_total', 'Events.', ('kind',), registry=self.registry)
+        self.gauge = metrics.Gauge('test_depth', 'Depth.', registry=self.registry)
+        self.histogram = metrics.Histogram(
+            'test_duration_seconds', 'Duration.', registry=self.registry, buckets=(0.1, 1.0)
+        )
+
+    def render(self):
+        return metrics.generate_latest(self.registry).splitlines()
+
+    def record(self):
+        self.counter.inc(kind='a')
+        self.counter.inc(2, kind='b"c')
+        self.gauge.set(5)
+        self.gauge.dec()
+        for value in (0.05, 0.5, 0.5, 5):
+            self.histogram.observe(value)
+
+    def assert_rendered(self, counter_a=1.0, gauge=4.0, multiplier=1):
+        self.assertEqual(self.render(), [
+            '# HELP test_events_total Events.',
+            '# TYPE test_events_total counter',
+            'test_events_total{{kind="a"}} {}'.format(counter_a),
+            'test_events_total{{kind="b\\"c"}} {}'.format(2.0 * multiplier),
+            '# HELP test_depth Depth.',
+            '# TYPE test_depth gauge',
+            'test_depth {}'.format(gauge),
+            '# HELP test_duration_seconds Duration.',
+            '# TYPE test_duration_seconds histogram',
+            'test_duration_seconds_bucket{{le="0.1"}} {}'.format(1.0 * multiplier),
+            'test_duration_seconds_bucket{{le="1.0"}} {}'.format(3.0 * multiplier),
+            'test_duration_seconds_bucket{{le="+Inf"}} {}'.format(4.0 * multiplier),
+            'test_duration_seconds_sum {}'.format(6.05 * multiplier),
+            'test_duration_seconds_count {}'.format(4.0 * multiplier),
+        ])
+
+    def test_in_memory(self):
+        """Verify that samples are rendered in the Prometheus text format."""
+        self.record()
+        self.assert_rendered()
+
+    def test_labels_required(self):
+        """Verify that samples must be labelled with the metric's label names."""
+        with self.assertRaises(ValueError):
+            self.counter.inc()
+
+        with self.assertRaises(ValueError):
+            self.counter.inc(-1, kind='a')
+
+    def test_duplicate_name(self):
+        """Verify that metric names must be unique."""
+        with self.assertRaises(ValueError):
+            metrics.Counter('test_events_total', 'Events.', registry=self.registry)
+
+    def test_processes(self):
+        """Verify that samples recorded by other processes are aggregated, except the gauges of exited processes."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+
+        with override_settings(METRICS_DIRECTORY=directory):
+            pid = os.fork()
+            if pid == 0:  # pragma: no cover
+                self.record()
+                os._exit(0)  # pylint: disable=protected-access
+            os.waitpid(pid, 0)
+
+            self.record()
+            self.counter.inc(kind='a')
+
+            self.assert_rendered(counter_a=3.0, gauge=4.0, multiplier=2)
+
+    def test_file_growth(self):
+        """Verify that files grow to hold as many samples as are recorded."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+
+        with override_settings(METRICS_DIRECTORY=directory):
+            for index in xrange(2000):
+                self.counter.inc(kind='kind-{}'.format(index))
+
+            self.assertEqual(len(self.registry.collect()), 2000)
+
+            # Samples are recovered if a process's file is reopened.
+            values = metrics.MmapValues(os.path.join(directory, os.listdir(directory)[0]))
+            self.assertEqual(values.get(self.counter._key({'kind': 'kind-1999'})), 1.0)  # pylint: disable=protected-access
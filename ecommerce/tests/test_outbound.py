@@ -0,0 +1,124 @@
+"""Tests of the outbound HTTP client."""
+import os
+import shutil
+import tempfile
+
+import ddt
+from django.core.urlresolvers import reverse
+from django.test import TestCase
+from django.test.utils import override_settings
+import httpretty
+import mock
+from requests.exceptions import ConnectionError, Timeout
+
+from ecommerce import outbound
+
+
+LMS_URL = 'http://lms.example.com/heartbeat'
+
+
+@ddt.ddt
+class OutboundTests(TestCase):
+    def setUp(self):
+        super(OutboundTests, self).setUp()
+        self.addCleanup(outbound.set_correlation_id, None)
+
+    @httpretty.activate
+    @mock.patch.object(outbound.DURATION, 'observe')
+    @mock.patch.object(outbound.REQUESTS, 'inc')
+    def test_status_recorded(self, mock_inc, mock_observe):
+        """Verify that the latency and status code of each call are recorded, labeled with the dependency."""
+        httpretty.register_uri(httpretty.GET, LMS_URL, status=503)
+
+        response = outbound.get(outbound.LMS_HEALTH, LMS_URL)
+
+        self.assertEqual(response.status_code, 503)
+        mock_inc.assert_called_once_with(dependency=outbound.LMS_HEALTH, outcome=u'503')
+        self.assertEqual(mock_observe.call_args[1], {'dependency': outbound.LMS_HEALTH})
+
+    @ddt.data(
+        (Timeout, outbound.TIMEOUT),
+        (ConnectionError, outbound.CONNECTION_ERROR),
+        (ValueError, outbound.ERROR),
+    )
+    @ddt.unpack
+    @mock.patch.object(outbound.REQUESTS, 'inc')
+    def test_errors_recorded(self, error, outcome, mock_inc):
+        """Verify that calls which fail are recorded, and the errors raised."""
+        with mock.patch('requests.post', side_effect=error):
+            with self.assertRaises(error):
+                outbound.post(outbound.ENROLLMENT, LMS_URL, data='{}')
+
+        mock_inc.assert_called_once_with(dependency=outbound.ENROLLMENT, outcome=outcome)
+
+    @ddt.data(
+        (outbound.ENROLLMENT, True),
+        (outbound.OUTBOX, False),
+    )
+    @ddt.unpack
+    @httpretty.activate
+    def test_correlation_id(self, dependency, propagated):
+        """Verify that the correlation ID is propagated to the LMS, and only to the LMS."""
+        httpretty.register_uri(httpretty.POST, LMS_URL)
+        outbound.set_correlation_id('abc123')
+
+        outbound.post(dependency, LMS_URL, data='{}', headers={'Content-Type': 'application/json'})
+
+        headers = httpretty.last_request().headers
+        self.assertEqual(headers.get('X-Request-ID'), 'abc123' if propagated else None)
+        self.assertEqual(headers['Content-Type'], 'application/json')
+
+    @httpretty.activate
+    def test_record_and_replay(self):
+        """Verify that recorded responses are replayed in turn, without making calls."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'calls.jsonl')
+
+        httpretty.register_uri(httpretty.GET, LMS_URL, responses=[
+            httpretty.Response(body='{"ok": 1}', status=200, content_type='application/json'),
+            httpretty.Response(body='down', status=503),
+        ])
+        with override_settings(OUTBOUND_RECORD_PATH=path):
+            outbound.get(outbound.LMS_HEALTH, LMS_URL)
+            outbound.get(outbound.LMS_HEALTH, LMS_URL)
+
+        httpretty.reset()
+        with override_settings(OUTBOUND_REPLAY_PATH=path):
+            first = outbound.get(outbound.LMS_HEALTH, LMS_URL)
+            second = outbound.get(outbound.LMS_HEALTH, LMS_URL)
+            third = outbound.get(outbound.LMS_HEALTH, LMS_URL)
+
+            with self.assertRaises(ConnectionError):
+                outbound.get(outbound.LMS_HEALTH, LMS_URL + '/other')
+
+        self.assertEqual((first.status_code, first.json()), (200, {'ok': 1}))
+        self.assertEqual((second.status_code, second.text), (503, 'down'))
+        self.assertEqual(third.status_code, 200)
+        self.assertIsInstance(httpretty.last_request(), httpretty.core.HTTPrettyRequestEmpty)
+
+
+@mock.patch('requests.get')
+class CorrelationIdMiddlewareTests(TestCase):
+    def test_generated(self, __):
+        """Verify that requests without correlation IDs are assigned one, which is returned."""
+        first = self.client.get(reverse('health'))['X-Request-ID']
+        second = self.client.get(reverse('health'))['X-Request-ID']
+
+        self.assertEqual(len(first), 32)
+        self.assertNotEqual(first, second)
+
+    def test_reused(self, __):
+        """Verify that valid correlation IDs received are reused, and invalid ones replaced."""
+        response = self.client.get(reverse('health'), HTTP_X_REQUEST_ID='abc-123')
+        self.assertEqual(response['X-Request-ID'], 'abc-123')
+
+        response = self.client.get(reverse('health'), HTTP_X_REQUEST_ID='abc\r\n123')
+        self.assertNotEqual(response['X-Request-ID'], 'abc\r\n123')
+
+    def test_propagated(self, mock_get):
+        """Verify that calls made while handling a request carry its correlation ID."""
+        self.client.get(reverse('health'), HTTP_X_REQUEST_ID='abc-123')
+
+        self.assertEqual(mock_get.call_args[1]['headers'], {'X-Request-ID': 'abc-123'})
+        self.assertIsNone(outbound.get_correlation_id())
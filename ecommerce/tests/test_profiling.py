@@ -0,0 +1,130 @@
+"""Tests of sampled request profiling."""
+import cProfile
+import os
+import shutil
+from StringIO import StringIO
+import tempfile
+
+import ddt
+from django.contrib.auth.models import AnonymousUser
+from django.core.management import call_command, CommandError
+from django.core.urlresolvers import reverse
+from django.http import HttpResponse
+from django.test import TestCase, RequestFactory
+from django.test.utils import override_settings
+import mock
+from waffle.models import Flag
+
+from ecommerce import profiling
+from ecommerce.middleware import ProfilingMiddleware
+from ecommerce.tests.mixins import UserMixin
+
+
+@ddt.ddt
+class ProfilingTests(UserMixin, TestCase):
+    def setUp(self):
+        super(ProfilingTests, self).setUp()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        override = override_settings(PROFILING_DIRECTORY=self.directory, PROFILING_MAX_FILES=3)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def make_request(self, user=None, **extra):
+        request = RequestFactory().get('/', **extra)
+        request.user = user or AnonymousUser()
+        return request
+
+    def test_unsampled(self):
+        """Verify that requests matching no criterion are not profiled."""
+        self.assertFalse(profiling.should_profile(self.make_request()))
+
+    @ddt.data((0.5, 0.4, True), (0.5, 0.6, False))
+    @ddt.unpack
+    def test_sample_rate(self, sample_rate, value, expected):
+        """Verify that the configured fraction of requests is profiled."""
+        with override_settings(PROFILING_SAMPLE_RATE=sample_rate):
+            with mock.patch('random.random', return_value=value):
+                self.assertEqual(profiling.should_profile(self.make_request()), expected)
+
+    @ddt.data(('secret', True), ('wrong', False))
+    @ddt.unpack
+    def test_header(self, value, expected):
+        """Verify that requests carrying the profiling header, with the right token, are profiled."""
+        with override_settings(PROFILING_HEADER_TOKEN='secret'):
+            self.assertEqual(profiling.should_profile(self.make_request(HTTP_X_PROFILE=value)), expected)
+
+    def test_username(self):
+        """Verify that requests made by the listed users are profiled."""
+        user = self.create_user()
+        with override_settings(PROFILING_USERNAMES=(user.username,)):
+            self.assertTrue(profiling.should_profile(self.make_request(user)))
+            self.assertFalse(profiling.should_profile(self.make_request(self.create_user())))
+
+    def test_waffle_flag(self):
+        """Verify that requests for which the profiling flag is active are profiled."""
+        Flag.objects.create(name='profile_requests', everyone=True)
+        with override_settings(PROFILING_WAFFLE_FLAG='profile_requests'):
+            self.assertTrue(profiling.should_profile(self.make_request()))
+
+    def test_ring(self):
+        """Verify that only the newest profiles are kept."""
+        paths = []
+        for endpoint in ('a', 'b', 'a', 'b:c'):
+            profiler = cProfile.Profile()
+            profiler.enable()
+            profiler.disable()
+            paths.append(profiling.save(profiler, endpoint))
+
+        self.assertEqual(profiling.list_profiles(), paths[1:])
+        self.assertEqual(profiling.list_profiles('a'), [paths[2]])
+        self.assertEqual(profiling.list_profiles('b:c'), [paths[3]])
+
+    def test_middleware(self):
+        """Verify that sampled requests are profiled, and attributed to the views handling them."""
+        with override_settings(PROFILING_SAMPLE_RATE=1):
+            self.client.get(reverse('api:v2:orders:list'), HTTP_AUTHORIZATION=self.generate_jwt_token_header(
+                self.create_user()
+            ))
+
+        self.assertEqual(len(profiling.list_profiles('api:v2:orders:list')), 1)
+
+    def test_overlapping_requests(self):
+        """Verify that requests beginning while another is being profiled are not profiled."""
+        middleware = ProfilingMiddleware()
+        first, second, third = [self.make_request() for __ in xrange(3)]
+
+        with override_settings(PROFILING_SAMPLE_RATE=1):
+            middleware.process_request(first)
+            self.assertFalse(profiling.should_profile(second))
+            middleware.process_request(second)
+            self.assertFalse(hasattr(second, 'profiler'))
+
+            middleware.process_response(second, HttpResponse())
+            self.assertTrue(hasattr(first, 'profiler'))
+            middleware.process_response(first, HttpResponse())
+
+            middleware.process_request(third)
+            self.assertTrue(hasattr(third, 'profiler'))
+            middleware.process_response(third, HttpResponse())
+
+        self.assertEqual(len(profiling.list_profiles()), 2)
+
+    def test_aggregate_profiles(self):
+        """Verify that the command prints the functions in which profiled requests spent the most time."""
+        for __ in xrange(2):
+            profiler = cProfile.Profile()
+            profiler.runcall(os.getpid)
+            profiling.save(profiler, 'test')
+
+        out = StringIO()
+        call_command('aggregate_profiles', endpoint='test', stdout=out)
+        self.assertIn('Aggregated 2 profiles.', out.getvalue())
+        self.assertIn('getpid', out.getvalue())
+
+        with self.assertRaises(CommandError):
+            call_command('aggregate_profiles', endpoint='other')
+
+        with override_settings(PROFILING_DIRECTORY=None):
+            with self.assertRaises(CommandError):
+                call_command('aggregate_profiles')
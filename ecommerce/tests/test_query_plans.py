@@ -0,0 +1,69 @@
+"""Tests verifying that the hottest queries are served by purpose-built indexes."""
+import datetime
+
+import ddt
+from django.db.models import Count
+from django.test import TestCase
+from oscar.core.loading import get_model
+from oscar.test import factories
+
+from ecommerce.extensions.fulfillment.status import LINE
+from ecommerce.tests.mixins import QueryPlanMixin, UserMixin
+
+
+Basket = get_model('basket', 'Basket')
+Line = get_model('order', 'Line')
+Order = get_model('order', 'Order')
+Product = get_model('catalogue', 'Product')
+
+
+@ddt.ddt
+class HotQueryPlanTests(QueryPlanMixin, UserMixin, TestCase):
+    index_migrations = (
+        'ecommerce.extensions.order.migrations.0006_add_composite_indexes',
+        'ecommerce.extensions.partner.migrations.0004_add_stockrecord_partner_sku_index',
+    )
+
+    def setUp(self):
+        super(HotQueryPlanTests, self).setUp()
+        self.user = self.create_user()
+
+    def test_order_list(self):
+        """Verify that a user's orders are listed, newest first, using the (user, date_placed) index."""
+        self.assert_uses_index(self.user.orders.order_by('-date_placed'), 'order_order_user_id_date_placed')
+
+    def test_order_by_basket(self):
+        """Verify that orders are retrieved by basket using an index."""
+        # Oscar's single-column index on basket_id suffices, since each basket is used to place at most one order.
+        self.assert_uses_index(Order.objects.filter(basket_id=1))
+
+    def test_lines_by_status(self):
+        """Verify that lines are scanned by status using the (status, order) index."""
+        queryset = Line.objects.filter(status=LINE.FULFILLMENT_SERVER_ERROR)
+        self.assert_uses_index(queryset, 'order_line_status_order_id')
+
+    def test_editable_basket(self):
+        """Verify that a user's oldest editable basket is retrieved using an index."""
+        # Oscar's index on owner returns baskets in ID order, allowing the scan to stop at the first
+        # editable basket. Planners prefer it to any composite index including the status.
+        queryset = Basket.objects.filter(owner=self.user, status__in=Basket.editable_statuses).order_by('id')
+        self.assert_uses_index(queryset[:1])
+
+    @ddt.data(
+        {'status': Basket.MERGED},
+        {'status': Basket.FROZEN, 'date_created__lt': datetime.datetime(2015, 1, 1)},
+    )
+    def test_baskets_by_status(self, lookup):
+        """Verify that baskets are scanned by status using the (status, date_created) index."""
+        self.assert_uses_index(Basket.objects.filter(**lookup), 'basket_basket_status_date_created')
+
+    def test_editable_baskets_by_owner(self):
+        """Verify that editable baskets are grouped by owner using the (status, date_created) index."""
+        queryset = Basket.objects.filter(status__in=Basket.editable_statuses).values('owner').annotate(Count('id'))
+        self.assert_uses_index(queryset, 'basket_basket_status_date_created')
+
+    def test_products_by_sku(self):
+        """Verify that products are retrieved by SKU using the (partner_sku, product) index."""
+        factories.create_product(partner_sku='SKU-1')
+        queryset = Product.objects.filter(stockrecords__partner_sku__in=['SKU-1', 'SKU-2']).distinct()
+        self.assert_uses_index(queryset, 'partner_stockrecord_partner_sku_product_id')
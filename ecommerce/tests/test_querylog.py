@@ -0,0 +1,179 @@
+"""Tests of query fingerprinting, statistics, the slow query log and query budgets."""
+import json
+import os
+import shutil
+from StringIO import StringIO
+import tempfile
+
+import ddt
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command, CommandError
+from django.core.urlresolvers import reverse
+from django.test import TestCase
+from django.test.utils import override_settings
+import mock
+
+from ecommerce import querylog
+from ecommerce.tests.mixins import UserMixin
+
+
+User = get_user_model()
+
+
+@ddt.ddt
+class FingerprintTests(TestCase):
+    @ddt.data(
+        (
+            'SELECT "user"."id" FROM "user" WHERE "user"."id" = %s LIMIT 21',
+            'SELECT "user"."id" FROM "user" WHERE "user"."id" = ? LIMIT ?'
+        ),
+        (
+            'SELECT * FROM "line" WHERE "line"."id" IN (%s, %s,\n %s)',
+            'SELECT * FROM "line" WHERE "line"."id" IN (...)'
+        ),
+        (
+            "UPDATE \"order\" SET \"status\" = 'Complete', \"total\" = 10.00 WHERE \"number\" = 'EDX-1''s'",
+            'UPDATE "order" SET "status" = ?, "total" = ? WHERE "number" = ?'
+        ),
+        (
+            'INSERT INTO "line" ("a", "b") VALUES (%s, %s), (%s, %s), (%s, %s)',
+            'INSERT INTO "line" ("a", "b") VALUES (...)'
+        ),
+        ('SAVEPOINT "s140035_x12"', 'SAVEPOINT ?'),
+        ('SELECT "t1"."col2" FROM "t1"', 'SELECT "t1"."col2" FROM "t1"'),
+    )
+    @ddt.unpack
+    def test_fingerprint(self, sql, expected):
+        """Verify that literals and placeholders are replaced, and repeated placeholders collapsed."""
+        self.assertEqual(querylog.fingerprint(sql), expected)
+
+
+class QueryLogTests(UserMixin, TestCase):
+    def setUp(self):
+        super(QueryLogTests, self).setUp()
+        querylog.install()
+
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        override = override_settings(SQL_STATS_DIRECTORY=directory, SLOW_QUERY_THRESHOLD_SECONDS=None)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def get_stats(self, endpoint):
+        return {row['fingerprint']: row for row in querylog.collect() if row['endpoint'] == endpoint}
+
+    def test_record(self):
+        """Verify that queries are aggregated by fingerprint and endpoint."""
+        querylog.set_endpoint('test')
+        self.addCleanup(querylog.set_endpoint, None)
+        user = self.create_user()
+
+        User.objects.filter(id=user.id).exists()
+        User.objects.filter(id=user.id + 1).exists()
+
+        rows = [row for fingerprint, row in self.get_stats('test').items() if fingerprint.startswith('SELECT (...) AS')]
+        self.assertEqual(len(rows), 1)
+        row = rows[0]
+        self.assertEqual(row['count'], 2)
+        self.assertGreaterEqual(row['max'], 0)
+        self.assertGreaterEqual(row['total'], row['max'])
+
+    def test_middleware(self):
+        """Verify that queries executed by views are attributed to the views, by name."""
+        user = self.create_user()
+        self.client.get(reverse('api:v2:orders:list'), HTTP_AUTHORIZATION=self.generate_jwt_token_header(user))
+
+        self.assertTrue(self.get_stats('api:v2:orders:list'))
+
+    @mock.patch('ecommerce.querylog.logger')
+    def test_slow_query_log(self, mock_logger):
+        """Verify that slow queries are logged with the endpoint and the code which executed them."""
+        querylog.set_endpoint('test')
+        self.addCleanup(querylog.set_endpoint, None)
+
+        with override_settings(SLOW_QUERY_THRESHOLD_SECONDS=0):
+            User.objects.exists()
+
+        __, duration, endpoint, statement, stack = mock_logger.warning.call_args[0]
+        self.assertGreaterEqual(duration, 0)
+        self.assertEqual(endpoint, 'test')
+        self.assertIn('FROM "ecommerce_user"', statement)
+        self.assertIn('test_querylog.py', stack.split(' <- ')[0])
+
+    def test_dump_query_stats(self):
+        """Verify that the command prints the statistics recorded by all processes."""
+        querylog.set_endpoint('test')
+        self.addCleanup(querylog.set_endpoint, None)
+        User.objects.exists()
+
+        out = StringIO()
+        call_command('dump_query_stats', endpoint='test', json=True, stdout=out)
+        rows = json.loads(out.getvalue())
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['count'], 1)
+
+        out = StringIO()
+        call_command('dump_query_stats', endpoint='test', stdout=out)
+        self.assertIn(rows[0]['fingerprint'], out.getvalue())
+
+    def test_collect_read_only(self):
+        """Verify that collecting statistics doesn't create or modify any process's file."""
+        directory = settings.SQL_STATS_DIRECTORY
+        # A file just created by a process which hasn't yet initialized it
+        path = os.path.join(directory, querylog.FILENAME_TEMPLATE.format(pid=os.getpid() + 1))
+        open(path, 'wb').close()
+
+        self.assertEqual(querylog.collect(), [])
+        self.assertEqual(os.listdir(directory), [os.path.basename(path)])
+        self.assertEqual(os.path.getsize(path), 0)
+
+    def test_dump_query_stats_not_recorded(self):
+        """Verify that the command fails if statistics are not recorded."""
+        with override_settings(SQL_STATS_DIRECTORY=None):
+            with self.assertRaises(CommandError):
+                call_command('dump_query_stats')
+
+
+@override_settings(QUERY_BUDGETS={'test': 2}, QUERY_BUDGET_ENFORCEMENT='raise')
+class QueryBudgetTests(UserMixin, TestCase):
+    def setUp(self):
+        super(QueryBudgetTests, self).setUp()
+        querylog.install()
+
+    def test_query_count(self):
+        """Verify that queries other than savepoint statements are counted."""
+        querylog.reset_query_count()
+        User.objects.exists()
+        querylog.record('SAVEPOINT "s1_x1"', 0)
+
+        self.assertEqual(querylog.get_query_count(), 1)
+
+    def test_check_budget(self):
+        """Verify that exceeding a budget raises an exception, and that endpoints without budgets are unrestricted."""
+        querylog.check_budget('test', 2)
+        querylog.check_budget('other', 100)
+
+        with self.assertRaises(querylog.QueryBudgetExceeded):
+            querylog.check_budget('test', 3)
+
+    @mock.patch('ecommerce.querylog.logger')
+    def test_check_budget_log(self, mock_logger):
+        """Verify that exceeding a budget is only logged if enforcement is set to log."""
+        with override_settings(QUERY_BUDGET_ENFORCEMENT='log'):
+            querylog.check_budget('test', 3)
+
+        self.assertTrue(mock_logger.warning.called)
+
+    def test_middleware(self):
+        """Verify that requests exceeding the budgets of their endpoints fail."""
+        user = self.create_user()
+        path = reverse('api:v2:orders:list')
+        auth = self.generate_jwt_token_header(user)
+
+        response = self.client.get(path, HTTP_AUTHORIZATION=auth)
+        self.assertEqual(response.status_code, 200)
+
+        with override_settings(QUERY_BUDGETS={'api:v2:orders:list': 1}):
+            with self.assertRaises(querylog.QueryBudgetExceeded):
+                self.client.get(path, HTTP_AUTHORIZATION=auth)
@@ -0,0 +1,153 @@
+"""Tests of read replica routing, using a second SQLite database as the replica."""
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.urlresolvers import reverse
+from django.http import HttpResponse
+from django.test import TestCase, RequestFactory
+from django.test.utils import override_settings
+import mock
+from oscar.core.loading import get_model
+from oscar.test import factories
+
+from ecommerce import routers
+from ecommerce.extensions.api.v2.views import OrderListView
+from ecommerce.middleware import ReadReplicaMiddleware
+from ecommerce.tests.mixins import UserMixin
+
+
+Order = get_model('order', 'Order')
+User = get_user_model()
+
+
+@override_settings(READ_REPLICA_ALIAS='replica')
+class ReadReplicaTestCase(UserMixin, TestCase):
+    """Base class for tests in which users are written only to the primary, so reads from the replica miss them."""
+    multi_db = True
+
+    def setUp(self):
+        super(ReadReplicaTestCase, self).setUp()
+        self.addCleanup(cache.clear)
+        self.user = self.create_user()
+
+    def user_is_readable(self):
+        return User.objects.filter(pk=self.user.pk).exists()
+
+
+class ReadReplicaRouterTests(ReadReplicaTestCase):
+    def test_reads_outside_block(self):
+        """Verify that reads are routed to the primary unless routing to the replica is active."""
+        self.assertTrue(self.user_is_readable())
+
+    def test_reads_within_block(self):
+        """Verify that reads made within a read_replica block are routed to the replica."""
+        with routers.read_replica():
+            self.assertFalse(self.user_is_readable())
+
+        self.assertTrue(self.user_is_readable())
+
+    @override_settings(READ_REPLICA_ALIAS=None)
+    def test_no_replica(self):
+        """Verify that reads are routed to the primary if no replica is configured."""
+        with routers.read_replica():
+            self.assertTrue(self.user_is_readable())
+
+    def test_reads_after_write(self):
+        """Verify that reads made after a write within a read_replica block are routed to the primary."""
+        with routers.read_replica():
+            self.user.save()
+            self.assertTrue(self.user_is_readable())
+
+    def test_sticky_user(self):
+        """Verify that reads made on behalf of a user stuck to the primary are routed to the primary."""
+        with routers.read_replica(self.user):
+            self.assertFalse(self.user_is_readable())
+
+        routers.stick_to_primary(self.user)
+        with routers.read_replica(self.user):
+            self.assertTrue(self.user_is_readable())
+
+    def test_allow_migrate(self):
+        """Verify that the replica is not migrated."""
+        router = routers.ReadReplicaRouter()
+        self.assertFalse(router.allow_migrate('replica', Order))
+        self.assertIsNone(router.allow_migrate('default', Order))
+
+
+class UseReadReplicaTests(ReadReplicaTestCase):
+    def setUp(self):
+        super(UseReadReplicaTests, self).setUp()
+        self.view = routers.use_read_replica(lambda request: HttpResponse(json.dumps(self.user_is_readable())))
+
+    def assert_read_from_replica(self, method, expected):
+        request = getattr(RequestFactory(), method)('/')
+        request.user = self.user
+        self.assertEqual(json.loads(self.view(request).content), not expected)
+
+    def test_safe_request(self):
+        """Verify that reads made by safe requests are routed to the replica."""
+        self.assert_read_from_replica('get', True)
+
+    def test_unsafe_request(self):
+        """Verify that reads made by unsafe requests are routed to the primary."""
+        self.assert_read_from_replica('post', False)
+
+
+class ReadReplicaMiddlewareTests(ReadReplicaTestCase):
+    def process_response(self, method):
+        request = getattr(RequestFactory(), method)('/')
+        request.user = self.user
+        ReadReplicaMiddleware().process_response(request, HttpResponse())
+
+    def test_reset(self):
+        """Verify that routing to the replica left active by an earlier request is discarded."""
+        previous = routers.activate()
+        self.addCleanup(routers.restore, previous)
+
+        ReadReplicaMiddleware().process_request(RequestFactory().get('/'))
+        self.assertTrue(self.user_is_readable())
+
+    def test_unsafe_request(self):
+        """Verify that users making unsafe requests are stuck to the primary."""
+        self.process_response('post')
+        self.assertTrue(routers.is_stuck_to_primary(self.user))
+
+    def test_safe_request(self):
+        """Verify that users making safe requests are not stuck to the primary."""
+        self.process_response('get')
+        self.assertFalse(routers.is_stuck_to_primary(self.user))
+
+    @override_settings(READ_REPLICA_ALIAS=None)
+    def test_no_replica(self):
+        """Verify that users are not stuck to the primary if no replica is configured."""
+        self.process_response('post')
+        self.assertFalse(routers.is_stuck_to_primary(self.user))
+
+
+class ReadReplicaViewTests(ReadReplicaTestCase):
+    def setUp(self):
+        super(ReadReplicaViewTests, self).setUp()
+        factories.create_order(user=self.user)
+
+    def get_order_count(self):
+        response = self.client.get(
+            reverse('api:v2:orders:list'), HTTP_AUTHORIZATION=self.generate_jwt_token_header(self.user)
+        )
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.content)['count']
+
+    def test_order_list(self):
+        """Verify that orders are listed from the replica, unless the user has recently written."""
+        self.assertEqual(self.get_order_count(), 0)
+
+        routers.stick_to_primary(self.user)
+        self.assertEqual(self.get_order_count(), 1)
+
+    def test_view_error(self):
+        """Verify that routing to the replica ends if the view raises an exception which DRF doesn't handle."""
+        with mock.patch.object(OrderListView, 'list', side_effect=ValueError):
+            with self.assertRaises(ValueError):
+                self.get_order_count()
+
+        self.assertTrue(self.user_is_readable())
@@ -0,0 +1,97 @@
+"""Tests of the attribution of request wall time to phases."""
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.urlresolvers import reverse
+from django.test import TestCase
+from django.test.utils import override_settings
+import httpretty
+import mock
+import requests
+
+from ecommerce import timing
+from ecommerce.tests.mixins import UserMixin
+
+
+class TimingTests(TestCase):
+    def setUp(self):
+        super(TimingTests, self).setUp()
+        self.addCleanup(timing.stop)
+        timing.install()
+
+    def test_phase(self):
+        """Verify that time spent in phases is accumulated while a request is being timed."""
+        with timing.phase(timing.SIGNING):
+            pass
+
+        timings = timing.start()
+        with mock.patch('time.time', side_effect=[10.0, 10.25, 11.0, 11.5]):
+            with timing.phase(timing.SIGNING):
+                pass
+            with timing.phase(timing.SIGNING):
+                pass
+
+        self.assertEqual(timings.phases, {timing.SIGNING: [2, 0.75]})
+        self.assertIs(timing.stop(), timings)
+        self.assertIsNone(timing.get_current())
+
+    def test_format(self):
+        """Verify the formats of the Server-Timing header and the logged timings."""
+        timings = timing.RequestTimings()
+        timings.started, timings.finished = 10.0, 10.5
+        timings.add(timing.DB, 0.1)
+        timings.add(timing.DB, 0.05)
+        timings.add(timing.HTTP, 0.2)
+
+        self.assertEqual(timings.as_header(), 'db;dur=150.0;desc="2", http;dur=200.0;desc="1", total;dur=500.0')
+        self.assertEqual(
+            timings.as_dict(),
+            {'db_count': 2, 'db_ms': 150.0, 'http_count': 1, 'http_ms': 200.0, 'total_ms': 500.0}
+        )
+
+    def test_queries(self):
+        """Verify that database queries are timed."""
+        timings = timing.start()
+        get_user_model().objects.exists()
+        self.assertEqual(timings.phases[timing.DB][0], 1)
+
+    @httpretty.activate
+    def test_outbound_requests(self):
+        """Verify that outbound calls made with requests are timed."""
+        httpretty.register_uri(httpretty.GET, 'http://lms.example.com/', body='')
+        timings = timing.start()
+
+        requests.get('http://lms.example.com/')
+
+        self.assertEqual(timings.phases[timing.HTTP][0], 1)
+
+
+class ServerTimingMiddlewareTests(UserMixin, TestCase):
+    def setUp(self):
+        super(ServerTimingMiddlewareTests, self).setUp()
+        self.user = self.create_user()
+
+    def get_orders(self):
+        return self.client.get(
+            reverse('api:v2:orders:list'), HTTP_AUTHORIZATION=self.generate_jwt_token_header(self.user)
+        )
+
+    def test_server_timing_header(self):
+        """Verify that the breakdown of request time is returned in a Server-Timing header, and logged."""
+        with mock.patch('ecommerce.middleware.logger') as mock_logger:
+            response = self.get_orders()
+
+        self.assertEqual(response.status_code, 200)
+        metrics = [metric.split(';')[0] for metric in response['Server-Timing'].split(', ')]
+        self.assertEqual(metrics, [timing.DB, timing.RENDER, 'total'])
+
+        __, logged = mock_logger.info.call_args[0]
+        record = json.loads(logged)
+        self.assertEqual(record['view'], 'api:v2:orders:list')
+        self.assertEqual(record['status'], 200)
+        self.assertGreater(record['db_count'], 0)
+
+    @override_settings(SERVER_TIMING_HEADER_ENABLED=False)
+    def test_header_disabled(self):
+        """Verify that the Server-Timing header can be disabled."""
+        self.assertNotIn('Server-Timing', self.get_orders())
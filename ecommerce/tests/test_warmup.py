@@ -0,0 +1,50 @@
+"""Tests of warming up workers."""
+import ddt
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ImproperlyConfigured, ViewDoesNotExist
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.urlresolvers import get_resolver
+from django.db import DatabaseError
+from django.test import TestCase
+import mock
+
+from ecommerce import warmup
+
+
+@ddt.ddt
+class WarmUpTests(TestCase):
+    def test_warm_up(self):
+        """Verify that every step is run and timed, filling the caches otherwise filled by the first requests."""
+        ContentType.objects.clear_cache()
+        get_resolver.cache_clear()
+
+        application = WSGIHandler()
+        durations = warmup.warm_up(application)
+
+        self.assertEqual(durations.keys(), warmup.STEPS.keys() + ['middleware'])
+        self.assertIsNotNone(application._request_middleware)  # pylint: disable=protected-access
+        self.assertTrue(get_resolver(None)._reverse_dict)  # pylint: disable=protected-access
+        with self.assertNumQueries(0):
+            ContentType.objects.get_for_model(ContentType)
+
+    @ddt.data(DatabaseError, ImproperlyConfigured, ViewDoesNotExist, AttributeError)
+    def test_failed_step(self, error):
+        """Verify that a failed step is logged, and the remaining steps run."""
+        with mock.patch.object(warmup, 'warm_urls', side_effect=error):
+            with mock.patch.dict(warmup.STEPS, urls=warmup.warm_urls):
+                with mock.patch.object(warmup.logger, 'warning') as warning:
+                    durations = warmup.warm_up(WSGIHandler())
+
+        self.assertTrue(warning.called)
+        self.assertEqual(durations.keys(), warmup.STEPS.keys() + ['middleware'])
+
+    def test_post_fork(self):
+        """Verify that workers forked by gunicorn warm up using the server's application."""
+        application = WSGIHandler()
+        server = mock.Mock()
+        server.app.wsgi.return_value = application
+
+        with mock.patch.object(warmup, 'warm_up') as warm_up:
+            warmup.post_fork(server, mock.Mock())
+
+        warm_up.assert_called_once_with(application)
@@ -0,0 +1,150 @@
+"""Attribution of the wall time spent handling requests to phases such as database queries and outbound HTTP calls.
+
+`ServerTimingMiddleware` starts timing each request. Time spent in each phase is then
+accumulated by `phase` blocks, or functions decorated with `timed`, executed by the
+thread handling the request. Time spent by other threads is not attributed to the request.
+
+Database queries and outbound calls made with `requests` are timed once `install` has
+been called. Phases may overlap: time spent querying the database during fulfillment is
+attributed to both the db and fulfillment phases.
+"""
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import wraps
+import threading
+import time
+
+from django.db.backends import utils
+import requests
+
+
+DB = 'db'
+HTTP = 'http'
+FULFILLMENT = 'fulfillment'
+SIGNING = 'signing'
+RENDER = 'render'
+
+_state = threading.local()
+_install_lock = threading.Lock()
+
+
+class RequestTimings(object):
+    """Time spent handling a request, in total and in each phase."""
+
+    def __init__(self):
+        self.started = time.time()
+        self.finished = None
+        # Maps phase names to [count, seconds]
+        self.phases = OrderedDict()
+
+    def add(self, name, duration):
+        """Attribute time to a phase.
+
+        Arguments:
+            name (str): Name of the phase.
+            duration (float): Number of seconds spent in the phase.
+        """
+        totals = self.phases.setdefault(name, [0, 0.0])
+        totals[0] += 1
+        totals[1] += duration
+
+    def finish(self):
+        self.finished = time.time()
+
+    @property
+    def total(self):
+        """Number of seconds for which the request was handled."""
+        return (self.finished or time.time()) - self.started
+
+    def as_header(self):
+        """Return the timings as the value of a Server-Timing header, with durations in milliseconds."""
+        metrics = [
+            '{name};dur={duration:.1f};desc="{count}"'.format(name=name, duration=seconds * 1000, count=count)
+            for name, (count, seconds) in self.phases.items()
+        ]
+        metrics.append('total;dur={duration:.1f}'.format(duration=self.total * 1000))
+        return ', '.join(metrics)
+
+    def as_dict(self):
+        """Return the timings as a JSON-serializable dict, with durations in milliseconds."""
+        timings = {'total_ms': round(self.total * 1000, 1)}
+        for name, (count, seconds) in self.phases.items():
+            timings['{}_count'.format(name)] = count
+            timings['{}_ms'.format(name)] = round(seconds * 1000, 1)
+        return timings
+
+
+def start():
+    """Begin timing a request handled by the current thread.
+
+    Returns:
+        RequestTimings
+    """
+    _state.timings = RequestTimings()
+    return _state.timings
+
+
+def stop():
+    """Stop timing the request handled by the current thread.
+
+    Returns:
+        RequestTimings: The request's timings, or None if no request was being timed.
+    """
+    timings = get_current()
+    _state.timings = None
+    if timings is not None:
+        timings.finish()
+    return timings
+
+
+def get_current():
+    """Return the timings of the request handled by the current thread, or None if no request is being timed."""
+    return getattr(_state, 'timings', None)
+
+
+@contextmanager
+def phase(name):
+    """Attribute the time spent within the block to the named phase of the current request, if any."""
+    timings = get_current()
+    if timings is None:
+        yield
+        return
+
+    started = time.time()
+    try:
+        yield
+    finally:
+        timings.add(name, time.time() - started)
+
+
+def timed(name):
+    """Decorator which attributes the time spent in the decorated function to the named phase."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if get_current() is None:
+                return func(*args, **kwargs)
+
+            with phase(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def install():
+    """Time database queries and outbound calls made with `requests`. Safe to call more than once.
+
+    Django 1.7 provides no hook around query execution, and `requests` none around sending,
+    so the methods through which all queries and calls pass are wrapped.
+    """
+    with _install_lock:
+        if getattr(utils.CursorWrapper, '_timed', False):
+            return
+
+        utils.CursorWrapper.execute = timed(DB)(utils.CursorWrapper.execute)
+        utils.CursorWrapper.executemany = timed(DB)(utils.CursorWrapper.executemany)
+        utils.CursorWrapper._timed = True  # pylint: disable=protected-access
+
+        requests.Session.send = timed(HTTP)(requests.Session.send)
@@ -8,6 +8,7 @@ from django.shortcuts import redirect
 from django.views.generic import RedirectView
 
 from ecommerce.extensions.urls import urlpatterns as extensions_patterns
+from ecommerce.health import views as health_views
 from ecommerce.user import views as user_views
 
 
@@ -40,6 +41,8 @@ urlpatterns = patterns(
 
     # Heartbeat page
     url(r'^health$', include('health.urls')),
+    # Metrics, for staff
+    url(r'^metrics$', health_views.metrics, name='metrics'),
 
     # Social auth
     url('', include('social.apps.django_app.urls', namespace='social')),
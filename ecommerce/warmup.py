@@ -0,0 +1,140 @@
+"""Warm-up of a worker before it serves its first request.
+
+Much of the work done by a worker's first requests is done once per process: loading the
+middleware, building the URL resolvers, importing the views (and the classes Oscar loads
+for them), loading translation catalogs, filling the ContentType and reference data caches,
+and connecting to the databases. Warming up does this work before the worker accepts
+requests, so that the latency of its first requests matches that of later ones.
+
+Workers should warm up from gunicorn's `post_fork` hook, which works whether or not the
+application is preloaded by the master process:
+
+    from ecommerce.warmup import post_fork  # in the gunicorn config file
+
+Alternatively, workers warm up as `wsgi.py` is imported, if WARM_UP_ON_STARTUP is True. This
+must not be used if workers are forked from an application preloaded by the master process,
+since they would share the database connections opened by the master.
+"""
+from collections import OrderedDict
+from functools import partial
+import logging
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.urlresolvers import get_resolver, RegexURLResolver
+from django.db import connections
+from django.utils import translation
+from django.utils.module_loading import import_string
+
+from ecommerce import metrics
+from ecommerce.extensions.order import reference_data
+
+
+logger = logging.getLogger(__name__)
+
+WARM_UP_DURATION = metrics.Histogram(
+    'ecommerce_warm_up_duration_seconds', 'Time taken by each step of warming up workers.', ('step',)
+)
+
+
+def _warm_resolver(resolver):
+    """Populate the resolver, and those it includes, compiling their patterns and importing their views."""
+    resolver.reverse_dict  # pylint: disable=pointless-statement
+    for pattern in resolver.url_patterns:
+        pattern.regex  # pylint: disable=pointless-statement
+        if isinstance(pattern, RegexURLResolver):
+            _warm_resolver(pattern)
+        else:
+            pattern.callback  # pylint: disable=pointless-statement
+
+
+def warm_middleware(application):
+    """Load the middleware of the given WSGI application."""
+    # pylint: disable=protected-access
+    if application._request_middleware is None:
+        application.load_middleware()
+
+
+def warm_urls():
+    """Load the URLconf, and every view it routes to."""
+    _warm_resolver(get_resolver(None))
+
+
+def warm_classes():
+    """Import the classes loaded by dotted path from settings, such as payment processors and fulfillment modules."""
+    paths = (
+        list(settings.PAYMENT_PROCESSORS) +
+        list(getattr(settings, 'FULFILLMENT_MODULES', [])) +
+        list(getattr(settings, 'OUTBOX_SINKS', []))
+    )
+    for path in paths:
+        import_string(path)
+
+
+def warm_translations():
+    """Load the translation catalogs of the default language."""
+    with translation.override(settings.LANGUAGE_CODE):
+        translation.ugettext(u'')
+
+
+def warm_content_types():
+    """Fill the ContentType cache for every installed model, with a single query."""
+    ContentType.objects.get_for_models(*apps.get_models())
+
+
+def warm_connections():
+    """Connect to every configured database."""
+    for alias in connections:
+        connections[alias].ensure_connection()
+
+
+STEPS = OrderedDict([
+    ('urls', warm_urls),
+    ('classes', warm_classes),
+    ('translations', warm_translations),
+    ('connections', warm_connections),
+    ('content_types', warm_content_types),
+    ('reference_data', reference_data.warm),
+])
+
+
+def warm_up(application=None):
+    """Run every warm-up step, logging the time taken by each.
+
+    A step which fails is logged and skipped, rather than preventing the worker from
+    starting, since the worker will do the same work when serving requests.
+
+    Arguments:
+        application (WSGIHandler): Application whose middleware is loaded, if given.
+
+    Returns:
+        OrderedDict: Number of seconds taken by each step, by step name.
+    """
+    steps = OrderedDict(STEPS)
+    if application is not None:
+        steps['middleware'] = partial(warm_middleware, application)
+
+    durations = OrderedDict()
+    for name, step in steps.items():
+        start = time.time()
+        try:
+            step()
+        except Exception:  # pylint: disable=broad-except
+            logger.warning(u"Warm-up step [%s] failed.", name, exc_info=True)
+        durations[name] = time.time() - start
+        WARM_UP_DURATION.observe(durations[name], step=name)
+
+    logger.info(
+        u"Warmed up in [%.1f] ms: %s.",
+        sum(durations.values()) * 1000,
+        u', '.join(u'{name} [{duration:.1f}] ms'.format(name=name, duration=duration * 1000)
+                   for name, duration in durations.items())
+    )
+    return durations
+
+
+def post_fork(server, worker):  # pylint: disable=unused-argument
+    """Warm up a worker forked by gunicorn, loading the application if it wasn't preloaded."""
+    warm_up(server.app.wsgi())
@@ -16,6 +16,7 @@ import os
 from os.path import abspath, dirname
 from sys import path
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 
@@ -29,6 +30,12 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "settings.local")
 # setting points here.
 application = get_wsgi_application()
 
+# Do the work otherwise done by the first requests served, before serving them. Imported once
+# the application is loaded, since warming up requires models.
+if settings.WARM_UP_ON_STARTUP:
+    from ecommerce.warmup import warm_up
+    warm_up(application)
+
 # Apply WSGI middleware here.
 # from helloworld.wsgi import HelloWorldApplication
 # application = HelloWorldApplication(application)